@@ -1,5 +1,8 @@
 from typing import List, Union
+import atexit
 import math
+from pathlib import Path
+import sys
 
 import numpy as np
 
@@ -196,12 +199,21 @@ def moment_inertia(
 def location_of_column(
     faces: List[Part.Face],
     ) -> str:
-
-    faces_normals = {'x': [], 'y': []}
+    normals = []
     for f in faces:
         normal = f.normalAt(0, 0)
-        normal_x = normal.x
-        normal_y = normal.y
+        normals.append((normal.x, normal.y))
+    return location_of_normals(normals)
+
+def location_of_normals(
+    normals: list,
+    ) -> str:
+    '''
+    return the location of column from the (x, y) normals of faces of
+    critical section
+    '''
+    faces_normals = {'x': [], 'y': []}
+    for normal_x, normal_y in normals:
         if normal_x:
             if not normal_x in faces_normals['x']:
                 faces_normals['x'].append(normal_x)
@@ -275,24 +287,132 @@ def gamma_v(
     gamma_vy = 1 - gamma_fy
     return (gamma_vx, gamma_vy)
 
+def get_alphas_s(locations) -> np.ndarray:
+    '''
+    return alpha_s of ACI for an array of punch locations like "Corner 1",
+    "Edge 2" and "Interior"
+    '''
+    locations = np.asarray(locations, dtype=str)
+    return np.select(
+        [
+            np.char.startswith(locations, 'Interior'),
+            np.char.startswith(locations, 'Edge'),
+            np.char.startswith(locations, 'Corner'),
+        ],
+        [40, 30, 20],
+        0,
+        )
+
+def gammas_v(
+    bx: np.ndarray,
+    by: np.ndarray,
+    ) -> tuple:
+    '''
+    array version of gamma_v
+    '''
+    bx = np.asarray(bx, dtype=float)
+    by = np.asarray(by, dtype=float)
+    gamma_fx = 1 / (1 + (2 / 3) * np.sqrt(by / bx))
+    gamma_fy = 1 / (1 + (2 / 3) * np.sqrt(bx / by))
+    return 1 - gamma_fx, 1 - gamma_fy
+
+def allowable_stresses(
+    bx: np.ndarray,
+    by: np.ndarray,
+    alpha_s: np.ndarray,
+    fc: np.ndarray,
+    b0: np.ndarray,
+    b0d: np.ndarray,
+    d: np.ndarray,
+    phi_c: float = .75,
+    ACI2019: bool = False,
+    ) -> tuple:
+    '''
+    return arrays of one way shear capacity and Vc in N and vc in MPa of
+    punches, fc in MPa and lengths in mm. if ACI2019 is True, the size
+    effect factor lambda_s of ACI 318-19 is applied.
+    '''
+    bx = np.asarray(bx, dtype=float)
+    by = np.asarray(by, dtype=float)
+    d = np.asarray(d, dtype=float)
+    b0 = np.asarray(b0, dtype=float)
+    b0d = np.asarray(b0d, dtype=float)
+    beta = bx / by
+    beta = np.where(beta < 1, by / bx, beta)
+    one_way_shear_capacity = np.sqrt(fc) * b0d / 6 * phi_c
+    if ACI2019:
+        lambda_s = np.minimum(np.sqrt(2 / (1 + .004 * d)), 1)
+        one_way_shear_capacity = one_way_shear_capacity * lambda_s
+    Vc1 = one_way_shear_capacity * 2
+    Vc2 = one_way_shear_capacity * (1 + 2 / beta)
+    Vc3 = one_way_shear_capacity * (2 + alpha_s * d / b0) / 2
+    Vc = np.minimum(np.minimum(Vc1, Vc2), Vc3)
+    vc = Vc / b0d
+    return one_way_shear_capacity, Vc, vc
+
+def get_stirrups_n(locations) -> np.ndarray:
+    '''
+    return the number of quarters of circle around column that stirrups
+    are arranged for an array of punch locations
+    '''
+    locations = np.asarray(locations, dtype=str)
+    return np.select(
+        [
+            np.char.find(locations, 'Corner') >= 0,
+            np.char.find(locations, 'Edge') >= 0,
+            locations == 'Interior',
+        ],
+        [4, 2, 1],
+        0,
+        )
+
+def stirrups_design(
+    Vu: np.ndarray,
+    Vc: np.ndarray,
+    fc: np.ndarray,
+    d: np.ndarray,
+    n: np.ndarray,
+    Av: np.ndarray,
+    Fys: np.ndarray,
+    phi: float = .75,
+    ) -> tuple:
+    '''
+    return arrays of distance between stirrups s and required length x for
+    arranging stirrups in mm and shear force of stirrups Vs in N. Vu and Vc
+    in N, fc and Fys in MPa, d in mm, Av in mm^2 and n from get_stirrups_n.
+    '''
+    Vu = np.asarray(Vu, dtype=float)
+    Vc = np.asarray(Vc, dtype=float)
+    d = np.asarray(d, dtype=float)
+    Av = np.asarray(Av, dtype=float)
+    Fys = np.asarray(Fys, dtype=float)
+    Av_over_s = (Vu / phi - Vc) / (Fys * d)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = np.maximum(0, Av / Av_over_s)
+        Vs = np.where(s == 0, 0, Av * Fys * d / s)
+    b0_prim = Vu * 6 / (np.sqrt(fc) * d)
+    x = n * b0_prim / (2 * math.pi) - d / 2
+    x = np.maximum(x, 0)
+    return s, Vs, x
+
+LOCATION_NORMALS = {
+        'Corner 3': [(0, -1, 0), (-1, 0, 0)],
+        'Corner 4': [(0, -1, 0), (1, 0, 0)],
+        'Corner 1': [(0, 1, 0), (1, 0, 0)],
+        'Corner 2': [(0, 1, 0), (-1, 0, 0)],
+        'Edge 3': [(0, -1, 0), (-1, 0, 0), (1, 0, 0)],
+        'Edge 4': [(0, -1, 0), (1, 0, 0), (0, 1, 0)],
+        'Edge 1': [(0, 1, 0), (1, 0, 0), (-1, 0, 0)],
+        'Edge 2': [(0, 1, 0), (-1, 0, 0), (0, -1, 0)],
+        'Interior': [(0, 1, 0), (-1, 0, 0), (0, -1, 0), (1, 0, 0)]
+        }
+
 def get_user_location_faces(
                             faces: List[Part.Face],
                             location: str,
                             ) -> List[Part.Face]:
 
-    location_normals = {
-            'Corner 3': [(0, -1, 0), (-1, 0, 0)],
-            'Corner 4': [(0, -1, 0), (1, 0, 0)],
-            'Corner 1': [(0, 1, 0), (1, 0, 0)],
-            'Corner 2': [(0, 1, 0), (-1, 0, 0)],
-            'Edge 3': [(0, -1, 0), (-1, 0, 0), (1, 0, 0)],
-            'Edge 4': [(0, -1, 0), (1, 0, 0), (0, 1, 0)],
-            'Edge 1': [(0, 1, 0), (1, 0, 0), (-1, 0, 0)],
-            'Edge 2': [(0, 1, 0), (-1, 0, 0), (0, -1, 0)],
-            'Interior': [(0, 1, 0), (-1, 0, 0), (0, -1, 0), (1, 0, 0)]
-            }
-
-    normals = location_normals[location]
+    normals = LOCATION_NORMALS[location]
     if len(normals) >= len(faces):
         return faces
     new_faces = []
@@ -302,6 +422,197 @@ def get_user_location_faces(
             new_faces.append(f)
     return new_faces
 
+def get_user_location_sides(
+                            sides: list,
+                            location: str,
+                            ) -> list:
+    '''
+    the same as get_user_location_faces for sides of get_critical_sides
+    '''
+    normals = LOCATION_NORMALS[location]
+    if len(normals) >= len(sides):
+        return sides
+    return [side for side in sides if (*side[2], 0) in normals]
+
+def get_plan_polygons(
+    plan: Part.Shape,
+    ) -> Union[list, None]:
+    '''
+    return the edges of each face of plan as an (n, 4) array of straight
+    segments x1, y1, x2, y2. return None if plan has a curved edge, the
+    critical section of punches on this plan must be computed with OCC.
+    '''
+    polygons = []
+    for face in plan.Faces:
+        segments = []
+        for e in face.Edges:
+            if not isinstance(e.Curve, Part.Line):
+                return None
+            p1 = e.firstVertex().Point
+            p2 = e.lastVertex().Point
+            segments.append((p1.x, p1.y, p2.x, p2.y))
+        polygons.append(np.array(segments, dtype=float).reshape(-1, 4))
+    if not polygons:
+        return None
+    return polygons
+
+def rotate_segments(
+    segments: np.ndarray,
+    center: FreeCAD.Vector,
+    angle: float,
+    ) -> np.ndarray:
+    '''
+    rotate (n, 4) segments x1, y1, x2, y2 about center by angle in degrees
+    '''
+    a = math.radians(angle)
+    c = math.cos(a)
+    s = math.sin(a)
+    origin = np.array([center.x, center.y])
+    points = segments.reshape(-1, 2) - origin
+    points = points @ np.array([[c, s], [-s, c]]) + origin
+    return points.reshape(-1, 4)
+
+def is_inside_polygons(
+    points: np.ndarray,
+    polygons: list,
+    ) -> np.ndarray:
+    '''
+    return a boolean array that shows which of (k, 2) points are inside any
+    of polygons, each polygon is the (n, 4) segments of a face with holes
+    '''
+    px = points[:, 0:1]
+    py = points[:, 1:2]
+    inside = np.zeros(len(points), dtype=bool)
+    for segments in polygons:
+        x1, y1, x2, y2 = (segments[:, i] for i in range(4))
+        crossing = (y1 > py) != (y2 > py)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x = (x2 - x1) * (py - y1) / (y2 - y1) + x1
+        crossing &= px < x
+        inside |= (np.count_nonzero(crossing, axis=1) % 2) == 1
+    return inside
+
+def get_critical_sides(
+    polygons: list,
+    center: FreeCAD.Vector,
+    bx: float,
+    by: float,
+    angle: float = 0,
+    tol: float = PART_TOLERANCE,
+    ) -> Union[list, None]:
+    '''
+    clip the sides of the rectangle with center and dimensions bx, by with
+    plan polygons of get_plan_polygons rotated by angle about center. return
+    the parts of sides inside the plan as tuples of start point, end point
+    and outward normal. the sides are clockwise, so extruding them toward -z
+    gives faces with outward normals like punch_area_edges and punch_faces.
+    return None where the result depends on the fuzzy value of OCC boolean,
+    when a vertex or an edge of plan is nearer than tol to the rectangle.
+    '''
+    if angle != 0:
+        polygons = [rotate_segments(segments, center, angle) for segments in polygons]
+    segments = np.concatenate(polygons)
+    dx = bx / 2
+    dy = by / 2
+    # vertices of plan near the sides of rectangle
+    points = segments.reshape(-1, 2)
+    ax = np.abs(points[:, 0] - center.x)
+    ay = np.abs(points[:, 1] - center.y)
+    outer = (ax <= dx + tol) & (ay <= dy + tol)
+    inner = (ax < dx - tol) & (ay < dy - tol)
+    if np.any(outer & ~inner):
+        return None
+    a = segments[:, 0:2]
+    s = segments[:, 2:4] - a
+    s_length = np.hypot(s[:, 0], s[:, 1])
+    corners = [
+        (center.x - dx, center.y - dy),
+        (center.x - dx, center.y + dy),
+        (center.x + dx, center.y + dy),
+        (center.x + dx, center.y - dy),
+        ]
+    # plan edges near the corners of rectangle
+    for corner in corners:
+        ac = np.array(corner) - a
+        with np.errstate(divide='ignore', invalid='ignore'):
+            u = np.clip((ac * s).sum(axis=1) / s_length ** 2, 0, 1)
+        u = np.nan_to_num(u)
+        dist = np.hypot(*(ac - u[:, None] * s).T)
+        if np.any(dist <= tol):
+            return None
+    normals = [(-1, 0), (0, 1), (1, 0), (0, -1)]
+    sides = []
+    for i, normal in enumerate(normals):
+        p = np.array(corners[i])
+        r = np.array(corners[(i + 1) % 4]) - p
+        length = math.hypot(*r)
+        ap = a - p
+        denom = r[0] * s[:, 1] - r[1] * s[:, 0]
+        dist = np.abs(ap[:, 0] * r[1] - ap[:, 1] * r[0]) / length
+        parallel = np.abs(denom) <= 1e-12 * length * s_length
+        # plan edges along the side
+        if np.any(parallel & (dist <= tol)):
+            return None
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = (ap[:, 0] * s[:, 1] - ap[:, 1] * s[:, 0]) / denom
+            u = (ap[:, 0] * r[1] - ap[:, 1] * r[0]) / denom
+        cross = ~parallel & (u >= 0) & (u <= 1) & (t > -tol / length) & (t < 1 + tol / length)
+        ts = np.sort(t[cross])
+        if np.any((ts * length <= tol) | ((1 - ts) * length <= tol)):
+            return None
+        ts = np.concatenate(([0], ts, [1]))
+        mids = p + np.outer((ts[:-1] + ts[1:]) / 2, r)
+        inside = is_inside_polygons(mids, polygons)
+        for t1, t2, is_inside in zip(ts[:-1], ts[1:], inside):
+            if is_inside:
+                sides.append((tuple((p + t1 * r).tolist()), tuple((p + t2 * r).tolist()), normal))
+    return sides
+
+def get_critical_section_properties(
+    sides: list,
+    d: float,
+    z: float = 0,
+    ) -> tuple:
+    '''
+    return b0, area, center of mass, I22, I33 and I23 of the faces of sides
+    extruded by d toward -z from z. it gives the same values as
+    length_of_edges, area, center_of_mass and moment_inertia of the faces of
+    punch_faces. raise ValueError if there is no side.
+    '''
+    if not sides:
+        raise ValueError('critical section has no side')
+    p1 = np.array([side[0] for side in sides])
+    p2 = np.array([side[1] for side in sides])
+    normals = np.array([side[2] for side in sides])
+    lengths = np.hypot(*(p2 - p1).T)
+    areas = lengths * d
+    centers = (p1 + p2) / 2
+    b0 = lengths.sum()
+    A = areas.sum()
+    x_bar, y_bar = areas @ centers / A
+    dx = np.abs(centers[:, 0] - x_bar)
+    dy = np.abs(centers[:, 1] - y_bar)
+    # moment of inertia of each face about its center of mass
+    ii = areas * (lengths ** 2 + d ** 2) / 12
+    normal_x = normals[:, 0] != 0
+    Ixx = np.where(normal_x, ii + areas * dy ** 2, areas * dy ** 2).sum()
+    Iyy = np.where(normal_x, areas * dx ** 2, ii + areas * dx ** 2).sum()
+    Ixy = (areas * dx * dy).sum()
+    com = FreeCAD.Vector(x_bar, y_bar, z - d / 2)
+    return float(b0), float(A), com, float(Ixx), float(Iyy), float(Ixy)
+
+def sides_edges(
+    sides: list,
+    z: float = 0,
+    ) -> List[Part.Edge]:
+    edges = []
+    for p1, p2, _ in sides:
+        edges.append(Part.makeLine(
+            FreeCAD.Vector(p1[0], p1[1], z),
+            FreeCAD.Vector(p2[0], p2[1], z),
+            ))
+    return edges
+
 def sort_vertex(coords):
     if len(coords) < 2:
         return coords
@@ -414,13 +725,57 @@ def get_points_inside_base_foundations(
     '''
     points = get_bf_points(base_foundations)
     d = {key: set() for key in points}
+    tol = 1
+    boxes = []
+    for base in base_foundations:
+        bb = base.plan.BoundBox
+        boxes.append((bb.XMin, bb.YMin, bb.XMax, bb.YMax))
+    grid = BoundBoxGrid(boxes, tol=tol)
     for p in points:
         point = FreeCAD.Vector(p)
-        for base in base_foundations:
-            if base.plan.isInside(point, 1, True):
+        for i in grid.query(p[0], p[1]):
+            base = base_foundations[i]
+            if base.plan.isInside(point, tol, True):
                 d[p].add(base.Name)
     return d
 
+class BoundBoxGrid:
+    '''
+    uniform grid over the xy bound boxes (xmin, ymin, xmax, ymax) of items,
+    query returns the indexes of items that their bound box, expanded by tol,
+    contains the point. it is used to prune the candidates before the exact
+    and expensive isInside tests.
+    '''
+    def __init__(self,
+        boxes : list,
+        cell_size : Union[float, None] = None,
+        tol : float = 0,
+        ):
+        self.tol = tol
+        self.boxes = [(x1 - tol, y1 - tol, x2 + tol, y2 + tol) for x1, y1, x2, y2 in boxes]
+        if cell_size is None:
+            sizes = [max(x2 - x1, y2 - y1) for x1, y1, x2, y2 in self.boxes]
+            cell_size = sum(sizes) / len(sizes) if sizes else 1
+        self.cell_size = max(cell_size, PART_TOLERANCE)
+        self.cells = {}
+        for i, (x1, y1, x2, y2) in enumerate(self.boxes):
+            i1, j1 = self.cell(x1, y1)
+            i2, j2 = self.cell(x2, y2)
+            for ix in range(i1, i2 + 1):
+                for jy in range(j1, j2 + 1):
+                    self.cells.setdefault((ix, jy), []).append(i)
+
+    def cell(self, x, y) -> tuple:
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def query(self, x, y) -> list:
+        indexes = []
+        for i in self.cells.get(self.cell(x, y), []):
+            x1, y1, x2, y2 = self.boxes[i]
+            if x1 <= x <= x2 and y1 <= y <= y2:
+                indexes.append(i)
+        return indexes
+
 def get_bf_points(bfs):
     points = set()
     for bf in bfs:
@@ -554,7 +909,16 @@ def offset_frame_points(x1, y1, x2, y2, distance, neg:bool):
     y2_offset = y2 + dy
     return x1_offset, y1_offset, x2_offset, y2_offset
 
-def get_common_part_of_base_foundation(base_foundations):
+def get_common_part_of_base_foundation(
+        base_foundations,
+        cache : Union['ShapeCache', None] = None,
+        ):
+    '''
+    return the common shapes of base foundations at their junctions by point
+    and by base foundation name. if cache is given, the common shape of a
+    junction is reused while the extended shapes of its base foundations are
+    not changed.
+    '''
     if len(base_foundations) < 2:
         return {}, {}
     points_base_connections = get_points_inside_base_foundations(base_foundations)
@@ -563,9 +927,17 @@ def get_common_part_of_base_foundation(base_foundations):
     for point, names in points_base_connections.items():
         if len(names) > 1:
             bases = [FreeCAD.ActiveDocument.getObject(name) for name in names]
-            comm = bases[0].extended_shape
-            for base in bases[1:]:
-                comm = comm.common(base.extended_shape)
+            comm = None
+            if cache is not None:
+                key = ('common', point) + tuple(sorted(
+                    (base.Name, get_shape_key(base.extended_shape)) for base in bases))
+                comm = cache.get(key)
+            if comm is None:
+                comm = bases[0].extended_shape
+                for base in bases[1:]:
+                    comm = comm.common(base.extended_shape)
+                if cache is not None:
+                    cache.put(key, comm)
             points_common_shape[point] = comm
             for name in names:
                 commons = base_name_common_shape.get(name, None)
@@ -607,6 +979,7 @@ def get_foundation_shape_from_base_foundations(
         split_mat : bool = True,
         slabs : list = [],
         tol : float = 0,
+        cache : Union['ShapeCache', None] = None,
         ):
     '''
     Creates Foundation shapes from base foundations objects. if height is 0, the height of each base foundations
@@ -614,6 +987,10 @@ def get_foundation_shape_from_base_foundations(
     continuoues_dir : in Strip foundation, the strips with layer name equals to continuoues_dir get
         continuoes and other side cut with this shapes
     tol: for remove colineare lines from face of foundation
+    cache: the ShapeCache of foundation, the shapes of base foundations, their
+        junctions and the fused groups of plan that their inputs are not
+        changed since the last call are reused from it. the first_edge and
+        last_edge of a reused base foundation are restored from the cache too
     '''
     shapes = []
     outer_wire = Part.Shape()
@@ -624,19 +1001,15 @@ def get_foundation_shape_from_base_foundations(
         else:
             heights = [height] * len(base_foundations)
         openings_shapes = [o.Shape for o in openings]
-        points_common_shape, base_name_common_shape = get_common_part_of_base_foundation(base_foundations)
+        openings_key = tuple(get_shape_key(sh) for sh in openings_shapes)
+        points_common_shape, base_name_common_shape = get_common_part_of_base_foundation(base_foundations, cache)
         used_commons_center_point = []
         for base_foundation, height in zip(base_foundations, heights):
-            shape = get_continuous_base_foundation_shape(
-                    base_foundation,
-                    points_common_shape,
-                    height,
-                    )
+            unused_common = []
             if foundation_type == 'Strip' and \
                 continuous_layer != 'AB' and \
                 base_foundation.layer != continuous_layer:
                 commons = base_name_common_shape.get(base_foundation.Name, None)
-                unused_common = []
                 if commons:
                     for comm in commons:
                         for p in used_commons_center_point:
@@ -645,10 +1018,36 @@ def get_foundation_shape_from_base_foundations(
                         else:
                             used_commons_center_point.append(comm.BoundBox.Center)
                             unused_common.append(comm)
+            shape = None
+            if cache is not None:
+                start_end_commons = [points_common_shape.get(tuple(p), None) for p in (base_foundation.Base.Start, base_foundation.Base.End)]
+                key = (
+                    'base',
+                    base_foundation.Name,
+                    get_shape_key(base_foundation.plan),
+                    height,
+                    foundation_type,
+                    tuple(get_shape_key(comm) if comm is not None else None for comm in start_end_commons),
+                    tuple(get_shape_key(comm) for comm in unused_common),
+                    openings_key if foundation_type == 'Strip' else (),
+                    )
+                entry = cache.get(key)
+                if entry is not None:
+                    # restore the side effects of get_continuous_base_foundation_shape
+                    shape, base_foundation.first_edge, base_foundation.last_edge = entry
+            if shape is None:
+                shape = get_continuous_base_foundation_shape(
+                        base_foundation,
+                        points_common_shape,
+                        height,
+                        )
+                if unused_common:
                     commons = [comm.extrude(FreeCAD.Vector(0, 0, -height)) for comm in unused_common]
                     shape = shape.cut(commons, PART_TOLERANCE)
-            if foundation_type == 'Strip' and openings:
-                shape = shape.cut(openings_shapes, PART_TOLERANCE)
+                if foundation_type == 'Strip' and openings:
+                    shape = cut_shapes_near(shape, openings_shapes)
+                if cache is not None:
+                    cache.put(key, (shape, base_foundation.first_edge, base_foundation.last_edge))
             shapes.append(shape)
             if foundation_type == 'Strip':
                 base_foundation.extended_plan = Part.makeCompound(get_top_faces(shape, tol=tol))
@@ -668,20 +1067,24 @@ def get_foundation_shape_from_base_foundations(
         else:
             shapes.append(comp_a)
             shapes.append(comp_b)
-    if len(shapes) > 1:
-        strip_shape = shapes[0].fuse(shapes[1:], PART_TOLERANCE)
-        strip_shape = strip_shape.removeSplitter()
-    else:
-        strip_shape = shapes[0]
+    # fuse the top faces in plan instead of the solids, the faces of
+    # neighbouring shapes are fused in groups
+    z_max = max(sh.BoundBox.ZMax for sh in shapes)
+    top_faces = []
+    for sh in shapes:
+        for f in get_top_faces(sh):
+            if math.isclose(f.BoundBox.ZMax, z_max, abs_tol=0.1):
+                top_faces.append(f)
+    top_face = fuse_shapes(top_faces, cache=cache)
     if foundation_type == 'Strip':
         shape = Part.makeCompound(shapes)
-        plan = get_top_faces(strip_shape, fuse=True, tol=tol, remove_colinear_edge=False)
+        plan = top_face
     elif foundation_type == 'Mat':
         if height == 0:
             from collections import Counter
             counts = Counter(heights)
             height = counts.most_common[0][0]
-        outer_wire = get_top_faces(strip_shape, fuse=True, tol=tol).OuterWire
+        outer_wire = top_face.OuterWire
         plan_without_openings = Part.Face(outer_wire)
         if split_mat:
             faces = split_face_with_scales(plan_without_openings)
@@ -689,7 +1092,7 @@ def get_foundation_shape_from_base_foundations(
             for face in faces:
                 shape = face.extrude(FreeCAD.Vector(0, 0, -height))
                 if openings:
-                    shape = shape.cut(openings_shapes, PART_TOLERANCE)
+                    shape = cut_shapes_near(shape, openings_shapes)
                 shapes.append(shape)
             shape = Part.makeCompound(shapes)
         else:
@@ -702,8 +1105,124 @@ def get_foundation_shape_from_base_foundations(
         if mat_slabs_shapes:
             shape = shape.fuse(mat_slabs_shapes, PART_TOLERANCE)
             shape = shape.removeSplitter()
+    if cache is not None:
+        cache.prune()
     return shape, outer_wire, plan, plan_without_openings
 
+def fuse_shapes(
+        shapes : list,
+        group_size : int = 8,
+        cache : Union['ShapeCache', None] = None,
+        ):
+    '''
+    fuse shapes hierarchically. shapes are sorted by tiles of their bound box
+    centers, then each group of group_size neighbouring shapes is fused and
+    the results are fused again in groups until one shape remains. if cache
+    is given, the fused groups that their shapes are not changed are reused,
+    so changing one shape only fuses the groups on its way to the result.
+    '''
+    if not shapes:
+        return Part.Shape()
+    if len(shapes) > group_size:
+        bb = FreeCAD.BoundBox()
+        for sh in shapes:
+            bb.add(sh.BoundBox)
+        n_tiles = max(1, int(math.sqrt(len(shapes) / group_size)))
+        tile = max(bb.XLength, bb.YLength) / n_tiles or 1
+
+        def tile_key(sh):
+            center = sh.BoundBox.Center
+            return (
+                math.floor((center.y - bb.YMin) / tile),
+                math.floor((center.x - bb.XMin) / tile),
+                center.x,
+                center.y,
+                )
+
+        shapes = sorted(shapes, key=tile_key)
+    while len(shapes) > 1:
+        fused = []
+        for i in range(0, len(shapes), group_size):
+            group = shapes[i: i + group_size]
+            if len(group) == 1:
+                fused.append(group[0])
+                continue
+            sh = None
+            if cache is not None:
+                key = ('fuse',) + tuple(get_shape_key(g) for g in group)
+                sh = cache.get(key)
+            if sh is None:
+                sh = group[0].fuse(group[1:], PART_TOLERANCE)
+                sh = sh.removeSplitter()
+                if cache is not None:
+                    cache.put(key, sh)
+            fused.append(sh)
+        shapes = fused
+    return shapes[0]
+
+def get_shape_key(shape) -> tuple:
+    '''
+    return a key of shape for ShapeCache, the bound box and area are added
+    to hash code because the hash code of a removed shape can be reused
+    '''
+    bb = shape.BoundBox
+    return (
+        shape.hashCode(),
+        round(bb.XMin, 3),
+        round(bb.YMin, 3),
+        round(bb.XMax, 3),
+        round(bb.YMax, 3),
+        round(shape.Area, 3),
+        )
+
+class ShapeCache:
+    '''
+    shapes that are built for a foundation by keys of their input geometry.
+    prune removes the shapes that are not used since the last prune, so the
+    cache only holds the shapes of the last build.
+    '''
+    def __init__(self):
+        self.shapes = {}
+        self.used = set()
+
+    def get(self, key):
+        shape = self.shapes.get(key, None)
+        if shape is not None:
+            self.used.add(key)
+        return shape
+
+    def put(self, key, shape):
+        self.shapes[key] = shape
+        self.used.add(key)
+
+    def prune(self):
+        self.shapes = {key: self.shapes[key] for key in self.used}
+        self.used = set()
+
+    def clear(self):
+        self.shapes.clear()
+        self.used = set()
+
+    def __len__(self):
+        return len(self.shapes)
+
+    def __contains__(self, key):
+        return key in self.shapes
+
+def cut_shapes_near(
+        shape,
+        tools : list,
+        ):
+    '''
+    cut the tools that their bound box intersect with bound box of shape from
+    shape
+    '''
+    bb = shape.BoundBox
+    tools = [t for t in tools if t.BoundBox.intersect(bb)]
+    if tools:
+        shape = shape.cut(tools, PART_TOLERANCE)
+    return shape
+
 def get_continuous_base_foundation_shape(
         base_foundation,
         points_common_shape,
@@ -2056,4 +2575,69 @@ def format_view_object(
         obj.ViewObject.ShapeColor = shape_color
         obj.ViewObject.LineColor = line_color
         obj.ViewObject.PointColor = point_color
-        obj.ViewObject.Transparency = transparency
\ No newline at end of file
+        obj.ViewObject.Transparency = transparency
+
+def get_python_executable() -> Union[str, None]:
+    '''
+    return the python interpreter that can be used for worker processes.
+    inside FreeCAD, sys.executable is FreeCAD itself and the python
+    interpreter is searched near it.
+    '''
+    executable = Path(sys.executable)
+    if executable.stem.lower().startswith('python'):
+        return str(executable)
+    for name in ('python', 'python3', 'python.exe'):
+        for directory in (executable.parent, executable.parent.parent / 'bin'):
+            path = directory / name
+            if path.exists():
+                return str(path)
+    return None
+
+# minimum number of tasks that are sent to a process pool, smaller batches
+# are computed serially
+PROCESS_POOL_MIN_TASKS = 16
+process_pools = {}
+
+def get_process_pool(
+    processes : int,
+    n_tasks : Union[int, None] = None,
+    ):
+    '''
+    return a ProcessPoolExecutor with spawn start method and processes
+    workers. the pool of each number of workers is created once and reused,
+    so the workers start and import FreeCAD only once, the pools are shut
+    down at exit. return None if there is no python interpreter for workers
+    or n_tasks is less than PROCESS_POOL_MIN_TASKS.
+    '''
+    if n_tasks is not None and n_tasks < PROCESS_POOL_MIN_TASKS:
+        return None
+    pool = process_pools.get(processes)
+    if pool is not None:
+        return pool
+    import concurrent.futures
+    import multiprocessing
+    executable = get_python_executable()
+    if executable is None:
+        return None
+    context = multiprocessing.get_context('spawn')
+    context.set_executable(executable)
+    pool = concurrent.futures.ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=context,
+        )
+    if not process_pools:
+        atexit.register(shutdown_process_pools)
+    process_pools[processes] = pool
+    return pool
+
+def shutdown_process_pool(processes : int) -> None:
+    '''
+    shut down and remove the pool of processes workers, e.g. when it is broken
+    '''
+    pool = process_pools.pop(processes, None)
+    if pool is not None:
+        pool.shutdown(wait=False)
+
+def shutdown_process_pools() -> None:
+    for processes in list(process_pools):
+        shutdown_process_pool(processes)
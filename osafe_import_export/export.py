@@ -122,9 +122,10 @@ def to_excel(
              filename: str,
              ):
     import pandas as pd
+    from osafe_objects.punch import get_punch_combos_ratio
     combos_ratios = pd.concat(
         [
-        pd.Series(p.combos_ratio) for p in punches
+        pd.Series(get_punch_combos_ratio(p)) for p in punches
         ],
         axis=1)
     combos_ratios.to_excel(filename)
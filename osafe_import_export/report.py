@@ -270,7 +270,8 @@ def export_dict_to_doc(
     
 
 def add_punch_ratios_to_doc(punch, doc=None):
-    doc = export_dict_to_doc(punch.combos_ratio, ['Combo', 'Ratio'], doc, style='DATAFRAME')
+    from osafe_objects.punch import get_punch_combos_ratio
+    doc = export_dict_to_doc(get_punch_combos_ratio(punch), ['Combo', 'Ratio'], doc, style='DATAFRAME')
     return doc
 
 def add_punch_properties_to_doc(punch, doc=None):
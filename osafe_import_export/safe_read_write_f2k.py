@@ -1,6 +1,18 @@
+from collections.abc import MutableMapping
 from pathlib import Path
 from typing import Union
+import functools
+import hashlib
+import itertools
+import json
+import locale
 import math
+import mmap
+import os
+import re
+import tempfile
+
+import numpy as np
 
 try:
     import FreeCAD
@@ -9,20 +21,550 @@ try:
 except:
     pass
 
-__all__ = ['Safe', 'Safe12', 'FreecadReadwriteModel']
+__all__ = ['Safe', 'Safe12', 'FreecadReadwriteModel', 'TablesContents', 'PointsIndex', 'F2kTable', 'F2kDialect']
+
+
+class MappedTable():
+    '''
+    Content of a table in a memory mapped f2k file, it is decoded only when
+    the table is accessed
+    '''
+    __slots__ = ('buffer', 'start', 'end', 'encoding')
+
+    def __init__(self, buffer, start : int, end : int, encoding : str):
+        self.buffer = buffer
+        self.start = start
+        self.end = end
+        self.encoding = encoding
+
+    def decode(self) -> str:
+        content = self.buffer[self.start:self.end].decode(self.encoding)
+        # same as universal newlines of text mode files
+        return content.replace('\r\n', '\n').replace('\r', '\n')
+
+
+class TablesContents(MutableMapping):
+    '''
+    Ordered mapping of table key to table content. The tables read from f2k
+    file are kept as a list of lines and only joined to a string when they
+    are accessed, so reading a big file does not copy every table content.
+    The contents appended to a table are kept as chunks in the same list.
+    The tables of a memory mapped file are MappedTable and decoded on access.
+    '''
+    def __init__(self, tables: Union[dict, None] = None):
+        self._tables = {}
+        if tables is not None:
+            self.update(tables)
+
+    def _get_content(self, table_key):
+        content = self._tables[table_key]
+        if isinstance(content, MappedTable):
+            content = self._tables[table_key] = content.decode()
+        return content
+
+    def __getitem__(self, table_key):
+        content = self._get_content(table_key)
+        if not isinstance(content, str):
+            content = ''.join(content)
+            self._tables[table_key] = content
+        return content
+
+    def __setitem__(self, table_key, content):
+        self._tables[table_key] = content
+
+    def __delitem__(self, table_key):
+        del self._tables[table_key]
+
+    def __iter__(self):
+        return iter(self._tables)
+
+    def __len__(self):
+        return len(self._tables)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({list(self._tables)})'
+
+    def lines(self, table_key):
+        '''
+        return the lines of table without joining them
+        '''
+        lines = []
+        for chunk in self.chunks(table_key):
+            lines.extend(chunk.splitlines(keepends=True))
+        return lines
+
+    def chunks(self, table_key) -> list:
+        '''
+        return the list of strings that table content is made of
+        '''
+        content = self._get_content(table_key)
+        if isinstance(content, str):
+            return [content]
+        return content
+
+    def append(self, table_key, content : Union[str, list]):
+        '''
+        add content to the end of table without copying the current content,
+        content can be a string or a list of strings
+        '''
+        if table_key not in self._tables:
+            chunks = self._tables[table_key] = []
+        else:
+            chunks = self._get_content(table_key)
+        if isinstance(chunks, str):
+            chunks = self._tables[table_key] = [chunks]
+        if isinstance(content, str):
+            chunks.append(content)
+        else:
+            chunks.extend(content)
+
+    def load(self):
+        '''
+        decode all memory mapped tables
+        '''
+        for table_key in self._tables:
+            self._get_content(table_key)
+
+
+class PointsIndex():
+    '''
+    Grid hash of points coordinates for finding an existing point near a
+    coordinate. each coordinate is hashed to a cell with size equal to tol,
+    so only the 27 cells around a coordinate must be checked.
+    '''
+    def __init__(self, tol: float = .001):
+        self.tol = tol
+        self._cells = {}
+        self._n = 0
+        self._pending = []
+
+    def __len__(self):
+        return self._n
+
+    def get_cell(self, coordinate: list) -> tuple:
+        return tuple(math.floor(c / self.tol) for c in coordinate)
+
+    def add(self,
+            name,
+            coordinate : list,
+            ):
+        if len(coordinate) != 3:
+            return
+        cell = self.get_cell(coordinate)
+        self._cells.setdefault(cell, []).append((self._n, str(name), coordinate))
+        self._n += 1
+
+    def extend(self,
+            names : list,
+            coordinates : np.ndarray,
+            ):
+        '''
+        add the points with names at (N, 3) array of coordinates. points are
+        hashed to cells at once, the first time that find is called.
+        '''
+        coordinates = np.asarray(coordinates, dtype=float).reshape(-1, 3)
+        self._pending.append((self._n, names, coordinates))
+        self._n += len(coordinates)
+
+    def _add_pending(self):
+        setdefault = self._cells.setdefault
+        for start, names, coordinates in self._pending:
+            cells = np.floor(coordinates / self.tol).astype(np.int64).tolist()
+            for n, name, cell, coordinate in zip(
+                    range(start, start + len(cells)),
+                    names,
+                    cells,
+                    coordinates.tolist(),
+                    ):
+                setdefault(tuple(cell), []).append((n, str(name), coordinate))
+        self._pending = []
+
+    def find(self,
+            coordinate : list,
+            ):
+        '''
+        return the name of first added point that is close to coordinate
+        '''
+        if self._pending:
+            self._add_pending()
+        i, j, k = self.get_cell(coordinate)
+        tol = self.tol
+        x, y, z = coordinate
+        found = None
+        for di in (-1, 0, 1):
+            for dj in (-1, 0, 1):
+                for dk in (-1, 0, 1):
+                    for point in self._cells.get((i + di, j + dj, k + dk), ()):
+                        coord = point[2]
+                        # only an absolute tolerance, the same as the cell size
+                        if (
+                            abs(coord[0] - x) <= tol and
+                            abs(coord[1] - y) <= tol and
+                            abs(coord[2] - z) <= tol and
+                            (found is None or point[0] < found[0])
+                            ):
+                            found = point
+        if found is None:
+            return None
+        return found[1]
+
+
+class F2kTable():
+    '''
+    Columnar view of one SAFE 14/16 table. Each row of table is parsed to
+    Key=Value fields and the values of each field are stored in a numpy
+    array, so queries on a table do not need to tokenize the text again.
+    The original lines are kept and to_string returns exactly the content
+    that table is created from, only the rows changed by set_value are
+    written again.
+    '''
+    field_pattern = re.compile(r'(\s*)([^\s="]+)=("[^"]*"|\S*)')
+    row_pattern = re.compile(r'(?:\s*[^\s="]+=(?:"[^"]*"|\S*))+\s*')
+
+    def __init__(self, content : str = ''):
+        self.fields = []
+        self._lines = content.splitlines(keepends=True)
+        self._rows_line = []
+        self._modified_rows = set()
+        columns = {}
+        n = 0
+        for i, line in enumerate(self._lines):
+            if '"' in line:
+                if not self.row_pattern.fullmatch(line):
+                    continue
+                items = [match.group(2, 3) for match in self.field_pattern.finditer(line)]
+            else:
+                items = [token.split('=', 1) for token in line.split()]
+                if not items or any(len(item) != 2 for item in items):
+                    continue
+            for field, value in items:
+                column = columns.get(field)
+                if column is None:
+                    column = columns[field] = []
+                    self.fields.append(field)
+                if len(column) < n:
+                    column.extend([None] * (n - len(column)))
+                column.append(value)
+            self._rows_line.append(i)
+            n += 1
+        self.n_rows = n
+        self.columns = {}
+        for field, column in columns.items():
+            values = np.full(n, None, dtype=object)
+            values[:len(column)] = column
+            self.columns[field] = values
+        self._floats = {}
+
+    def __len__(self):
+        return self.n_rows
+
+    def __contains__(self, field):
+        return field in self.columns
+
+    def __getitem__(self, field) -> np.ndarray:
+        '''
+        return the values of field as written in f2k, None for rows without this field
+        '''
+        return self.columns[field]
+
+    def get_floats(self, field) -> np.ndarray:
+        '''
+        return the values of field as float array, nan for rows without this field
+        '''
+        values = self._floats.get(field)
+        if values is None:
+            column = self.columns[field]
+            values = np.array(
+                [np.nan if value is None else float(value) for value in column],
+                dtype=float,
+            )
+            self._floats[field] = values
+        return values
+
+    def get_texts(self, field) -> np.ndarray:
+        '''
+        return the values of field without quotes
+        '''
+        return np.array(
+            ['' if value is None else value.strip('"') for value in self.columns[field]],
+            dtype=object,
+        )
+
+    def to_records(self, fields : Union[list, None] = None) -> np.recarray:
+        '''
+        return the rows of table as numpy record array, numeric fields are
+        float and other fields are string
+        '''
+        if fields is None:
+            fields = self.fields
+        arrays = []
+        for field in fields:
+            try:
+                arrays.append(self.get_floats(field))
+            except ValueError:
+                arrays.append(self.get_texts(field).astype(str))
+        return np.rec.fromarrays(arrays, names=fields)
+
+    def set_value(self, row : int, field : str, value):
+        if self.columns[field][row] is None:
+            raise KeyError(f'{field} is not in row {row}')
+        self.columns[field][row] = f'{value}'
+        self._floats.pop(field, None)
+        self._modified_rows.add(row)
+
+    def to_string(self) -> str:
+        lines = self._lines
+        if self._modified_rows:
+            lines = lines.copy()
+            columns = self.columns
+            for row in self._modified_rows:
+                i = self._rows_line[row]
+                lines[i] = self.field_pattern.sub(
+                    lambda match: f'{match.group(1)}{match.group(2)}={columns[match.group(2)][row]}',
+                    lines[i],
+                )
+        return ''.join(lines)
+
+
+class UnitSystem():
+    '''
+    Conversion factors from the units of FreeCAD objects and design values
+    to the force and length units of f2k model. the factors are computed
+    once, when the units of model are read in Safe.force_length_unit.
+    '''
+    force_factors = {
+        'N': dict(N=1, KN=1000, Kgf=9.81, tonf=9810),
+        'KN': dict(N=.001, KN=1, Kgf=.00981, tonf=9.81),
+        'Kgf': dict(N=1/9.81, KN=1000/9.81, Kgf=1, tonf=1000),
+        'tonf': dict(N=.000981, KN=.981, Kgf=.001, tonf=1),
+    }
+    length_factors = {
+        'mm': dict(mm=1, cm=10, m=1000),
+        'cm': dict(mm=.1, cm=1, m=100),
+        'm': dict(mm=.001, cm=.01, m=1),
+    }
+
+    def __init__(self,
+            force_unit : str = 'Kgf',
+            length_unit : str = 'm',
+            ):
+        '''
+        force_unit can be 'N', 'KN', 'Kgf', 'tonf' and length_unit can be
+        'mm', 'cm', 'm', KeyError is raised for other units
+        '''
+        self.force_unit = force_unit
+        self.length_unit = length_unit
+        self.force_units = force = self.force_factors[force_unit]
+        self.length_units = length = self.length_factors[length_unit]
+        # lengths, FreeCAD lengths are in mm
+        self.mm = length['mm']
+        self.cm = length['cm']
+        self.m = length['m']
+        # area loads in kgf/m2
+        self.pressure = force['Kgf'] / length['m'] ** 2
+        # soil subgrade modulus in kgf/cm3
+        self.subgrade_modulus = force['Kgf'] / length['cm'] ** 3
+        # (force, length) factors of quantities that are converted with
+        # convert, the value is multiplied by force and divided by length
+        # line loads in kgf/m
+        self.line_load = (force['Kgf'], length['m'])
+        # stresses and modulus of elasticity in MPa
+        self.stress = (force['N'], length['mm'] ** 2)
+        # unit weight in kgf/m3
+        self.unit_weight = (force['Kgf'], length['m'] ** 3)
+
+    def convert_point(self, point) -> list:
+        '''
+        return the coordinate of point with x, y, z in mm in model length unit
+        '''
+        mm = self.mm
+        return [point.x * mm, point.y * mm, point.z * mm]
+
+    def convert_coordinates(self, coordinates : np.ndarray) -> np.ndarray:
+        '''
+        convert an (N, 3) array of coordinates in mm to model length unit
+        '''
+        return np.asarray(coordinates, dtype=float) * self.mm
+
+    def convert(self,
+            value : float,
+            factors : tuple,
+            ) -> float:
+        '''
+        convert value with the (force, length) factors of a quantity like
+        stress, value is multiplied by force before dividing by length so
+        the written values stay the same as the older f2k files
+        '''
+        force, length = factors
+        return value * force / length
+
+
+class F2kDialect():
+    '''
+    Format of f2k files of some versions of SAFE. the dialect describes the
+    table headers, the end of file and the layout of point and unit rows,
+    so Safe and Safe12 share one parse and write path.
+    '''
+    def __init__(self,
+            versions : tuple,
+            version_markers : tuple,
+            table_prefix : str,
+            table_header : str,
+            end_of_file : str,
+            points_table_key : str,
+            units_table_key : Union[str, None] = None,
+            keyed_fields : bool = True,
+            table_end_marker : Union[str, None] = None,
+            ):
+        '''
+        version_markers are (text, version) pairs that identify the version
+        in the first lines of file. if units_table_key is None, all tables
+        are searched for units. if keyed_fields is True, the fields of
+        rows are Key=Value pairs, otherwise rows are positional like
+        POINT "name" x y.
+        '''
+        self.versions = versions
+        self.version_markers = version_markers
+        self.table_prefix = table_prefix
+        self.table_header = table_header
+        self.end_of_file = end_of_file
+        self.points_table_key = points_table_key
+        self.units_table_key = units_table_key
+        self.keyed_fields = keyed_fields
+        self.table_end_marker = table_end_marker
+
+    def is_table_header(self, line : str) -> bool:
+        return line.startswith(self.table_prefix) or (
+            self.table_end_marker is not None and self.table_end_marker in line)
+
+    def find_table_headers(self, buffer) -> list:
+        '''
+        return the (start, end) offsets of lines of buffer that start with
+        table_prefix, end is the offset of newline at the end of line
+        '''
+        prefix = self.table_prefix.encode()
+        line_prefix = b'\n' + prefix
+        find = buffer.find
+        size = len(buffer)
+        headers = []
+        if buffer[:len(prefix)] == prefix:
+            start = 0
+        else:
+            start = find(line_prefix)
+            if start != -1:
+                start += 1
+        while start != -1:
+            end = find(b'\n', start)
+            if end == -1:
+                end = size
+            headers.append((start, end))
+            start = find(line_prefix, end)
+            if start != -1:
+                start += 1
+        return headers
+
+    def get_table_key(self, line : str) -> str:
+        if line.startswith(self.table_prefix):
+            line = line[len(self.table_prefix):]
+        key = line.strip()
+        if len(key) > 1 and key[0] == key[-1] == '"':
+            key = key[1:-1]
+        return key
+
+    def get_points_coordinates(self, content : str) -> dict:
+        points_coordinates = dict()
+        for line in content.split('\n'):
+            fields_values = line.split()
+            if not fields_values:
+                continue
+            if self.keyed_fields:
+                # Point=1 GlobalX=0 GlobalY=0 GlobalZ=0 SpecialPt=No
+                if len(fields_values) < 2:
+                    continue
+                point_name = fields_values[0].split('=')[1]
+                coordinates = [float(f.split('=')[1]) for f in fields_values[1:-1]]
+            else:
+                # POINT "1" 0 0
+                if fields_values[0] == 'POINT':
+                    fields_values = fields_values[1:]
+                point_name = fields_values[0].strip('"')
+                coordinates = [float(f) for f in fields_values[1:]]
+            points_coordinates[point_name] = coordinates
+        return points_coordinates
+
+    def get_units(self, lines) -> Union[tuple, None]:
+        '''
+        return force and length units from lines of the file, the first line
+        with units is used
+        '''
+        for line in lines:
+            if self.keyed_fields:
+                if 'CurrUnits=' not in line:
+                    continue
+                table = F2kTable(line)
+                force, length, _ = table.get_texts('CurrUnits')[0].split(', ')
+                return force, length
+            fields_values = line.split()
+            if fields_values and fields_values[0] == 'UNITS':
+                return tuple(fields_values[1:3])
+        return None
+
+    def get_version(self, content : str) -> Union[int, None]:
+        for marker, version in self.version_markers:
+            if marker in content:
+                return version
+        return None
+
+
+SAFE16_DIALECT = F2kDialect(
+    versions=(14, 16),
+    version_markers=(('Version=14', 14), ('Version=16', 16)),
+    table_prefix='TABLE:',
+    table_header='TABLE:  "{}"',
+    end_of_file='\nEND TABLE DATA',
+    points_table_key="OBJECT GEOMETRY - POINT COORDINATES",
+    units_table_key="PROGRAM CONTROL",
+    keyed_fields=True,
+    table_end_marker='END TABLE DATA',
+    )
+
+SAFE12_DIALECT = F2kDialect(
+    versions=(8, 12),
+    version_markers=(('SAFE "8', 8), ('SAFE 12', 12)),
+    table_prefix='$',
+    table_header='$ "{}"',
+    end_of_file='\n  END\n$ END OF MODEL FILE\n',
+    points_table_key="POINT COORDINATES",
+    keyed_fields=False,
+    )
+
+DIALECTS = (SAFE12_DIALECT, SAFE16_DIALECT)
 
 
 class Safe():
+    dialect = SAFE16_DIALECT
+
     def __init__(self,
             input_f2k_path : Path = None,
             output_f2k_path : Path = None,
+            use_mmap : bool = False,
         ) -> None:
+        '''
+        if use_mmap is True, the input file is memory mapped and only the
+        offsets of tables are read, each table is decoded when it is accessed
+        '''
         self.input_f2k_path = input_f2k_path
         if output_f2k_path is None:
             output_f2k_path = input_f2k_path
         self.output_f2k_path = output_f2k_path
         self.__file_object = None
-        self.tables_contents = {}
+        self.tables_contents = TablesContents()
+        self.points_index = None
+        self._tables = {}
+        # list of (table_key, chunks, append) that is filled by add_content_to_table
+        self.recorder = None
+        self.use_mmap = use_mmap
+        self._mmap = None
 
     def __enter__(self):
         self.__file_object = open(self.input_f2k_path, 'r')
@@ -32,60 +574,136 @@ class Safe():
         self.__file_object.close()
 
     def get_tables_contents(self):
+        '''
+        Read the f2k file in one pass, each table is stored as a list of it's
+        lines and joined when it is accessed from tables_contents
+        '''
+        if self.use_mmap:
+            return self.get_mapped_tables_contents()
+        tables_contents = TablesContents()
+        is_table_header = self.dialect.is_table_header
+        get_table_key = self.dialect.get_table_key
         with open(self.input_f2k_path, 'r') as reader:
-            lines = reader.readlines()
-            tables_contents = dict()
-            n = len("TABLE:  ")
-            context = ''
+            lines = []
             table_key = None
-            for line in lines:
-                if line.startswith("TABLE:") or "END TABLE DATA" in line:
-                    if table_key and context:
-                        tables_contents[table_key] = context
-                    context = ''
-                    table_key = line[n+1:-2]
+            for line in reader:
+                if is_table_header(line):
+                    if table_key and lines:
+                        tables_contents[table_key] = lines
+                    lines = []
+                    table_key = get_table_key(line)
                 else:
-                    context += line
+                    lines.append(line)
         self.tables_contents = tables_contents
+        self.points_index = None
+        self._tables = {}
         return tables_contents
 
+    def get_mapped_tables_contents(self):
+        '''
+        memory map the input file and find the offsets of table headers with
+        one scan, the content of each table is a MappedTable
+        '''
+        self.close_mmap()
+        tables_contents = TablesContents()
+        dialect = self.dialect
+        encoding = locale.getpreferredencoding(False)
+        with open(self.input_f2k_path, 'rb') as f:
+            try:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError: # empty file
+                buffer = None
+        if buffer is not None:
+            headers = dialect.find_table_headers(buffer)
+            if dialect.table_end_marker is not None:
+                i = buffer.find(dialect.table_end_marker.encode())
+                if i != -1:
+                    line_start = buffer.rfind(b'\n', 0, i) + 1
+                    line_end = buffer.find(b'\n', i)
+                    if line_end == -1:
+                        line_end = len(buffer)
+                    headers = [h for h in headers if h[0] < line_start]
+                    headers.append((line_start, line_end))
+            table_key = None
+            start = None
+            for header_start, header_end in headers:
+                if table_key and header_start > start:
+                    tables_contents[table_key] = MappedTable(buffer, start, header_start, encoding)
+                line = buffer[header_start:header_end].decode(encoding)
+                table_key = dialect.get_table_key(line)
+                start = header_end + 1
+            self._mmap = buffer
+        self.tables_contents = tables_contents
+        self.points_index = None
+        self._tables = {}
+        return tables_contents
+
+    def close_mmap(self):
+        '''
+        decode the remaining mapped tables and close the memory mapped file
+        '''
+        if self._mmap is None:
+            return
+        self.tables_contents.load()
+        self._mmap.close()
+        self._mmap = None
+
+    def get_table(self, table_key : str) -> F2kTable:
+        '''
+        return the F2kTable of table_key, the table is parsed on the first call
+        and parsed again only if the content of table changed
+        '''
+        content = self.tables_contents.get(table_key, '')
+        table = self._tables.get(table_key)
+        if table is None or table[0] is not content:
+            table = (content, F2kTable(content))
+            self._tables[table_key] = table
+        return table[1]
+
     def get_points_coordinates(self,
             content : str = None,
             ) -> dict:
+        if content is None and self.dialect.keyed_fields:
+            table = self.get_table(self.dialect.points_table_key)
+            if len(table) == 0:
+                return {}
+            names = table['Point']
+            coordinates = np.column_stack([table.get_floats(field) for field in ('GlobalX', 'GlobalY', 'GlobalZ')])
+            return {name: coord for name, coord in zip(names, coordinates.tolist()) if name is not None}
         if content is None:
-            content = self.tables_contents["OBJECT GEOMETRY - POINT COORDINATES"]
-        lines = content.split('\n')
-        points_coordinates = dict()
-        for line in lines:
-            point_name = None
-            if not line:
-                continue
-            line = line.lstrip(' ')
-            fields_values = line.split()
-            coordinates = []
-            for i, field_value in enumerate(fields_values[:-1]):
-                if i == 0:
-                    point_name = str(field_value.split('=')[1])
-                else:
-                    value = float(field_value.split('=')[1])
-                    coordinates.append(value)
-            if point_name is not None:
-                points_coordinates[point_name] = coordinates
-        return points_coordinates
+            content = self.tables_contents.get(self.dialect.points_table_key, '')
+        return self.dialect.get_points_coordinates(content)
+
+    def get_points_index(self) -> PointsIndex:
+        '''
+        return the index of points in points coordinates table, the index is
+        created once and the new points must be added to it.
+        '''
+        if self.points_index is None:
+            points_index = PointsIndex()
+            for name, coord in self.get_points_coordinates().items():
+                points_index.add(name, coord)
+            self.points_index = points_index
+        return self.points_index
 
     def is_point_exist(self,
             coordinate : list,
             content : Union[str, bool] = None,
             points_coordinates : Union[bool, dict] = None,
             ):
+        '''
+        if content and points_coordinates are None, the points index of
+        model is used for 3D coordinates.
+        '''
+        if content is None and points_coordinates is None and len(coordinate) == 3:
+            return self.get_points_index().find(coordinate)
         if points_coordinates is None:
             points_coordinates = self.get_points_coordinates(content)
+        n = len(coordinate)
         for _id, coord in points_coordinates.items():
             if (
-                len(coord) == 3 and
-                math.isclose(coord[0], coordinate[0], abs_tol=.001) and
-                math.isclose(coord[1], coordinate[1], abs_tol=.001) and
-                math.isclose(coord[2], coordinate[2], abs_tol=.001)
+                len(coord) == n and
+                all(abs(c1 - c2) <= .001 for c1, c2 in zip(coord, coordinate))
                 ):
                 return _id
         return None
@@ -106,15 +724,31 @@ class Safe():
             return 1000000
         return max(point_numbers) + 1
                     
-    def add_content_to_table(self, table_key, content, append=True):
+    def add_content_to_table(self,
+            table_key : str,
+            content : Union[str, list],
+            append : bool = True,
+            points_indexed : bool = False,
+            ):
         '''
-        if append is True, content add to current content
+        if append is True, content add to current content. content can be a
+        string or a list of strings. the points appended to points table are
+        added to points index, unless points_indexed is True, i.e. they were
+        added to the index when they were created.
         '''
-        if append:
-            curr_content = self.tables_contents.get(table_key, '')
-        else:
-            curr_content = ''
-        self.tables_contents[table_key] = curr_content + content
+        if self.recorder is not None:
+            chunks = [content] if isinstance(content, str) else list(content)
+            self.recorder.append((table_key, chunks, append))
+        if table_key == self.dialect.points_table_key:
+            if not append:
+                self.points_index = None
+            elif self.points_index is not None and not points_indexed:
+                text = content if isinstance(content, str) else ''.join(content)
+                for name, coord in self.dialect.get_points_coordinates(text).items():
+                    self.points_index.add(name, coord)
+        if not append:
+            self.tables_contents[table_key] = []
+        self.tables_contents.append(table_key, content)
         return None
 
     def set_analysis_type(self, is_2d='Yes'):
@@ -124,7 +758,7 @@ class Safe():
     
     def set_mesh_options(self, mesh_size=300):
         table_key =  "AUTOMATIC SLAB MESH OPTIONS"
-        content = f"MeshOpt=Rectangular   Localize=Yes   Merge=Yes   MaxSize={mesh_size * self.length_units.get('mm')}"
+        content = f"MeshOpt=Rectangular   Localize=Yes   Merge=Yes   MaxSize={mesh_size * self.units.mm}"
         self.add_content_to_table(table_key, content, append=False)
 
     def force_length_unit(self,
@@ -133,18 +767,25 @@ class Safe():
         if content is None:
             if len(self.tables_contents) == 0:
                 self.get_tables_contents()
-            table_key = "PROGRAM CONTROL"
-            content = self.tables_contents.get(table_key, None)
-            if content is None:
-                return
-        label = 'CurrUnits="'
-        init_curr_unit = content.find(label)
-        init_unit_index = init_curr_unit + len(label)
-        end_unit_index = content[init_unit_index:].find('"') + init_unit_index
-        force, length, _ = content[init_unit_index: end_unit_index].split(', ')
+            if self.dialect.units_table_key is None:
+                table_keys = list(self.tables_contents)
+            else:
+                table_keys = [self.dialect.units_table_key]
+            units = None
+            for table_key in table_keys:
+                if table_key in self.tables_contents:
+                    units = self.dialect.get_units(self.tables_contents.lines(table_key))
+                    if units is not None:
+                        break
+        else:
+            units = self.dialect.get_units(content.split('\n'))
+        if units is None:
+            return None
+        force, length = units
         self.force_unit, self.length_unit = force, length
-        self.force_units = self.get_force_units(self.force_unit)
-        self.length_units = self.get_length_units(self.length_unit)
+        self.units = UnitSystem(force, length)
+        self.force_units = self.units.force_units
+        self.length_units = self.units.length_units
         return force, length
     
     def set_sthtbelow(self,
@@ -155,172 +796,119 @@ class Safe():
         if content is None:
             if len(self.tables_contents) == 0:
                 self.get_tables_contents()
-            content = self.tables_contents.get(table_key, None)
-            if content is None:
+            if table_key not in self.tables_contents:
                 return None
-        label = 'StHtBelow='
-        first_label_index = content.find(label)
-        if first_label_index == -1: # version 14
-            label = 'ModelDatum='
-            first_label_index = content.find(label)
-        last_label_index = first_label_index + len(label)
-        space_index = content[last_label_index:].find(' ')
-        if space_index == -1:
-            content = content[:last_label_index] + f'{level}'
+            table = self.get_table(table_key)
         else:
-            end_index = space_index + last_label_index
-            content = content[:last_label_index] + f'{level}' + content[end_index:] 
+            table = F2kTable(content)
+        field = 'StHtBelow'
+        if field not in table: # version 14
+            field = 'ModelDatum'
+        if len(table) == 0 or field not in table or table[field][0] is None:
+            return table.to_string()
+        table.set_value(0, field, level)
+        content = table.to_string()
+        # the blank lines after the value are not written when it is the last
+        # value of table, like the previous versions
+        stripped = content.rstrip('\n')
+        if re.search(rf'(^|\s){field}=\S*$', stripped):
+            content = stripped
         self.tables_contents[table_key] = content
+        self._tables[table_key] = (content, table)
         return content
 
     def write(self):
         if len(self.tables_contents) == 0:
             self.get_tables_contents()
+        # output can be the mapped input file
+        self.close_mmap()
         with open(self.output_f2k_path, 'w') as writer:
-            for table_key, content in self.tables_contents.items():
-                writer.write(f'\n\nTABLE:  "{table_key}"\n')
-                writer.write(content)
-            writer.write("\nEND TABLE DATA")
+            for table_key in self.tables_contents:
+                writer.write('\n\n' + self.dialect.table_header.format(table_key) + '\n')
+                writer.writelines(self.tables_contents.chunks(table_key))
+            writer.write(self.dialect.end_of_file)
         return None
 
     def get_force_units(self, force_unit : str):
         '''
         force_unit can be 'N', 'KN', 'Kgf', 'tonf'
         '''
-        if force_unit == 'N':
-            return dict(N=1, KN=1000, Kgf=9.81, tonf=9810)
-        elif force_unit == 'KN':
-            return dict(N=.001, KN=1, Kgf=.00981, tonf=9.81)
-        elif force_unit == 'Kgf':
-            return dict(N=1/9.81, KN=1000/9.81, Kgf=1, tonf=1000)
-        elif force_unit == 'tonf':
-            return dict(N=.000981, KN=.981, Kgf=.001, tonf=1)
-        else:
-            raise KeyError
+        return UnitSystem.force_factors[force_unit]
 
     def get_length_units(self, length_unit : str):
         '''
         length_unit can be 'mm', 'cm', 'm'
         '''
-        if length_unit == 'mm':
-            return dict(mm=1, cm=10, m=1000)
-        elif length_unit == 'cm':
-            return dict(mm=.1, cm=1, m=100)
-        elif length_unit == 'm':
-            return dict(mm=.001, cm=.01, m=1)
-        else:
-            raise KeyError
+        return UnitSystem.length_factors[length_unit]
 
 class Safe12(Safe):
-    def __init__(self,
-            input_f2k_path : Path = None,
-            output_f2k_path : Path = None,
-        ) -> None:
-        super().__init__(input_f2k_path, output_f2k_path)
-        self.input_f2k_path = input_f2k_path
-
-    def get_tables_contents(self):
-        with open(self.input_f2k_path, 'r') as reader:
-            lines = reader.readlines()
-            tables_contents = dict()
-            n = len("$ ")
-            context = ''
-            table_key = None
-            for line in lines:
-                if line.startswith("$"):
-                    if table_key and context:
-                        tables_contents[table_key] = context
-                    context = ''
-                    table_key = line[n+1:-2]
-                else:
-                    context += line
-        self.tables_contents = tables_contents
-        return tables_contents
+    dialect = SAFE12_DIALECT
 
-    def get_points_coordinates(self,
-            content : str = None,
-            ) -> dict:
-        if content is None:
-            content = self.tables_contents["POINT COORDINATES"]
-        lines = content.split('\n')
-        points_coordinates = dict()
-        for line in lines:
-            if not line:
-                continue
-            line = line.lstrip('  POINT')
-            fields_values = line.split()
-            coordinates = []
-            for i, field_value in enumerate(fields_values):
-                if i == 0:
-                    point_name = str(field_value).strip('"')
-                else:
-                    value = float(field_value)
-                    coordinates.append(value)
-            points_coordinates[point_name] = coordinates
-        return points_coordinates
+def get_value_signature(value) -> str:
+    '''
+    return a string that changes when value of a FreeCAD property changes,
+    linked objects are represented by their names, shapes by their vertexes
+    and objects without a repr by their type
+    '''
+    if isinstance(value, (list, tuple)):
+        return '[' + ','.join(get_value_signature(v) for v in value) + ']'
+    if isinstance(value, dict):
+        return '{' + ','.join(f'{k}:{get_value_signature(v)}' for k, v in sorted(value.items())) + '}'
+    if hasattr(value, 'Name'):
+        return value.Name
+    if hasattr(value, 'Vertexes') and hasattr(value, 'isNull'):
+        if value.isNull():
+            return 'Null'
+        points = ','.join(f'{v.X:.4f} {v.Y:.4f} {v.Z:.4f}' for v in value.Vertexes)
+        return f'{value.ShapeType} {value.Area:.4f} {value.Volume:.4f} {points}'
+    signature = repr(value)
+    if ' object at 0x' in signature:
+        # default repr contains the memory address that changes in each session
+        return type(value).__name__
+    return signature
 
-    def is_point_exist(self,
-            coordinate : list,
-            content : Union[str, bool] = None,
-            ):
-        points_coordinates = self.get_points_coordinates(content)
-        for id, coord in points_coordinates.items():
-            if coord == coordinate:
-                return id
-        return None
-                    
-    def force_length_unit(self,
-        content : Union[str, bool] = None,
-        ):
-        with open(self.input_f2k_path, 'r') as reader:
-            while True:
-                line = reader.readline()
-                if 'UNITS' in line:
-                    line = line.lstrip('  ')
-                    force, length = line.split()[1:]
-                    break
-        self.force_unit, self.length_unit = force, length
-        self.force_units = self.get_force_units(self.force_unit)
-        self.length_units = self.get_length_units(self.length_unit)
-        return force, length
+def get_object_signature(obj) -> str:
+    '''
+    return the md5 hash of all properties of a FreeCAD object
+    '''
+    md5 = hashlib.md5(obj.Name.encode())
+    for prop in sorted(obj.PropertiesList):
+        if prop in ('Label2', 'Visibility', 'ExpressionEngine', 'Proxy'):
+            continue
+        md5.update(prop.encode())
+        md5.update(get_value_signature(getattr(obj, prop, None)).encode())
+    return md5.hexdigest()
 
-    def write(self):
-        if len(self.tables_contents) == 0:
-            self.get_tables_contents()
-        with open(self.output_f2k_path, 'w') as writer:
-            for table_key, content in self.tables_contents.items():
-                writer.write(f'\n\n$ "{table_key}"\n')
-                writer.write(content)
-            writer.write("\n  END\n$ END OF MODEL FILE\n")
-        return None
+def get_foundation_objects(doc) -> list:
+    '''
+    return the Foundation of doc, its base foundations and their Base objects,
+    its slabs and openings
+    '''
+    foun = getattr(doc, 'Foundation', None)
+    if foun is None:
+        return []
+    base_foundations = list(getattr(foun, 'base_foundations', []))
+    bases = [bf.Base for bf in base_foundations if getattr(bf, 'Base', None) is not None]
+    return [foun] + base_foundations + bases + list(getattr(foun, 'Slabs', [])) + list(getattr(foun, 'openings', []))
 
-    def get_force_units(self, force_unit : str):
-        '''
-        force_unit can be 'N', 'KN', 'Kgf', 'tonf'
-        '''
-        if force_unit == 'N':
-            return dict(N=1, KN=1000, Kgf=9.81, tonf=9810)
-        elif force_unit == 'KN':
-            return dict(N=.001, KN=1, Kgf=.00981, tonf=9.81)
-        elif force_unit == 'Kgf':
-            return dict(N=1/9.81, KN=1000/9.81, Kgf=1, tonf=1000)
-        elif force_unit == 'tonf':
-            return dict(N=.000981, KN=.981, Kgf=.001, tonf=1)
-        else:
-            raise KeyError
+def incremental_export(get_sources):
+    '''
+    Decorator for exporter methods of FreecadReadwriteModel. when the model is
+    incremental, get_sources(self, *args, **kwargs) returns the FreeCAD objects
+    that the method exports, and if they and all the previous exports did not
+    change from the last export, the tables contents of last export are used
+    instead of calling the method.
+    '''
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not self.incremental:
+                return method(self, *args, **kwargs)
+            sources = get_sources(self, *args, **kwargs)
+            return self.run_export_step(method, sources, args, kwargs)
+        return wrapper
+    return decorator
 
-    def get_length_units(self, length_unit : str):
-        '''
-        length_unit can be 'mm', 'cm', 'm'
-        '''
-        if length_unit == 'mm':
-            return dict(mm=1, cm=10, m=1000)
-        elif length_unit == 'cm':
-            return dict(mm=.1, cm=1, m=100)
-        elif length_unit == 'm':
-            return dict(mm=.001, cm=.01, m=1)
-        else:
-            raise KeyError
 
 class FreecadReadwriteModel():
 
@@ -329,7 +917,17 @@ class FreecadReadwriteModel():
                 input_f2k_path : Path = None,
                 output_f2k_path : Path = None,
                 doc: 'App.Document' = None,
+                incremental : bool = False,
+                use_mmap : bool = False,
+                processes : int = 1,
                 ):
+        '''
+        if incremental is True, the outputs of exporters are saved in a cache
+        file with save_export_cache and the exporters whose source objects did
+        not change are replayed from the cache in next export. use_mmap is
+        passed to Safe for memory mapping the input f2k file. if processes is
+        more than 1, the geometry of slabs is extracted in a process pool.
+        '''
         if doc is None:
             doc = FreeCAD.ActiveDocument
         self.doc = doc
@@ -341,7 +939,7 @@ class FreecadReadwriteModel():
                 output_f2k_path = Path(doc.Safe.output)
             else:
                 output_f2k_path = input_f2k_path
-        self.safe = Safe(input_f2k_path, output_f2k_path)
+        self.safe = Safe(input_f2k_path, output_f2k_path, use_mmap=use_mmap)
         self.safe.get_tables_contents()
         self.safe.force_length_unit()
         self.force_unit = self.safe.force_unit
@@ -353,16 +951,125 @@ class FreecadReadwriteModel():
         self.soil_names = set()
         self.mat_names = set()
         self.slab_sec_names = set()
+        self.processes = processes
+        self.incremental = incremental
+        if incremental:
+            # the tables are read from the input file, hashing its bytes does
+            # not decode the memory mapped tables
+            md5 = hashlib.md5(str(self.last_point_number).encode())
+            with open(input_f2k_path, 'rb') as f:
+                for block in iter(functools.partial(f.read, 2 ** 20), b''):
+                    md5.update(block)
+            self.step_key = md5.hexdigest()
+            self.previous_export = self.load_export_cache()
+            self.export_steps = []
+            self.reused_steps = []
+
+    def get_export_cache_path(self) -> Path:
+        '''
+        the cache file is keyed by the full resolved path of output f2k, so
+        outputs with the same name in different folders have separate caches
+        '''
+        path = os.path.normcase(Path(self.safe.output_f2k_path).resolve())
+        name = hashlib.md5(path.encode()).hexdigest()
+        return Path(tempfile.gettempdir()) / f'osafe_export_{name}.json'
+
+    def load_export_cache(self) -> dict:
+        path = self.get_export_cache_path()
+        if not path.exists():
+            return {}
+        try:
+            with open(path, 'r') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return {step['key']: step for step in cache.get('steps', [])}
+
+    def save_export_cache(self):
+        '''
+        save the outputs of exporters, each step is replayed in the next export
+        if its key did not change
+        '''
+        if not self.incremental:
+            return
+        cache = {'steps': self.export_steps}
+        with open(self.get_export_cache_path(), 'w') as f:
+            json.dump(cache, f)
 
+    def get_export_state(self) -> dict:
+        return {
+            'last_point_number': self.last_point_number,
+            'last_area_number': self.last_area_number,
+            'last_line_number': self.last_line_number,
+            'soil_names': sorted(self.soil_names),
+            'mat_names': sorted(self.mat_names),
+            'slab_sec_names': sorted(self.slab_sec_names),
+        }
+
+    def set_export_state(self, state : dict):
+        self.last_point_number = state['last_point_number']
+        self.last_area_number = state['last_area_number']
+        self.last_line_number = state['last_line_number']
+        self.soil_names = set(state['soil_names'])
+        self.mat_names = set(state['mat_names'])
+        self.slab_sec_names = set(state['slab_sec_names'])
+
+    def run_export_step(self,
+            method,
+            sources : list,
+            args : tuple,
+            kwargs : dict,
+            ):
+        '''
+        the key of each step is the hash of previous step key, the method name,
+        the arguments and the signature of source objects, so a step with the
+        same key starts from the same state and writes the same contents.
+        '''
+        md5 = hashlib.md5(self.step_key.encode())
+        md5.update(method.__name__.encode())
+        md5.update(get_value_signature([args, kwargs]).encode())
+        for obj in sources:
+            md5.update(get_object_signature(obj).encode())
+        self.step_key = md5.hexdigest()
+        step = self.previous_export.get(self.step_key)
+        if step is not None:
+            for table_key, chunks, append in step['records']:
+                self.safe.add_content_to_table(table_key, chunks, append)
+            self.set_export_state(step['state'])
+            self.export_steps.append(step)
+            self.reused_steps.append(method.__name__)
+            return step['result']
+        self.safe.recorder = []
+        try:
+            result = method(self, *args, **kwargs)
+            records = self.safe.recorder
+        finally:
+            self.safe.recorder = None
+        self.export_steps.append({
+            'key': self.step_key,
+            'name': method.__name__,
+            'records': records,
+            'state': self.get_export_state(),
+            'result': result,
+        })
+        return result
+
+    @incremental_export(lambda self, single_slabs=None: single_slabs or osafe_funcs.get_objects_of_type('SingleFoundation', self.doc))
     def export_freecad_single_slabs(self,
                                     single_slabs: Union[list, None] = None,
             ):
         if single_slabs is None:
             single_slabs = osafe_funcs.get_objects_of_type('SingleFoundation', self.doc)
-        soil_assignment_content = ''
+        soil_assignment_content = []
         names_props = []
-        all_slab_names = []
-        for slab in single_slabs:
+        polygons = []
+        prop_names = []
+        slabs_soil_names = []
+        shapes_polygons = self.get_shapes_polygons(
+            [slab.Shape for slab in single_slabs],
+            top_faces=True,
+            )
+        for slab, slab_polygons in zip(single_slabs, shapes_polygons):
             # create concrete
             fc_mpa = int(slab.fc.getValueAs("MPa"))
             mat_name = f'C{fc_mpa}'
@@ -385,15 +1092,14 @@ class FreecadReadwriteModel():
                 # soil content
                 names_props.append((soil_name, ks))
                 self.soil_names.add(soil_name)
-            faces = osafe_funcs.get_top_faces(slab.Shape)
-            slab_names = []
-            for face in faces:
-                points = osafe_funcs.get_sort_points(face.Edges)
-                name = self.create_area_by_coord(points, slab_sec_name)
-                slab_names.append(name)
-            all_slab_names.extend(slab_names)
-            soil_assignment_content +=  self.export_freecad_soil_support(
-                slab_names=slab_names,
+            polygons.extend(slab_polygons)
+            prop_names.extend([slab_sec_name] * len(slab_polygons))
+            slabs_soil_names.extend([soil_name] * len(slab_polygons))
+        coordinates, offsets = get_coordinates_and_offsets(polygons)
+        all_slab_names = self.create_areas_by_coords(coordinates, offsets, prop_names)
+        for slab_name, soil_name in zip(all_slab_names, slabs_soil_names):
+            soil_assignment_content += self.export_freecad_soil_support(
+                slab_names=[slab_name],
                 soil_name=soil_name,
                 soil_modulus=None,
             )
@@ -405,6 +1111,7 @@ class FreecadReadwriteModel():
         self.safe.add_content_to_table(table_key, soil_assignment_content)
         return all_slab_names
     
+    @incremental_export(lambda self, *args, **kwargs: get_foundation_objects(self.doc))
     def export_freecad_slabs(self,
         soil_name : str = 'SOIL',
         soil_modulus : float = 2,
@@ -417,14 +1124,17 @@ class FreecadReadwriteModel():
         mat_name = self.create_concrete_material(foun=foun)
         if mat_name is not None:
             self.mat_names.add(mat_name)
-        soil_assignment_content = ''
+        soil_assignment_content = []
         all_slab_names = []
         names_props = []
         
         height_name = int(foun.height.getValueAs('cm'))
         height = round(foun.height.getValueAs(f'{self.length_unit}'), 2)
         if foun.foundation_type == 'Strip':
-            for base_foundation in foun.base_foundations:
+            shapes_polygons = self.get_shapes_polygons(
+                [base_foundation.extended_plan for base_foundation in foun.base_foundations],
+                )
+            for base_foundation, polygons in zip(foun.base_foundations, shapes_polygons):
                 # create slab section
                 if foun.height == 0:
                     height_name = int(base_foundation.height.getValueAs('cm'))
@@ -442,14 +1152,9 @@ class FreecadReadwriteModel():
                     # soil content
                     names_props.append((soil_name, ks))
                     self.soil_names.add(soil_name)
-                faces = base_foundation.extended_plan.Faces
-                slab_names = []
-                for face in faces:
-                    points = self.get_sort_points(face.Edges, tol=0.01)
-                    name = self.create_area_by_coord(points, slab_sec_name)
-                    slab_names.append(name)
+                slab_names = self.create_areas_by_coords(*get_coordinates_and_offsets(polygons), slab_sec_name)
                 all_slab_names.extend(slab_names)
-                soil_assignment_content +=  self.export_freecad_soil_support(
+                soil_assignment_content += self.export_freecad_soil_support(
                     slab_names=slab_names,
                     soil_name=soil_name,
                     soil_modulus=None,
@@ -473,9 +1178,7 @@ class FreecadReadwriteModel():
                 area_points = osafe_funcs.get_sub_areas_points_from_face_with_scales(
                     foun.plan_without_openings,
                 )
-                for points in area_points:
-                    name = self.create_area_by_coord(points, slab_sec_name)
-                    all_slab_names.append(name)
+                all_slab_names += self.create_areas_by_coords(*get_coordinates_and_offsets(area_points), slab_sec_name)
                 soil_assignment_content = self.export_freecad_soil_support(
                     slab_names=[all_slab_names[-1]],
                     soil_name=soil_name,
@@ -503,7 +1206,10 @@ class FreecadReadwriteModel():
                     soil_name=soil_name,
                     soil_modulus=None,
                 )
-        for slab in foun.Slabs:
+        shapes_polygons = self.get_shapes_polygons(
+            [slab.plan.Shape if hasattr(slab, 'plan') else slab.Base.Shape for slab in foun.Slabs],
+            )
+        for slab, polygons in zip(foun.Slabs, shapes_polygons):
             # create concrete
             fc_mpa = int(slab.fc.getValueAs("MPa"))
             mat_name = f'C{fc_mpa}'
@@ -527,17 +1233,9 @@ class FreecadReadwriteModel():
                 # soil content
                 names_props.append((soil_name, ks))
                 self.soil_names.add(soil_name)
-            if hasattr(slab, 'plan'):
-                faces = slab.plan.Shape.Faces
-            elif hasattr(slab, 'Base'):
-                faces = slab.Base.Shape.Faces
-            slab_names = []
-            for face in faces:
-                points = self.get_sort_points(face.Edges, tol=0.01)
-                name = self.create_area_by_coord(points, slab_sec_name)
-                slab_names.append(name)
+            slab_names = self.create_areas_by_coords(*get_coordinates_and_offsets(polygons), slab_sec_name)
             all_slab_names.extend(slab_names)
-            soil_assignment_content +=  self.export_freecad_soil_support(
+            soil_assignment_content += self.export_freecad_soil_support(
                 slab_names=slab_names,
                 soil_name=soil_name,
                 soil_modulus=None,
@@ -550,7 +1248,8 @@ class FreecadReadwriteModel():
         self.safe.add_content_to_table(table_key, soil_assignment_content)
         return all_slab_names
 
-    def get_sort_points(self,
+    @staticmethod
+    def get_sort_points(
                 edges,
                 vector=True,
                 last=False,
@@ -566,42 +1265,83 @@ class FreecadReadwriteModel():
             points = points[:-1]
         return points
 
+    def get_shapes_polygons(self,
+            shapes : list,
+            top_faces : bool = False,
+            ) -> list:
+        '''
+        return the polygons of each shape with get_shape_polygons. if
+        self.processes is more than 1, shapes are sent to a process pool as
+        BREP strings and the results are merged in the order of shapes, so the
+        export is the same as serial export.
+        '''
+        pool = None
+        processes = self.processes
+        if processes > 1:
+            pool = osafe_funcs.get_process_pool(processes, len(shapes))
+        if pool is None:
+            return [get_shape_polygons(shape, top_faces) for shape in shapes]
+        breps = [shape.exportBrepToString() for shape in shapes]
+        chunksize = max(1, len(breps) // (4 * processes))
+        try:
+            results = list(pool.map(
+                get_brep_polygons,
+                breps,
+                itertools.repeat(top_faces),
+                chunksize=chunksize,
+                ))
+        except Exception as e:
+            # the workers may not import FreeCAD or fail on a shape
+            FreeCAD.Console.PrintWarning(f"Process pool failed ({e!r}), shapes polygons are computed serially.\n")
+            osafe_funcs.shutdown_process_pool(processes)
+            return [get_shape_polygons(shape, top_faces) for shape in shapes]
+        shapes_polygons = []
+        for shape, polygons in zip(shapes, results):
+            vertexes = shape.Vertexes
+            shapes_polygons.append([
+                [vertexes[p].Point if isinstance(p, int) else FreeCAD.Vector(*p) for p in points]
+                for points in polygons
+                ])
+        return shapes_polygons
+
+    def create_point(self,
+            coordinate : list,
+            reuse : bool = True,
+            ) -> tuple:
+        '''
+        return the point name at coordinate and the content that must be added
+        to "OBJECT GEOMETRY - POINT COORDINATES" table. if reuse is True and
+        the point already exists, the content is empty.
+        '''
+        points_index = self.safe.get_points_index()
+        if reuse:
+            point_name = points_index.find(coordinate)
+            if point_name is not None:
+                return point_name, ''
+        point_name = self.last_point_number
+        self.last_point_number += 1
+        points_index.add(point_name, coordinate)
+        content = f"Point={point_name}   GlobalX={coordinate[0]}   GlobalY={coordinate[1]}   GlobalZ={coordinate[2]}   SpecialPt=No\n"
+        return point_name, content
+
     def create_area_by_coord(self,
             points : 'Base.Vector',
             prop_name : Union[str, bool] = None,
             is_opening : bool = False,
             ):
-        n = len(points)
         nodes = []
-        points_content = ''
+        points_content = []
         area_name = self.last_area_number
-        areas_content = f"\tArea={area_name}   NumPoints={n}"
-        length_scale = self.safe.length_units.get('mm')
-        for i, point in enumerate(points, start=1):
-            x = point.x * length_scale
-            y = point.y * length_scale
-            z = point.z * length_scale
-            if i % 4 == 0:
-                points_content += f"Point={self.last_point_number}   GlobalX={x}   GlobalY={y}   GlobalZ={z}   SpecialPt=No\n"
-                nodes.append(self.last_point_number)
-                self.last_point_number += 1
-                if i == 4:
-                    areas_content += f"\tPoint1={nodes[0]}   Point2={nodes[1]}   Point3={nodes[2]}   Point4={nodes[3]}\n"
-                else:
-                    areas_content += f"\tArea={area_name}   Point1={nodes[0]}   Point2={nodes[1]}   Point3={nodes[2]}   Point4={nodes[3]}\n"
-                nodes = []
-            else:
-                points_content += f"Point={self.last_point_number}   GlobalX={x}   GlobalY={y}   GlobalZ={z}   SpecialPt=No\n"
-                nodes.append(self.last_point_number)
-                self.last_point_number += 1
-        for i, node in enumerate(nodes, start=1):
-            if i == 1 and n > 4:
-                areas_content += f"Area={area_name}"
-            areas_content += f"\tPoint{i}={node}   "
+        convert_point = self.safe.units.convert_point
+        for point in points:
+            coord = convert_point(point)
+            point_name, point_content = self.create_point(coord, reuse=False)
+            points_content.append(point_content)
+            nodes.append(point_name)
         self.last_area_number += 1
-        areas_content += '\n'
+        areas_content = get_area_rows(area_name, nodes)
         table_key = "OBJECT GEOMETRY - POINT COORDINATES"
-        self.safe.add_content_to_table(table_key, points_content)
+        self.safe.add_content_to_table(table_key, points_content, points_indexed=True)
         table_key = "OBJECT GEOMETRY - AREAS 01 - GENERAL"
         self.safe.add_content_to_table(table_key, areas_content)
         if is_opening:
@@ -613,6 +1353,60 @@ class FreecadReadwriteModel():
 
         return area_name
 
+    def create_areas_by_coords(self,
+            coordinates : np.ndarray,
+            offsets : np.ndarray,
+            prop_names : Union[str, list, None] = None,
+            is_opening : bool = False,
+            ) -> list:
+        '''
+        create len(offsets) - 1 areas at once. coordinates is an (N, 3) array
+        of vertices in mm and the vertices of area i are
+        coordinates[offsets[i]:offsets[i + 1]]. prop_names can be one slab
+        property for all areas or a list with one property per area.
+        return the list of area names
+        '''
+        coordinates = np.asarray(coordinates, dtype=float).reshape(-1, 3)
+        offsets = np.asarray(offsets, dtype=int)
+        n_areas = len(offsets) - 1
+        if n_areas < 1:
+            return []
+        if prop_names is None or isinstance(prop_names, str):
+            prop_names = [prop_names] * n_areas
+        # numbering
+        n_points = len(coordinates)
+        first_point = self.last_point_number
+        point_names = np.arange(first_point, first_point + n_points)
+        self.last_point_number += n_points
+        area_names = list(range(self.last_area_number, self.last_area_number + n_areas))
+        self.last_area_number += n_areas
+        # points
+        coordinates = self.safe.units.convert_coordinates(coordinates)
+        point_names = point_names.astype(str).tolist()
+        self.safe.get_points_index().extend(point_names, coordinates)
+        xs, ys, zs = coordinates.astype(str).T
+        points_content = [
+            f"Point={name}   GlobalX={x}   GlobalY={y}   GlobalZ={z}   SpecialPt=No\n"
+            for name, x, y, z in zip(point_names, xs.tolist(), ys.tolist(), zs.tolist())
+            ]
+        # areas
+        areas_content = []
+        slab_assignment_content = []
+        for area_name, i, j, prop_name in zip(area_names, offsets[:-1].tolist(), offsets[1:].tolist(), prop_names):
+            areas_content += get_area_rows(area_name, point_names[i:j])
+            if is_opening:
+                slab_assignment_content.append(f"\tArea={area_name}   SlabProp=None   OpeningType=Unloaded\n")
+            else:
+                slab_assignment_content.append(f"\tArea={area_name}   SlabProp={prop_name}   OpeningType=None\n")
+        table_key = "OBJECT GEOMETRY - POINT COORDINATES"
+        self.safe.add_content_to_table(table_key, points_content, points_indexed=True)
+        table_key = "OBJECT GEOMETRY - AREAS 01 - GENERAL"
+        self.safe.add_content_to_table(table_key, areas_content)
+        table_key = "SLAB PROPERTY ASSIGNMENTS"
+        self.safe.add_content_to_table(table_key, slab_assignment_content)
+        return area_names
+
+    @incremental_export(lambda self, *args, **kwargs: get_foundation_objects(self.doc))
     def export_freecad_openings(self, doc : 'App.Document' = None):
         foun = self.doc.Foundation
         if foun.foundation_type == 'Strip':
@@ -625,6 +1419,7 @@ class FreecadReadwriteModel():
             names.append(name)
         return names
 
+    @incremental_export(lambda self, strips: get_foundation_objects(self.doc) + (strips or osafe_funcs.get_objects_of_type("BaseFoundation", self.doc)))
     def export_freecad_strips(self,
                               strips: list,
                               ):
@@ -637,14 +1432,13 @@ class FreecadReadwriteModel():
             a_strips, b_strips = osafe_funcs.draw_strip_automatically_in_strip_foundation(base_foundations=bfs)
             strips = a_strips.Group + b_strips.Group
         point_coords_table_key = "OBJECT GEOMETRY - POINT COORDINATES"
-        points_content = ''
-        curr_point_content = self.safe.tables_contents.get(point_coords_table_key, '')
+        points_content = []
         strip_table_key = "OBJECT GEOMETRY - DESIGN STRIPS"
-        strip_content = ''
+        strip_content = []
         strip_assign_table_key = "SLAB DESIGN OVERWRITES 01 - STRIP BASED"
-        strip_assign_content = ''
+        strip_assign_content = []
         self.create_rebar_material('AIII', 400)
-        scale_factor = self.safe.length_units['mm']
+        scale_factor = self.safe.units.mm
         for o in strips:
             layer = o.layer
             strip_name = o.Label
@@ -656,28 +1450,26 @@ class FreecadReadwriteModel():
             placement = o.Placement.Base + o.Base.Placement.Base
             for j, point in enumerate(points):
                 coord = [coord * scale_factor for coord in (point.x + placement.x, point.y + placement.y, point.z)]
-                point_name = self.safe.is_point_exist(coord, curr_point_content + points_content)
-                if point_name is None:
-                    points_content += f"Point={self.last_point_number}   GlobalX={coord[0]}   GlobalY={coord[1]}   GlobalZ={coord[2]}   SpecialPt=No\n"
-                    point_name = self.last_point_number
-                    self.last_point_number += 1
+                point_name, point_content = self.create_point(coord)
+                points_content.append(point_content)
                 if j == 0:
-                    strip_content += f'\tStrip={strip_name}   Point={point_name}   GlobalX={coord[0]}   GlobalY={coord[1]}   WALeft={swl}   WARight={swr}   AutoWiden=No\n'
+                    strip_content.append(f'\tStrip={strip_name}   Point={point_name}   GlobalX={coord[0]}   GlobalY={coord[1]}   WALeft={swl}   WARight={swr}   AutoWiden=No\n')
                 elif j == len(points) - 1: # last strip
-                    strip_content += f'\tStrip={strip_name}   Point={point_name}   GlobalX={coord[0]}   GlobalY={coord[1]}   WBLeft={ewl}   WBRight={ewr}\n'
+                    strip_content.append(f'\tStrip={strip_name}   Point={point_name}   GlobalX={coord[0]}   GlobalY={coord[1]}   WBLeft={ewl}   WBRight={ewr}\n')
                 else:
-                    strip_content += f'\tStrip={strip_name}   Point={point_name}   GlobalX={coord[0]}   GlobalY={coord[1]}   WBLeft={ewl}   WBRight={ewr} WALeft={swl}   WARight={swr} \n'
-            strip_assign_content += f'\tStrip={strip_name}   Layer={layer}   DesignType=Column   RLLF=1   Design=Yes   IgnorePT=No   RebarMat=AIII   CoverType=Preferences\n'
+                    strip_content.append(f'\tStrip={strip_name}   Point={point_name}   GlobalX={coord[0]}   GlobalY={coord[1]}   WBLeft={ewl}   WBRight={ewr} WALeft={swl}   WARight={swr} \n')
+            strip_assign_content.append(f'\tStrip={strip_name}   Layer={layer}   DesignType=Column   RLLF=1   Design=Yes   IgnorePT=No   RebarMat=AIII   CoverType=Preferences\n')
         if doc is not None:
             FreeCAD.closeDocument(doc.Name)
-        self.safe.add_content_to_table(point_coords_table_key, points_content)
+        self.safe.add_content_to_table(point_coords_table_key, points_content, points_indexed=True)
         self.safe.add_content_to_table(strip_table_key, strip_content)
         self.safe.add_content_to_table(strip_assign_table_key, strip_assign_content)
 
+    @incremental_export(lambda self: get_foundation_objects(self.doc) + osafe_funcs.get_objects_of_ifc_type("Column", self.doc))
     def export_freecad_stiff_elements(self):
         fc_mpa = self.doc.Foundation.fc.getValueAs('MPa')
         self.create_concrete_material('CONCRETE_ZERO', fc_mpa, 0)
-        thickness = 1500 * self.safe.length_units['mm']
+        thickness = 1500 * self.safe.units.mm
         self.create_solid_slab('COL_STIFF', 'Stiff', 'CONCRETE_ZERO', thickness)
         for o in self.doc.Objects:
             if hasattr(o, "IfcType") and o.IfcType == "Column":
@@ -688,14 +1480,13 @@ class FreecadReadwriteModel():
                         self.create_area_by_coord(points, prop_name='COL_STIFF')
                         break
     
+    @incremental_export(lambda self: osafe_funcs.get_objects_of_type("Wall", self.doc))
     def export_freecad_wall_loads(self):
         point_coords_table_key = "OBJECT GEOMETRY - POINT COORDINATES"
-        points_content = ''
-        curr_point_content = self.safe.tables_contents.get(point_coords_table_key, '')
-        scale_factor = self.safe.length_units['mm']
-        line_content = ''
-        line_load_content = ''
-        points_content = ''
+        units = self.safe.units
+        line_content = []
+        line_load_content = []
+        points_content = []
         for o in self.doc.Objects:
             if (hasattr(o, "Proxy") and
                 hasattr(o.Proxy, "Type") and
@@ -704,28 +1495,19 @@ class FreecadReadwriteModel():
                 mass_per_area = o.weight
                 height = o.Height.getValueAs('m')
                 loadpat = o.loadpat
-                value = mass_per_area * height * self.safe.force_units['Kgf'] / self.safe.length_units['m']
-                p1 = o.Base.Start
-                p2 = o.Base.End
-                coord1 = [i * scale_factor for i in (p1.x, p1.y, p1.z)]
-                coord2 = [i * scale_factor for i in (p2.x, p2.y, p2.z)]
-                p1_name = self.safe.is_point_exist(coord1, curr_point_content + points_content)
-                p2_name = self.safe.is_point_exist(coord2, curr_point_content + points_content)
-                if p1_name is None:
-                    points_content += f"Point={self.last_point_number}   GlobalX={coord1[0]}   GlobalY={coord1[1]}   GlobalZ={coord1[2]}   SpecialPt=No\n"
-                    p1_name = self.last_point_number
-                    self.last_point_number += 1
-                if p2_name is None:
-                    points_content += f"Point={self.last_point_number}   GlobalX={coord2[0]}   GlobalY={coord2[1]}   GlobalZ={coord2[2]}   SpecialPt=No\n"
-                    p2_name = self.last_point_number
-                    self.last_point_number += 1
-                line_content += f'Line={self.last_line_number}   PointI={p1_name}   PointJ={p2_name}   LineType=Beam\n'
+                value = units.convert(mass_per_area * height, units.line_load)
+                coord1 = units.convert_point(o.Base.Start)
+                coord2 = units.convert_point(o.Base.End)
+                p1_name, p1_content = self.create_point(coord1)
+                p2_name, p2_content = self.create_point(coord2)
+                points_content.extend((p1_content, p2_content))
+                line_content.append(f'Line={self.last_line_number}   PointI={p1_name}   PointJ={p2_name}   LineType=Beam\n')
                 name = self.last_line_number
                 self.last_line_number += 1
-                line_load_content += f'Line={name}   LoadPat={loadpat}   Type=Force   Dir=Gravity   DistType=RelDist   RelDistA=0   RelDistB=1   FOverLA={value}   FOverLB={value}\n'
+                line_load_content.append(f'Line={name}   LoadPat={loadpat}   Type=Force   Dir=Gravity   DistType=RelDist   RelDistA=0   RelDistB=1   FOverLA={value}   FOverLB={value}\n')
                 
         if points_content:
-            self.safe.add_content_to_table(point_coords_table_key, points_content)
+            self.safe.add_content_to_table(point_coords_table_key, points_content, points_indexed=True)
         table_key = "OBJECT GEOMETRY - LINES 01 - GENERAL"
         self.safe.add_content_to_table(table_key, line_content)
         table_key = "LOAD ASSIGNMENTS - LINE OBJECTS - DISTRIBUTED LOADS"
@@ -740,11 +1522,12 @@ class FreecadReadwriteModel():
         # if soil_modulus is not None:
         #     self.SapModel.PropAreaSpring.SetAreaSpringProp(
         #         soil_name, 0, 0, soil_modulus , 3)
-        soil_assignment_content = ''
+        soil_assignment_content = []
         for slab_name in slab_names:
-            soil_assignment_content += f"Area={slab_name}   SoilProp={soil_name}\n"
+            soil_assignment_content.append(f"Area={slab_name}   SoilProp={soil_name}\n")
         return soil_assignment_content
 
+    @incremental_export(lambda self, punches=None: punches or osafe_funcs.get_objects_of_type("Punch", self.doc))
     def export_punch_props(self,
             punches : Union[list, bool] = None,
             ):
@@ -755,30 +1538,22 @@ class FreecadReadwriteModel():
                     hasattr(o.Proxy, "Type") and \
                     o.Proxy.Type == "Punch":
                     punches.append(o)
-        punch_general_content = ''
-        punch_perimeter_content = ''
-        scale = self.safe.length_units['mm']
-        point_coords_table_key = "OBJECT GEOMETRY - POINT COORDINATES"
-        curr_point_content = self.safe.tables_contents.get(point_coords_table_key, '')
-        points_coordinates = self.safe.get_points_coordinates(curr_point_content)
-        scale_factor = self.safe.length_units['mm']
+        punch_general_content = []
+        punch_perimeter_content = []
+        units = self.safe.units
+        scale = units.mm
         for punch in punches:
-            point = punch.center_of_load
-            coord = [coord * scale_factor for coord in (point.x, point.y, point.z)]
-            point_name = self.safe.is_point_exist(
-                coordinate=coord,
-                content=None,
-                points_coordinates=points_coordinates,
-                )
+            coord = units.convert_point(punch.center_of_load)
+            point_name = self.safe.is_point_exist(coordinate=coord)
             if point_name is None:
                 continue
             loc = punch.Location
             depth = punch.d * scale
-            punch_general_content += f'\tPoint={point_name}   Check="Program Determined"   LocType="{loc}"   Perimeter="User Perimeter"   EffDepth=User   UserDepth={depth}   Openings=User   ReinfType=None\n'
+            punch_general_content.append(f'\tPoint={point_name}   Check="Program Determined"   LocType="{loc}"   Perimeter="User Perimeter"   EffDepth=User   UserDepth={depth}   Openings=User   ReinfType=None\n')
             nulls, null_points = osafe_funcs.punch_null_points(punch)
             for i, (point, is_null) in enumerate(zip(null_points, nulls), start=1):
                 x, y = point.x * scale, point.y * scale
-                punch_perimeter_content += f'\tPoint={point_name}   PointNum={i}   X={x}   Y={y}   Radius=0   IsNull={is_null}\n'
+                punch_perimeter_content.append(f'\tPoint={point_name}   PointNum={i}   X={x}   Y={y}   Radius=0   IsNull={is_null}\n')
 
         punch_general_table_key = "PUNCHING SHEAR DESIGN OVERWRITES 01 - GENERAL"
         punch_perimeter_table_key = "PUNCHING SHEAR DESIGN OVERWRITES 02 - USER PERIMETER"
@@ -791,10 +1566,10 @@ class FreecadReadwriteModel():
         value : float,
         ) -> None:
         table_key = "LOAD ASSIGNMENTS - SURFACE LOADS"
-        content = ''
-        value *= self.safe.force_units['Kgf'] / self.safe.length_units['m'] ** 2
+        content = []
+        value *= self.safe.units.pressure
         for area_name in area_names:
-            content += f'Area={area_name}   LoadPat={load_pat}   Dir=Gravity   UnifLoad={value}   A=0   B=0   C=0\n'
+            content.append(f'Area={area_name}   LoadPat={load_pat}   Dir=Gravity   UnifLoad={value}   A=0   B=0   C=0\n')
         self.safe.add_content_to_table(table_key, content)
 
     @staticmethod
@@ -802,10 +1577,11 @@ class FreecadReadwriteModel():
         return Part.Vertex(point.x, point.y, point.z)
 
     def create_soil_table(self, soil_prop):
-        soil_content = ''
+        soil_content = []
+        subgrade_modulus = self.safe.units.subgrade_modulus
         for name, ks in soil_prop:
-            ks *= self.safe.force_units['Kgf'] / self.safe.length_units['cm'] ** 3
-            soil_content += f'Soil={name}   Subgrade={ks}   NonlinOpt="Compression Only"\n'
+            ks *= subgrade_modulus
+            soil_content.append(f'Soil={name}   Subgrade={ks}   NonlinOpt="Compression Only"\n')
         return soil_content
 
     def add_material(self,
@@ -830,16 +1606,17 @@ class FreecadReadwriteModel():
             mat_name = f'C{fc_mpa}'
         if mat_name in self.mat_names:
             return
-        fc = fc_mpa * self.safe.force_units['N'] / self.safe.length_units['mm'] ** 2
+        units = self.safe.units
+        fc = units.convert(fc_mpa, units.stress)
         self.add_material(mat_name, 'Concrete')
         table_key = "MATERIAL PROPERTIES 03 - CONCRETE"
         A = 9.9E-06
-        unit_weight = weight * self.safe.force_units['Kgf'] / self.safe.length_units['m'] ** 3
+        unit_weight = units.convert(weight, units.unit_weight)
         if weight == 0:
             Ec_mpa = .043 * 2400 ** 1.5 * math.sqrt(fc_mpa)
         else:
             Ec_mpa = .043 * weight ** 1.5 * math.sqrt(fc_mpa)
-        Ec = Ec_mpa * self.safe.force_units['N'] / self.safe.length_units['mm'] ** 2
+        Ec = units.convert(Ec_mpa, units.stress)
         mat_prop_content = f'Material={mat_name}   E={Ec}   U=0.2   A={A}   UnitWt={unit_weight}   Fc={fc}   LtWtConc=No   UserModRup=No\n'
         self.safe.add_content_to_table(table_key, mat_prop_content)
         return mat_name
@@ -851,9 +1628,10 @@ class FreecadReadwriteModel():
         self.add_material(mat_name, 'Rebar')
         table_key = "MATERIAL PROPERTIES 04 - REBAR"
         weight = 7850
-        unit_weight = weight * self.safe.force_units['Kgf'] / self.safe.length_units['m'] ** 3
-        E = 2e5 * self.safe.force_units['N'] / self.safe.length_units['mm'] ** 2
-        fy = fy_mpa * self.safe.force_units['N'] / self.safe.length_units['mm'] ** 2
+        units = self.safe.units
+        unit_weight = units.convert(weight, units.unit_weight)
+        E = units.convert(2e5, units.stress)
+        fy = units.convert(fy_mpa, units.stress)
         fu = 1.25 * fy
         mat_prop_content = f'Material={mat_name}   E={E}   UnitWt={unit_weight}   Fy={fy}   Fu={fu}\n'
         self.safe.add_content_to_table(table_key, mat_prop_content)
@@ -875,25 +1653,25 @@ class FreecadReadwriteModel():
         slab_prop_content = f'Slab={name}   Type={type_}   MatProp={material}   Thickness={thickness}   Ortho=No\n'
         self.safe.add_content_to_table(table_key, slab_prop_content)
     
+    @incremental_export(lambda self: get_foundation_objects(self.doc) + osafe_funcs.get_objects_of_ifc_type("Column", self.doc))
     def export_freecad_columns(self):
         # Create Concrete Zero
-        mat_contents = self.safe.tables_contents.get("MATERIAL PROPERTIES 03 - CONCRETE", None)
-        if mat_contents is None or "CONCRETE_ZERO" not in mat_contents:
+        mat_table = self.safe.get_table("MATERIAL PROPERTIES 03 - CONCRETE")
+        if 'Material' not in mat_table or "CONCRETE_ZERO" not in mat_table['Material']:
             fc_mpa = self.doc.Foundation.fc.getValueAs('MPa')
             self.create_concrete_material('CONCRETE_ZERO', fc_mpa, 0)
         point_coords_table_key = "OBJECT GEOMETRY - POINT COORDINATES"
-        curr_point_content = self.safe.tables_contents.get(point_coords_table_key, '')
-        scale_factor = self.safe.length_units['mm']
+        convert_point = self.safe.units.convert_point
         length_unit = self.safe.length_unit
         col_sections_dimensions = []
-        lines01_general_content = ''
-        column_properties_general_content = ''
-        column_properties02_rectangular_content = ''
-        column_property_assignments_content = ''
-        column_property_modifiers_content = ''
-        column_local_axes_content = ''
-        column_insertion_point_content = ''
-        points_content = ''
+        lines01_general_content = []
+        column_properties_general_content = []
+        column_properties02_rectangular_content = []
+        column_property_assignments_content = []
+        column_property_modifiers_content = []
+        column_local_axes_content = []
+        column_insertion_point_content = []
+        points_content = []
         i = 0
         for o in self.doc.Objects:
             if hasattr(o, "IfcType") and o.IfcType == "Column":
@@ -902,34 +1680,27 @@ class FreecadReadwriteModel():
                 x_lenght = o.Base.Height.getValueAs(length_unit)
                 y_lenght = o.Base.Width.getValueAs(length_unit)
                 rotation = math.degrees(o.Placement.Rotation.Angle) - 90
-                column_properties_general_content += f'Column=COL{self.last_line_number}   Type=Rectangular\n'
+                column_properties_general_content.append(f'Column=COL{self.last_line_number}   Type=Rectangular\n')
                 content = f"Column=COL{self.last_line_number}   MatProp=CONCRETE_ZERO   SecDim2={x_lenght}   SecDim3={y_lenght}   AutoRigid=No   AutoDrop=No   IncludeCap=No\n"
-                column_properties02_rectangular_content += content
-                column_property_assignments_content += f'Line={self.last_line_number} ColProp=COL{self.last_line_number}\n'
-                column_property_modifiers_content += f"Line={self.last_line_number}   Area=1   As2=1   As3=1   J=1   I22=0.7   I33=0.7   Weight=1\n"
-                column_local_axes_content += f"Line={self.last_line_number} Angle={rotation}\n"
-                column_insertion_point_content += f'Line={self.last_line_number}   CardinalPt="10 (centroid)"\n'
+                column_properties02_rectangular_content.append(content)
+                column_property_assignments_content.append(f'Line={self.last_line_number} ColProp=COL{self.last_line_number}\n')
+                column_property_modifiers_content.append(f"Line={self.last_line_number}   Area=1   As2=1   As3=1   J=1   I22=0.7   I33=0.7   Weight=1\n")
+                column_local_axes_content.append(f"Line={self.last_line_number} Angle={rotation}\n")
+                column_insertion_point_content.append(f'Line={self.last_line_number}   CardinalPt="10 (centroid)"\n')
                 # if col_sections_dimensions:
  
  
                 # height = o.Height.getValueAs(length_unit)
-                coord1 = [coord * scale_factor for coord in (v1.x, v1.y, v1.z)]
-                coord2 = [coord * scale_factor for coord in (v2.x, v2.y, v2.z)]
-                p1_name = self.safe.is_point_exist(coord1, curr_point_content + points_content)
-                p2_name = self.safe.is_point_exist(coord2, curr_point_content + points_content)
-                if p1_name is None:
-                    points_content += f"Point={self.last_point_number}   GlobalX={coord1[0]}   GlobalY={coord1[1]}   GlobalZ={coord1[2]}   SpecialPt=No\n"
-                    p1_name = self.last_point_number
-                    self.last_point_number += 1
-                if p2_name is None:
-                    points_content += f"Point={self.last_point_number}   GlobalX={coord2[0]}   GlobalY={coord2[1]}   GlobalZ={coord2[2]}   SpecialPt=No\n"
-                    p2_name = self.last_point_number
-                    self.last_point_number += 1
-                lines01_general_content += f'Line={self.last_line_number}   PointI={p1_name}   PointJ={p2_name}   LineType=Column\n'
+                coord1 = convert_point(v1)
+                coord2 = convert_point(v2)
+                p1_name, p1_content = self.create_point(coord1)
+                p2_name, p2_content = self.create_point(coord2)
+                points_content.extend((p1_content, p2_content))
+                lines01_general_content.append(f'Line={self.last_line_number}   PointI={p1_name}   PointJ={p2_name}   LineType=Column\n')
                 self.last_line_number += 1
                 
         if points_content:
-            self.safe.add_content_to_table(point_coords_table_key, points_content)
+            self.safe.add_content_to_table(point_coords_table_key, points_content, points_indexed=True)
         # Add to F2k
         tables_contents = {
             "OBJECT GEOMETRY - LINES 01 - GENERAL": lines01_general_content,
@@ -947,9 +1718,72 @@ class FreecadReadwriteModel():
         table_key = "DESIGN PREFERENCES 02 - REBAR COVER - SLABS"
         foun = self.doc.Foundation
         cover_mm = foun.cover.getValueAs('mm')
-        cover = cover_mm * self.safe.length_units['mm']
+        cover = cover_mm * self.safe.units.mm
         content = f'\tCoverTop={cover}   CoverBot={cover}   BarSize=18  InnerLayer=B    SlabType="Two Way"\n'
-        self.safe.tables_contents[table_key] = content
+        self.safe.add_content_to_table(table_key, content, append=False)
+
+def get_shape_polygons(
+        shape : 'Part.Shape',
+        top_faces : bool = False,
+        ) -> list:
+    '''
+    return the sorted points of faces of shape that are exported as areas. if
+    top_faces is True, only the top faces of shape are used.
+    '''
+    if top_faces:
+        faces = osafe_funcs.get_top_faces(shape)
+        return [osafe_funcs.get_sort_points(face.Edges) for face in faces]
+    return [FreecadReadwriteModel.get_sort_points(face.Edges, tol=0.01) for face in shape.Faces]
+
+def get_brep_polygons(
+        brep : str,
+        top_faces : bool = False,
+        ) -> list:
+    '''
+    process pool worker for get_shape_polygons. each point is returned as
+    the index of its vertex in shape.Vertexes, so the coordinates are taken
+    from the original shape and BREP precision does not change the output.
+    '''
+    shape = Part.Shape()
+    shape.importBrepFromString(brep)
+    vertexes = {}
+    for i, v in enumerate(shape.Vertexes):
+        vertexes.setdefault((v.X, v.Y, v.Z), i)
+    return [
+        [vertexes.get((p.x, p.y, p.z), (p.x, p.y, p.z)) for p in points]
+        for points in get_shape_polygons(shape, top_faces)
+        ]
+
+def get_coordinates_and_offsets(polygons : list) -> tuple:
+    '''
+    pack a list of polygons, each one a list of points with x, y, z
+    attributes, to an (N, 3) array of coordinates and an offsets array
+    '''
+    coordinates = [(p.x, p.y, p.z) for points in polygons for p in points]
+    offsets = np.zeros(len(polygons) + 1, dtype=int)
+    offsets[1:] = np.cumsum([len(points) for points in polygons])
+    return np.array(coordinates, dtype=float).reshape(-1, 3), offsets
+
+def get_area_rows(area_name, point_names : list) -> list:
+    '''
+    return the "OBJECT GEOMETRY - AREAS 01 - GENERAL" rows of an area with
+    point_names as its vertices
+    '''
+    n = len(point_names)
+    rows = [f"\tArea={area_name}   NumPoints={n}"]
+    m = n - n % 4
+    for i in range(0, m, 4):
+        nodes = point_names[i:i + 4]
+        if i == 0:
+            rows.append(f"\tPoint1={nodes[0]}   Point2={nodes[1]}   Point3={nodes[2]}   Point4={nodes[3]}\n")
+        else:
+            rows.append(f"\tArea={area_name}   Point1={nodes[0]}   Point2={nodes[1]}   Point3={nodes[2]}   Point4={nodes[3]}\n")
+    for i, node in enumerate(point_names[m:], start=1):
+        if i == 1 and n > 4:
+            rows.append(f"Area={area_name}")
+        rows.append(f"\tPoint{i}={node}   ")
+    rows.append('\n')
+    return rows
 
 def is_straight_line(edges, tol=1e-7):
     if len(edges) > 1:
@@ -961,40 +1795,52 @@ def is_straight_line(edges, tol=1e-7):
                 return False
     return True
 
+def get_f2k_dialect(content : str) -> tuple:
+    '''
+    return the dialect and version of f2k file from the start of its content,
+    the earliest version marker in content is used
+    '''
+    found = (None, None)
+    first = len(content)
+    for dialect in DIALECTS:
+        for marker, version in dialect.version_markers:
+            i = content.find(marker, 0, first)
+            if i != -1:
+                first = i
+                found = (dialect, version)
+    return found
+
 def get_f2k_version(doc=None,
                     content: str='',
+                    head_size: int=4096,
                     ):
+    '''
+    return the SAFE version of content or doc.Safe.input file, only the
+    first head_size characters of file are read when they contain the
+    version
+    '''
     if doc is None:
         doc = FreeCAD.ActiveDocument
         if doc is None:
             return None
     if content:
-        lines = content.split('\n')
-        for line in lines:
-            if 'SAFE "8' in line:
-                return 8
-            elif "SAFE 12" in line:
-                return 12
-            elif 'Version=14' in line:
-                return 14
-            elif 'Version=16' in line:
-                return 16
-    else:
-        if not hasattr(doc, 'Safe'):
-            return None
-        if doc.Safe.input == '' or not Path(doc.Safe.input).exists():
-            return None
-        with open(doc.Safe.input) as f:
-            for line in f:
-                if 'SAFE "8' in line:
-                    return 8
-                elif "SAFE 12" in line:
-                    return 12
-                elif 'Version=14' in line:
-                    return 14
-                elif 'Version=16' in line:
-                    return 16
-    return None
+        return get_f2k_dialect(content)[1]
+    if not hasattr(doc, 'Safe'):
+        return None
+    if doc.Safe.input == '' or not Path(doc.Safe.input).exists():
+        return None
+    with open(doc.Safe.input) as f:
+        content = f.read(head_size)
+        version = get_f2k_dialect(content)[1]
+        while version is None:
+            # keep the last line, a marker can be split between reads
+            tail = content[content.rfind('\n') + 1:]
+            chunk = f.read(head_size)
+            if not chunk:
+                break
+            content = tail + chunk
+            version = get_f2k_dialect(content)[1]
+    return version
 
 if __name__ == '__main__':
     import sys
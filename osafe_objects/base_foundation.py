@@ -43,6 +43,7 @@ def make_base_foundation(
     if FreeCAD.GuiUp:
         vobj = obj.ViewObject
         ViewProviderBaseFoundation(vobj)
+        format_base_foundation(obj)
     FreeCAD.ActiveDocument.recompute()
     return obj
 
@@ -171,41 +172,14 @@ class BaseFoundation(ArchComponent.Component):
         super().onDocumentRestored(obj)
         self.set_properties(obj)
 
+    def onChanged(self, obj, prop):
+        super().onChanged(obj, prop)
+        if prop == 'layer' and not obj.Document.Restoring:
+            format_base_foundation(obj)
+
     def execute(self, obj):
         if obj.width.Value == 0:
             return
-        if obj.layer == 'A':
-            osafe_funcs.format_view_object(
-            obj=obj,
-            shape_color_entity="base_foundation_a_shape_color",
-            line_width_entity="base_foundation_a_line_width",
-            transparency_entity="base_foundation_a_transparency",
-            display_mode_entity="base_foundation_a_display_mode",
-            line_color_entity="base_foundation_a_line_color",
-            )
-        elif obj.layer == 'B':
-            osafe_funcs.format_view_object(
-            obj=obj,
-            shape_color_entity="base_foundation_b_shape_color",
-            line_width_entity="base_foundation_a_line_width",
-            transparency_entity="base_foundation_a_transparency",
-            display_mode_entity="base_foundation_a_display_mode",
-            line_color_entity="base_foundation_b_line_color",
-            )
-        elif obj.layer == 'other':
-            osafe_funcs.format_view_object(
-            obj=obj,
-            shape_color_entity="base_foundation_b_shape_color",
-            line_width_entity="base_foundation_a_line_width",
-            transparency_entity="base_foundation_a_transparency",
-            display_mode_entity="base_foundation_a_display_mode",
-            line_color_entity="base_foundation_b_line_color",
-            )
-            color = (0.20,1.00,0.00)
-            obj.ViewObject.ShapeColor = obj.ViewObject.LineColor = color
-        obj.Base.ViewObject.LineColor = obj.ViewObject.LineColor
-        obj.Base.ViewObject.PointColor = obj.ViewObject.PointColor
-        obj.Base.ViewObject.LineWidth = 3.00
         if obj.align == 'Left':
             sl = obj.left_width.Value
             sr = obj.width.Value - sl
@@ -218,13 +192,119 @@ class BaseFoundation(ArchComponent.Component):
             sr = sl = obj.width.Value / 2
             obj.right_width = sr
             obj.left_width = sl
-
+        key = get_geometry_key(obj, sl, sr)
+        # derived shapes only depend on the key, reuse them when it is not changed
+        if (
+            key == getattr(self, 'geometry_key', None) and
+            not obj.plan.isNull() and
+            not obj.extended_shape.isNull()
+            ):
+            return
         obj.plan, _, _ = osafe_funcs.get_left_right_offset_wire_and_shape(obj.Base.Shape, sl, sr)
         obj.Shape = obj.plan.extrude(FreeCAD.Vector(0, 0, -obj.height.Value))
         extended_main_wire, e1, e2 = osafe_funcs.get_extended_wire(obj.Base.Shape.Wires[0])
         obj.extended_first_edge = e1
         obj.extended_last_edge = e2
         obj.extended_shape, *_ = osafe_funcs.get_left_right_offset_wire_and_shape(extended_main_wire, sl, sr)
+        self.geometry_key = key
+
+
+def get_geometry_key(obj, sl : float, sr : float) -> tuple:
+    '''
+    return the values that the derived shapes of base foundation obj depend
+    on, sl and sr are the left and right widths
+    '''
+    base_shape = obj.Base.Shape
+    return (
+        tuple(tuple(v.Point) for v in base_shape.Vertexes),
+        tuple(get_edge_key(e) for e in base_shape.Edges),
+        obj.align,
+        sl,
+        sr,
+        obj.height.Value,
+        )
+
+def get_edge_key(edge) -> tuple:
+    '''
+    return the curve type, length and for arcs the center and radius of edge
+    '''
+    curve = edge.Curve
+    key = (curve.TypeId, round(edge.Length, 6))
+    if hasattr(curve, 'Radius') and hasattr(curve, 'Center'):
+        key += (tuple(curve.Center), curve.Radius)
+    return key
+
+def format_base_foundation(obj) -> None:
+    '''
+    apply the view preferences of the layer of base foundation obj to it and
+    its Base
+    '''
+    if not FreeCAD.GuiUp or obj.ViewObject is None:
+        return
+    if obj.layer == 'A':
+        osafe_funcs.format_view_object(
+        obj=obj,
+        shape_color_entity="base_foundation_a_shape_color",
+        line_width_entity="base_foundation_a_line_width",
+        transparency_entity="base_foundation_a_transparency",
+        display_mode_entity="base_foundation_a_display_mode",
+        line_color_entity="base_foundation_a_line_color",
+        )
+    elif obj.layer == 'B':
+        osafe_funcs.format_view_object(
+        obj=obj,
+        shape_color_entity="base_foundation_b_shape_color",
+        line_width_entity="base_foundation_a_line_width",
+        transparency_entity="base_foundation_a_transparency",
+        display_mode_entity="base_foundation_a_display_mode",
+        line_color_entity="base_foundation_b_line_color",
+        )
+    elif obj.layer == 'other':
+        osafe_funcs.format_view_object(
+        obj=obj,
+        shape_color_entity="base_foundation_b_shape_color",
+        line_width_entity="base_foundation_a_line_width",
+        transparency_entity="base_foundation_a_transparency",
+        display_mode_entity="base_foundation_a_display_mode",
+        line_color_entity="base_foundation_b_line_color",
+        )
+        color = (0.20,1.00,0.00)
+        obj.ViewObject.ShapeColor = obj.ViewObject.LineColor = color
+    if obj.Base and obj.Base.ViewObject is not None:
+        obj.Base.ViewObject.LineColor = obj.ViewObject.LineColor
+        obj.Base.ViewObject.PointColor = obj.ViewObject.PointColor
+        obj.Base.ViewObject.LineWidth = 3.00
+
+
+class PreferencesObserver:
+    '''
+    format the base foundations of open documents when a base foundation
+    preference is changed, the changes in one event loop are applied once
+    '''
+    def __init__(self):
+        self.pending = False
+
+    def onChange(self, param_grp, param):
+        if not param.startswith('base_foundation_') or self.pending:
+            return
+        from PySide import QtCore
+        self.pending = True
+        QtCore.QTimer.singleShot(0, self.format_all)
+
+    def format_all(self):
+        self.pending = False
+        for doc in FreeCAD.listDocuments().values():
+            for o in doc.Objects:
+                if hasattr(o, 'Proxy') and getattr(o.Proxy, 'Type', None) == 'BaseFoundation':
+                    format_base_foundation(o)
+
+preferences_observer = None
+
+def observe_preferences() -> None:
+    global preferences_observer
+    if preferences_observer is None:
+        preferences_observer = PreferencesObserver()
+        FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/OSAFE").Attach(preferences_observer)
 
 
 class ViewProviderBaseFoundation:
@@ -234,6 +314,7 @@ class ViewProviderBaseFoundation:
     def attach(self, vobj):
         self.ViewObject = vobj
         self.Object = vobj.Object
+        observe_preferences()
 
     def claimChildren(self):
         children = [self.Object.Base]
@@ -165,28 +165,35 @@ class Foundation(ArchComponent.Component):
         if obj.redraw:
             obj.redraw = False
             return
-        QtCore.QTimer().singleShot(50, self._execute)
+        schedule_rebuild(obj)
 
-    def _execute(self):
-        obj = FreeCAD.ActiveDocument.getObject(self.obj_name)
+    def _execute(self, obj=None):
+        if obj is None:
+            obj = FreeCAD.ActiveDocument.getObject(self.obj_name)
+        if not obj:
+            return
         if obj.height == 0:
             obj.d = obj.height_punch - obj.cover
         else:
             obj.d = obj.height - obj.cover
-        if not obj:
-            FreeCAD.ActiveDocument.recompute()
-            return
+        signature = get_geometry_signature(obj)
+        # when only d or fc is changed, the shape of foundation is not rebuilt
+        if signature != getattr(self, 'geometry_signature', None) or obj.plan.isNull():
+            shapes = osafe_funcs.get_foundation_shape_from_base_foundations(
+                    obj.base_foundations,
+                    height = obj.height.Value,
+                    foundation_type = obj.foundation_type,
+                    continuous_layer = obj.continuous_layer,
+                    openings=obj.openings,
+                    split_mat=obj.split,
+                    slabs=obj.Slabs,
+                    tol=obj.tolerance,
+                    cache=get_shape_cache(obj),
+                    )
+            obj.Shape, obj.outer_wire, obj.plan, obj.plan_without_openings = shapes
+            self.geometry_signature = signature
         obj.redraw = True
-        obj.Shape, obj.outer_wire, obj.plan, obj.plan_without_openings = osafe_funcs.get_foundation_shape_from_base_foundations(
-                obj.base_foundations,
-                height = obj.height.Value,
-                foundation_type = obj.foundation_type,
-                continuous_layer = obj.continuous_layer,
-                openings=obj.openings,
-                split_mat=obj.split,
-                slabs=obj.Slabs,
-                tol=obj.tolerance,
-                )
+        update_punches(obj)
         # obj.plan, obj.plan_without_openings, holes = osafe_funcs.get_foundation_plan_with_holes(obj)
         # obj.Shape = obj.plan.copy().extrude(FreeCAD.Vector(0, 0, -obj.height.Value))
         # for i, face in enumerate(obj.Shape.Faces, start=1):
@@ -200,7 +207,8 @@ class Foundation(ArchComponent.Component):
         # 		o.References = [obj, obj.top_face]
         # obj.d = obj.height - obj.cover
         obj.volume = obj.Shape.Volume / 1e9
-        FreeCAD.ActiveDocument.recompute()
+        # only the foundation and the objects that depend on it are recomputed
+        obj.Document.recompute([obj] + obj.InListRecursive)
 
     def onDocumentRestored(self, obj):
         super().onDocumentRestored(obj)
@@ -242,6 +250,124 @@ class ViewProviderFoundation:
         action1.triggered.connect(explode_foundation)
         menu.addAction(action1)
 
+REBUILD_DELAY = 50
+rebuild_timers = {}
+
+def schedule_rebuild(obj, delay : int = REBUILD_DELAY) -> None:
+    '''
+    schedule the rebuild of foundation obj after delay ms. each call restarts
+    the timer of obj, so the changes in the window are merged into one
+    rebuild and the pending rebuild is cancelled by the newer one.
+    '''
+    key = (obj.Document.Name, obj.Name)
+    timer = rebuild_timers.get(key)
+    if timer is None:
+        timer = QtCore.QTimer()
+        timer.setSingleShot(True)
+        timer.timeout.connect(lambda: rebuild_foundation(*key))
+        rebuild_timers[key] = timer
+    timer.start(delay)
+
+def is_rebuild_pending(obj) -> bool:
+    timer = rebuild_timers.get((obj.Document.Name, obj.Name))
+    return timer is not None and timer.isActive()
+
+def cancel_rebuild(obj) -> None:
+    timer = rebuild_timers.get((obj.Document.Name, obj.Name))
+    if timer is not None:
+        timer.stop()
+
+def rebuild_foundation(doc_name : str, obj_name : str) -> None:
+    '''
+    rebuild the foundation obj_name of document doc_name, if the object or
+    the document is removed, its timer is removed too.
+    '''
+    doc = FreeCAD.listDocuments().get(doc_name)
+    obj = doc.getObject(obj_name) if doc else None
+    if obj is None or not hasattr(obj, 'Proxy'):
+        timer = rebuild_timers.pop((doc_name, obj_name), None)
+        if timer is not None:
+            timer.deleteLater()
+        shape_caches.pop((doc_name, obj_name), None)
+        return
+    obj.Proxy._execute(obj)
+
+shape_caches = {}
+
+def get_shape_cache(obj) -> osafe_funcs.ShapeCache:
+    '''
+    return the ShapeCache of foundation obj, the shapes of base foundations
+    that are not edited since the last rebuild are reused from it
+    '''
+    key = (obj.Document.Name, obj.Name)
+    cache = shape_caches.get(key)
+    if cache is None:
+        cache = osafe_funcs.ShapeCache()
+        shape_caches[key] = cache
+    return cache
+
+def get_geometry_signature(obj) -> tuple:
+    '''
+    return the values that the shape of foundation depends on, the shapes
+    of linked objects are compared with their geometry
+    '''
+    links = obj.base_foundations + obj.openings + obj.Slabs
+    return (
+        tuple((o.Name, get_shape_signature(o.Shape)) for o in links),
+        obj.height.Value,
+        obj.foundation_type,
+        obj.continuous_layer,
+        obj.split,
+        obj.tolerance,
+        )
+
+def get_shape_signature(shape) -> tuple:
+    '''
+    return the geometry values of shape, area, volume and its vertexes
+    '''
+    if shape.isNull():
+        return ()
+    return (
+        round(shape.Area, 3),
+        round(shape.Volume, 3),
+        tuple(round(c, 3) for v in shape.Vertexes for c in v.Point),
+        )
+
+def update_punches(obj) -> list:
+    '''
+    recompute the punches of foundation obj in one pass and return them
+    '''
+    from osafe_objects.punch import get_foundation_punches, recompute_punches
+    processes = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/OSAFE").GetInt("punch_processes", 1)
+    punches = get_foundation_punches(obj)
+    recompute_punches(punches, processes=processes)
+    return punches
+
+def update_foundation_d_fc(
+    obj,
+    cover : Union[float, None] = None,
+    fc : Union[float, None] = None,
+    ) -> None:
+    '''
+    change cover in mm and fc in MPa of foundation obj and update d and its
+    punches. the shape of foundation is not changed, so it is not rebuilt,
+    the other objects that depend on foundation are touched for the next
+    recompute.
+    '''
+    if cover is not None:
+        obj.cover = cover
+    if fc is not None:
+        obj.fc = f"{fc} MPa"
+    if obj.height == 0:
+        obj.d = obj.height_punch - obj.cover
+    else:
+        obj.d = obj.height - obj.cover
+    punches = update_punches(obj)
+    for o in obj.InList:
+        if o not in punches:
+            o.touch()
+    obj.purgeTouched()
+
 def explode_foundation():
     FreeCADGui.runCommand('osafe_explode_foundation')
 
@@ -1,6 +1,12 @@
+from collections import OrderedDict
+import hashlib
+import itertools
 import math
 from pathlib import Path
 from typing import Union
+
+import numpy as np
+
 import FreeCAD
 import Part
 if FreeCAD.GuiUp:
@@ -232,6 +238,13 @@ class Punch:
                 "combos_ratio",
                 "Punch",
                 )
+        if not hasattr(obj, "screening"):
+            obj.addProperty(
+                "App::PropertyBool",
+                "screening",
+                "Punch",
+                "Compute only the governing Ratio, combos ratio are computed when they are needed",
+                ).screening = False
 
         if not hasattr(obj, "foundation_plan"):
             obj.addProperty(
@@ -344,188 +357,71 @@ class Punch:
 
     def onDocumentRestored(self, obj):
         self.set_properties(obj)
+        if obj.column and migrate_column_combos_load(obj.column):
+            obj.column.purgeTouched()
 
     def execute(self, obj):
-        d = obj.foundation.d.Value
         obj.fc = obj.foundation.fc
-        # try to find base plate if column is steel
-        obj.angle = math.degrees(obj.column.Placement.Rotation.Angle) - 90
-        base_plate = None
-        if hasattr(obj.column, 'base_plate') and obj.column.base_plate:
-            base_plate = obj.column.base_plate
-        colbb = obj.column.Shape.BoundBox
-        if base_plate:
-            bpbb = base_plate.Shape.BoundBox
-            center = bpbb.Center.add(colbb.Center) / 2
-            obj.bx = (base_plate.Bx + obj.column.Base.Height).Value / 2
-            obj.by = (base_plate.By + obj.column.Base.Width).Value / 2
-        else:
-            center = colbb.Center
-            if hasattr(obj.column.Base, 'Radius'):
-                obj.bx = obj.by = math.sqrt(obj.column.Base.Area.Value)
-            else:
-                obj.bx = obj.column.Base.Height.Value
-                obj.by = obj.column.Base.Width.Value
-        load_center = colbb.Center
-        obj.center_of_load = FreeCAD.Vector(load_center.x, load_center.y, colbb.ZMin)
-        obj.center_of_column = FreeCAD.Vector(center.x, center.y, colbb.ZMin)
-        x = obj.bx + d
-        y = obj.by + d
-        offset_shape = osafe_funcs.rectangle_face(obj.center_of_column, x, y)
-        foun_plan = obj.foundation.plan.copy()
-        # for rotate columns the location must be for not rotated columns
-        not_rotate_edges = osafe_funcs.punch_area_edges(foun_plan, offset_shape)
-        not_rotate_faces = osafe_funcs.punch_faces(not_rotate_edges, d)
-        if obj.user_location:
-            not_rotate_faces = osafe_funcs.get_user_location_faces(not_rotate_faces, obj.Location)
-        obj.Location = osafe_funcs.location_of_column(not_rotate_faces)
-        if obj.angle != 0:
-            foun_plan.rotate(
-                obj.center_of_column,
-                FreeCAD.Vector(0, 0, 1),
-                -obj.angle.Value,
-                )
-        edges = osafe_funcs.punch_area_edges(foun_plan, offset_shape)
-        faces = osafe_funcs.punch_faces(edges, d)
-        if obj.user_location:
-            faces = osafe_funcs.get_user_location_faces(faces, obj.Location)
-        obj.alpha_s = self.alphas(obj.Location)
-        obj.I22, obj.I33, obj.I23 = osafe_funcs.moment_inertia(faces)
-        if 'Corner' in obj.Location:
-            obj.I23 = 0
-        obj.Area = f"{osafe_funcs.area(faces)} mm^2"
-        obj.center_of_punch = osafe_funcs.center_of_mass(faces)
-        obj.b0 = osafe_funcs.length_of_edges(edges)
-        obj.gamma_vx, obj.gamma_vy = osafe_funcs.gamma_v(obj.bx, obj.by)
-        obj.d = d
-        self.allowable_stress(obj)
-        edges = Part.makeCompound(edges)
-        if obj.angle != 0:
-            obj.edges = edges.rotate(
-                obj.center_of_column,
-                FreeCAD.Vector(0, 0, 1),
-                obj.angle.Value,
-                )
-        else:
-            obj.edges = edges
-        # faces = Part.makeCompound(faces)
-        rect = osafe_funcs.rectangle_face(obj.center_of_column, obj.bx, obj.by)
-        if obj.angle.Value != 0:
-            rect.rotate(
-                obj.center_of_column,
-                FreeCAD.Vector(0, 0, 1),
-                obj.angle.Value,
+        location = obj.Location if obj.user_location else None
+        results = solve_punch(
+            foundation_plan=obj.foundation.plan,
+            column=obj.column,
+            d=obj.foundation.d.Value,
+            fc=obj.fc.getValueAs('MPa').Value,
+            location=location,
+            cache=get_section_cache(obj.Document.Name),
+            screening=obj.screening,
             )
-        obj.rect = rect
-        obj.faces = Part.makeCompound(faces)
-        if obj.angle.Value != 0:
-            faces = [f.rotate(
-                    obj.center_of_column,
-                    FreeCAD.Vector(0, 0, 1),
-                    obj.angle.Value,
-                ) for f in faces]
-        comp = Part.makeCompound(faces + [obj.rect])
-        obj.Shape = comp
-        self.punch_ratios(obj)
-
-        # calculate stirrups
-        if float(obj.Ratio) > 1.0:
-            obj.Use_Reinforcement = True
-            
-        # if obj.Use_Reinforcement:
-            Av_over_s = (obj.Vu / 0.75 - obj.Vc) / (obj.Fys * obj.foundation.d)
-            obj.s = max(0, obj.Av / Av_over_s)
-            if obj.s == 0:
-                obj.Vs = 0
-            else:
-                obj.Vs = obj.Av * obj.Fys * obj.foundation.d / obj.s
-            # calculate required length for arranging stirrups
-            Vu = obj.Vu.getValueAs('N').Value
-            fc = obj.fc.getValueAs('MPa').Value
-            b0_prim = Vu * 6 / (math.sqrt(fc) * obj.d)
-            if "Corner" in obj.Location:
-                n = 4
-            elif "Edge" in obj.Location:
-                n = 2
-            elif obj.Location == "Interior":
-                n = 1
-            x = n * b0_prim / (2 * math.pi) - obj.d / 2
-            if x > 0:
-                obj.x = f"{x} mm"
-            else:
-                obj.x = 0
-        if obj.Vs > 2 * obj.Vc:
-            # text = '<html> <span style=" font-size:9pt; font-weight:600; color:#FF0000;">Vs is greater than 2 * Vc</span>'
-            text = 'Vs > 2 * Vc'
-            obj.Warnings = text
-        else:
-            obj.Warnings = ""
+        set_punch_results(obj, results)
+        self.calculate_stirrups(obj)
 
+    def calculate_stirrups(self, obj):
+        calculate_punches_stirrups([obj])
 
     def alphas(self, location):
-        if 'Interior' in location:
-            return 40
-        elif 'Edge' in location:
-            return 30
-        elif 'Corner' in location:
-            return 20
+        return get_alpha_s(location)
 
     def allowable_stress(self, obj, phi_c=.75):
-        b0d = obj.Area.getValueAs('mm^2').Value
-        beta = obj.bx / obj.by
-        if beta < 1:
-            beta = obj.by / obj.bx
-        fc = obj.fc.getValueAs("N/mm^2").Value
-        obj.one_way_shear_capacity = f"{math.sqrt(fc) * b0d / 6 * phi_c} N"
-        Vc1 = obj.one_way_shear_capacity * 2
-        Vc2 = obj.one_way_shear_capacity * (1 + 2 / beta)
-        Vc3 = obj.one_way_shear_capacity * (2 + obj.alpha_s * obj.d / obj.b0) / 2
-        obj.Vc = min(Vc1, Vc2, Vc3)
-        obj.vc = obj.Vc / (obj.Area)
+        one_way_shear_capacity, Vc, vc = allowable_stress(
+            bx=obj.bx,
+            by=obj.by,
+            alpha_s=obj.alpha_s,
+            fc=obj.fc.getValueAs("N/mm^2").Value,
+            b0=obj.b0,
+            b0d=obj.Area.getValueAs('mm^2').Value,
+            d=obj.d,
+            phi_c=phi_c,
+            )
+        obj.one_way_shear_capacity = f"{one_way_shear_capacity} N"
+        obj.Vc = f"{Vc} N"
+        obj.vc = f"{vc} MPa"
         return obj.one_way_shear_capacity, obj.Vc, obj.vc
 
     def ultimate_shear_stress(self, obj):
-        location = obj.Location
-        angle = math.radians(obj.angle.Value)
-        cosine = math.cos(angle)
-        sinus = math.sin(angle)
-        location = location.rstrip('1234').lower()
-        I22 = obj.I22
-        I33 = obj.I33
-        I23 = obj.I23
         b0d = obj.Area.getValueAs('mm^2').Value
-        x1, y1, _ = obj.center_of_load
-        x3, y3, _ = obj.center_of_punch
-        combos_Vu = dict()
-        for combo, forces in obj.column.combos_load.items():
-            faces_ratio = []
-            for f in obj.faces.Faces:
-                x4 = f.CenterOfMass.x
-                y4 = f.CenterOfMass.y
-                vu, mx, my = [float(force) for force in forces.split(",")]
-                Vu = vu / b0d + \
-                    (obj.gamma_vx * (mx * cosine - my * sinus - vu * (y3 - y1)) * (I33 * (y4 - y3) - I23 * (x4 - x3))) / (I22 * I33 - I23 ** 2) - \
-                    (obj.gamma_vy * (my * cosine + mx * sinus - vu * (x3 - x1)) * (I22 * (x4 - x3) - I23 * (y4 - y3))) / (I22 * I33 - I23 ** 2)
-                Vu *= 1000
-                faces_ratio.append(Vu)
-            max_ratio_in_combo = max(faces_ratio)
-            combos_Vu[combo] = f"{max_ratio_in_combo:.2f}"
-        # adding maximum value of Vu to combos_Vu
-        max_Vu = max([float(vu) for vu in combos_Vu.values()])
-        combos_Vu["Max"] = str(max_Vu)
+        combos, forces = get_column_combos_forces(obj.column)
+        stresses = ultimate_shear_stresses(
+            forces=forces,
+            faces_centers=get_faces_centers(obj.faces.Faces),
+            center_of_load=obj.center_of_load,
+            center_of_punch=obj.center_of_punch,
+            b0d=b0d,
+            I22=obj.I22,
+            I33=obj.I33,
+            I23=obj.I23,
+            gamma_vx=obj.gamma_vx,
+            gamma_vy=obj.gamma_vy,
+            angle=obj.angle.Value,
+            )
+        combos_Vu = get_combos_Vu(combos, stresses)
+        max_Vu = float(combos_Vu["Max"])
         # max_Vu is shear stress, we multiply it with punch area to get ultimate shear force
         obj.Vu = f"{max_Vu * b0d} N"
         return combos_Vu
 
     def punch_ratios(self, obj):
         combos_Vu = self.ultimate_shear_stress(obj)
-        combos_ratio = dict()
-        for combo, Vu in combos_Vu.items():
-            ratio = float(Vu) / obj.vc.getValueAs('MPa').Value
-            combo_name = combo.split()[0]
-            current_ratio = combos_ratio.get(combo_name, 0)
-            ratio = max(float(current_ratio), ratio)
-            combos_ratio[combo_name] = f"{ratio:.2f}"
+        combos_ratio = get_combos_ratio(combos_Vu, obj.vc.getValueAs('MPa').Value)
         obj.combos_ratio = combos_ratio
         ratio = obj.combos_ratio["Max"]
         obj.Ratio = ratio
@@ -741,6 +637,902 @@ class Ui:
 
 
 
+def get_combos_forces(combos_load : dict) -> tuple:
+    '''
+    parse the "vu,mx,my" values of combos_load once, return the list of
+    combos and an (ncombo, 3) array of forces
+    '''
+    combos = list(combos_load.keys())
+    forces = [[float(force) for force in forces.split(",")] for forces in combos_load.values()]
+    return combos, np.array(forces, dtype=float).reshape(-1, 3)
+
+def set_column_combos_forces(
+    column,
+    combos : list,
+    forces,
+    ) -> None:
+    '''
+    store the load combos of column as a string list of combos names and a
+    float list of vu, mx, my of each combo, it is smaller than a map of
+    strings in the document and is read without parsing
+    '''
+    if not hasattr(column, "combos_names"):
+        column.addProperty(
+            "App::PropertyStringList",
+            "combos_names",
+            "Structure",
+            )
+        column.setEditorMode('combos_names', 2)
+    if not hasattr(column, "combos_forces"):
+        column.addProperty(
+            "App::PropertyFloatList",
+            "combos_forces",
+            "Structure",
+            )
+        column.setEditorMode('combos_forces', 2)
+    column.combos_names = list(combos)
+    column.combos_forces = np.asarray(forces, dtype=float).ravel().tolist()
+
+def get_column_combos_forces(column) -> tuple:
+    '''
+    return the list of combos and the (ncombo, 3) array of forces of column
+    from combos_forces, or from the combos_load map of older documents
+    '''
+    if hasattr(column, "combos_forces") and column.combos_forces:
+        forces = np.array(column.combos_forces, dtype=float).reshape(-1, 3)
+        return list(column.combos_names), forces
+    return get_combos_forces(getattr(column, "combos_load", {}))
+
+def migrate_column_combos_load(column) -> bool:
+    '''
+    move the combos_load map of column to combos_names and combos_forces,
+    return True if column is changed
+    '''
+    if not getattr(column, "combos_load", None):
+        return False
+    combos, forces = get_column_combos_forces(column)
+    set_column_combos_forces(column, combos, forces)
+    column.combos_load = {}
+    return True
+
+def get_faces_centers(faces : list) -> np.ndarray:
+    '''
+    return the (nface, 2) array of x, y of center of mass of faces
+    '''
+    centers = []
+    for f in faces:
+        center = f.CenterOfMass
+        centers.append((center.x, center.y))
+    return np.array(centers, dtype=float).reshape(-1, 2)
+
+def ultimate_shear_stresses(
+    forces : np.ndarray,
+    faces_centers : np.ndarray,
+    center_of_load,
+    center_of_punch,
+    b0d : float,
+    I22 : float,
+    I33 : float,
+    I23 : float,
+    gamma_vx : float,
+    gamma_vy : float,
+    angle : float = 0,
+    ) -> np.ndarray:
+    '''
+    return the maximum ultimate shear stress on the faces of critical
+    section for each combo. forces is the (ncombo, 3) array of vu, mx, my,
+    faces_centers is the (nface, 2) array of faces center of mass and angle
+    is the rotation of column in degrees. all combos and faces are computed
+    in one broadcast of (ncombo, 1) forces with (nface,) centers.
+    '''
+    angle = math.radians(angle)
+    cosine = math.cos(angle)
+    sinus = math.sin(angle)
+    x1, y1 = center_of_load[0], center_of_load[1]
+    x3, y3 = center_of_punch[0], center_of_punch[1]
+    vu = forces[:, 0:1]
+    mx = forces[:, 1:2]
+    my = forces[:, 2:3]
+    x4 = faces_centers[:, 0]
+    y4 = faces_centers[:, 1]
+    Vu = vu / b0d + \
+        (gamma_vx * (mx * cosine - my * sinus - vu * (y3 - y1)) * (I33 * (y4 - y3) - I23 * (x4 - x3))) / (I22 * I33 - I23 ** 2) - \
+        (gamma_vy * (my * cosine + mx * sinus - vu * (x3 - x1)) * (I22 * (x4 - x3) - I23 * (y4 - y3))) / (I22 * I33 - I23 ** 2)
+    Vu *= 1000
+    return Vu.max(axis=1)
+
+def get_section_moduli(
+    faces_centers : np.ndarray,
+    center_of_punch,
+    I22 : float,
+    I33 : float,
+    I23 : float,
+    ) -> tuple:
+    '''
+    return the maximum absolute factors of moments about x and y on the
+    faces of critical section in ultimate_shear_stresses
+    '''
+    if len(faces_centers) == 0:
+        return 0, 0
+    x3, y3 = center_of_punch[0], center_of_punch[1]
+    dx = faces_centers[:, 0] - x3
+    dy = faces_centers[:, 1] - y3
+    det = abs(I22 * I33 - I23 ** 2)
+    sx = np.abs(I33 * dy - I23 * dx).max() / det
+    sy = np.abs(I22 * dx - I23 * dy).max() / det
+    return float(sx), float(sy)
+
+def ultimate_shear_stresses_upper_bound(
+    forces : np.ndarray,
+    center_of_load,
+    center_of_punch,
+    b0d : float,
+    section_moduli : tuple,
+    gamma_vx : float,
+    gamma_vy : float,
+    angle : float = 0,
+    ) -> np.ndarray:
+    '''
+    return an upper bound of the ultimate_shear_stresses of each combo from
+    |vu|, |mx| and |my| and the section_moduli of get_section_moduli
+    '''
+    angle = math.radians(angle)
+    cosine = math.cos(angle)
+    sinus = math.sin(angle)
+    x1, y1 = center_of_load[0], center_of_load[1]
+    x3, y3 = center_of_punch[0], center_of_punch[1]
+    sx, sy = section_moduli
+    vu = forces[:, 0]
+    mx = forces[:, 1]
+    my = forces[:, 2]
+    Vu = vu / b0d + \
+        gamma_vx * np.abs(mx * cosine - my * sinus - vu * (y3 - y1)) * sx + \
+        gamma_vy * np.abs(my * cosine + mx * sinus - vu * (x3 - x1)) * sy
+    return Vu * 1000
+
+def governing_shear_stress(
+    forces : np.ndarray,
+    faces_centers : np.ndarray,
+    center_of_load,
+    center_of_punch,
+    b0d : float,
+    I22 : float,
+    I33 : float,
+    I23 : float,
+    gamma_vx : float,
+    gamma_vy : float,
+    angle : float = 0,
+    section_moduli : Union[tuple, None] = None,
+    ) -> float:
+    '''
+    return the maximum of ultimate_shear_stresses over all combos. the upper
+    bound of each combo is computed first and the full stresses only for the
+    combos that their upper bound is more than the stress of the combo with
+    maximum upper bound, so the result is exactly the same.
+    '''
+    if section_moduli is None:
+        section_moduli = get_section_moduli(faces_centers, center_of_punch, I22, I33, I23)
+    args = (faces_centers, center_of_load, center_of_punch, b0d, I22, I33, I23, gamma_vx, gamma_vy, angle)
+    upper = ultimate_shear_stresses_upper_bound(
+        forces,
+        center_of_load,
+        center_of_punch,
+        b0d,
+        section_moduli,
+        gamma_vx,
+        gamma_vy,
+        angle,
+        )
+    first = int(np.argmax(upper))
+    best = ultimate_shear_stresses(forces[first: first + 1], *args)[0]
+    # tolerance for the rounding of upper bound
+    candidates = upper + 1e-9 * (np.abs(upper) + 1) >= best
+    return float(ultimate_shear_stresses(forces[candidates], *args).max())
+
+def get_alpha_s(location : str) -> int:
+    if 'Interior' in location:
+        return 40
+    elif 'Edge' in location:
+        return 30
+    elif 'Corner' in location:
+        return 20
+
+def get_combos_Vu(combos : list, stresses : np.ndarray) -> dict:
+    '''
+    return the formatted ultimate shear stress of combos and their maximum
+    with "Max" key
+    '''
+    combos_Vu = dict()
+    for combo, max_ratio_in_combo in zip(combos, stresses.tolist()):
+        combos_Vu[combo] = f"{max_ratio_in_combo:.2f}"
+    # adding maximum value of Vu to combos_Vu
+    max_Vu = max([float(vu) for vu in combos_Vu.values()])
+    combos_Vu["Max"] = str(max_Vu)
+    return combos_Vu
+
+def get_combos_ratio(combos_Vu : dict, vc : float) -> dict:
+    '''
+    return the ratio of ultimate shear stress of combos to allowable shear
+    stress vc in MPa, the ratio of "COMBO Max" and "COMBO Min" are merged to
+    "COMBO"
+    '''
+    combos_ratio = dict()
+    for combo, Vu in combos_Vu.items():
+        ratio = float(Vu) / vc
+        combo_name = combo.split()[0]
+        current_ratio = combos_ratio.get(combo_name, 0)
+        ratio = max(float(current_ratio), ratio)
+        combos_ratio[combo_name] = f"{ratio:.2f}"
+    return combos_ratio
+
+def get_column_dimensions(column) -> tuple:
+    '''
+    return angle, bx, by, center of load and center of column of column, if
+    column has a base plate, the dimensions are the average of column and
+    base plate
+    '''
+    angle = math.degrees(column.Placement.Rotation.Angle) - 90
+    base_plate = None
+    if hasattr(column, 'base_plate') and column.base_plate:
+        base_plate = column.base_plate
+    colbb = column.Shape.BoundBox
+    if base_plate:
+        bpbb = base_plate.Shape.BoundBox
+        center = bpbb.Center.add(colbb.Center) / 2
+        bx = (base_plate.Bx + column.Base.Height).Value / 2
+        by = (base_plate.By + column.Base.Width).Value / 2
+    else:
+        center = colbb.Center
+        if hasattr(column.Base, 'Radius'):
+            bx = by = math.sqrt(column.Base.Area.Value)
+        else:
+            bx = column.Base.Height.Value
+            by = column.Base.Width.Value
+    load_center = colbb.Center
+    center_of_load = FreeCAD.Vector(load_center.x, load_center.y, colbb.ZMin)
+    center_of_column = FreeCAD.Vector(center.x, center.y, colbb.ZMin)
+    return angle, bx, by, center_of_load, center_of_column
+
+def get_critical_section_occ(
+    foundation_plan : Part.Shape,
+    center : FreeCAD.Vector,
+    x : float,
+    y : float,
+    d : float,
+    angle : float = 0,
+    location : Union[str, None] = None,
+    ) -> tuple:
+    '''
+    compute the critical section of punch with OCC boolean cut of
+    foundation_plan and the x * y rectangle at center. return location,
+    edges, faces, centers of faces, b0, area, center of mass, I22, I33, I23.
+    '''
+    offset_shape = osafe_funcs.rectangle_face(center, x, y)
+    # for rotate columns the location must be for not rotated columns
+    not_rotate_edges = osafe_funcs.punch_area_edges(foundation_plan, offset_shape)
+    not_rotate_faces = osafe_funcs.punch_faces(not_rotate_edges, d)
+    user_location = location is not None
+    if user_location:
+        not_rotate_faces = osafe_funcs.get_user_location_faces(not_rotate_faces, location)
+    location = osafe_funcs.location_of_column(not_rotate_faces)
+    if angle != 0:
+        foundation_plan = foundation_plan.copy()
+        foundation_plan.rotate(
+            center,
+            FreeCAD.Vector(0, 0, 1),
+            -angle,
+            )
+        edges = osafe_funcs.punch_area_edges(foundation_plan, offset_shape)
+        faces = osafe_funcs.punch_faces(edges, d)
+    else:
+        edges = not_rotate_edges
+        faces = osafe_funcs.punch_faces(edges, d) if user_location else not_rotate_faces
+    if user_location:
+        faces = osafe_funcs.get_user_location_faces(faces, location)
+    I22, I33, I23 = osafe_funcs.moment_inertia(faces)
+    b0d = osafe_funcs.area(faces)
+    center_of_punch = osafe_funcs.center_of_mass(faces)
+    b0 = osafe_funcs.length_of_edges(edges)
+    faces_centers = get_faces_centers(faces)
+    return location, edges, faces, faces_centers, b0, b0d, center_of_punch, I22, I33, I23
+
+def get_critical_section_analytic(
+    plan_polygons : list,
+    center : FreeCAD.Vector,
+    x : float,
+    y : float,
+    d : float,
+    angle : float = 0,
+    location : Union[str, None] = None,
+    ) -> Union[tuple, None]:
+    '''
+    the same as get_critical_section_occ, but clips the rectangle with
+    polygons of the straight edged plan and computes the properties of
+    section directly. return None if the clipping is ambiguous or no side
+    of section remains, then the section must be computed with OCC.
+    '''
+    not_rotate_sides = osafe_funcs.get_critical_sides(plan_polygons, center, x, y)
+    if not_rotate_sides is None:
+        return None
+    if angle != 0:
+        sides = osafe_funcs.get_critical_sides(plan_polygons, center, x, y, -angle)
+        if sides is None:
+            return None
+    else:
+        sides = not_rotate_sides
+    user_location = location is not None
+    if user_location:
+        not_rotate_sides = osafe_funcs.get_user_location_sides(not_rotate_sides, location)
+    location = osafe_funcs.location_of_normals([side[2] for side in not_rotate_sides])
+    if user_location:
+        sides = osafe_funcs.get_user_location_sides(sides, location)
+    if not sides:
+        # all sides are clipped, leave it to get_critical_section_occ
+        return None
+    b0, b0d, center_of_punch, I22, I33, I23 = osafe_funcs.get_critical_section_properties(sides, d, center.z)
+    edges = osafe_funcs.sides_edges(sides, center.z)
+    faces = osafe_funcs.punch_faces(edges, d)
+    faces_centers = np.array([
+        ((p1[0] + p2[0]) / 2, (p1[1] + p2[1]) / 2) for p1, p2, _ in sides
+        ]).reshape(-1, 2)
+    return location, edges, faces, faces_centers, b0, b0d, center_of_punch, I22, I33, I23
+
+def get_column_data(column) -> dict:
+    '''
+    return the data of column that is needed for solving punch as plain
+    python values, so it can be sent to worker processes
+    '''
+    angle, bx, by, center_of_load, center_of_column = get_column_dimensions(column)
+    combos, forces = get_column_combos_forces(column)
+    return {
+        'angle': angle,
+        'bx': bx,
+        'by': by,
+        'center_of_load': tuple(center_of_load),
+        'center_of_column': tuple(center_of_column),
+        'combos': combos,
+        'forces': forces,
+        }
+
+def solve_punch(
+    foundation_plan : Part.Shape,
+    column,
+    d : float,
+    fc : float,
+    location : Union[str, None] = None,
+    plan_polygons : Union[list, None] = None,
+    cache : Union['SectionCache', None] = None,
+    screening : bool = False,
+    ) -> dict:
+    '''
+    compute the critical section, shear strength and ratios of punch of
+    column on foundation_plan, d in mm and fc in MPa. if location is not
+    None, it is the user location of punch. plan_polygons is the result of
+    osafe_funcs.get_plan_polygons of foundation_plan, if it is None, the
+    critical section is computed analytically when the plan has only
+    straight edges and with OCC otherwise. return the values of Punch
+    properties in the order that must be set.
+    '''
+    return solve_punch_data(
+        foundation_plan,
+        get_column_data(column),
+        d,
+        fc,
+        location,
+        plan_polygons,
+        cache,
+        screening=screening,
+        )
+
+class SectionCache:
+    '''
+    least recently used cache of the results of get_punch_geometry, keyed by
+    get_geometry_key. when only loads of columns change, the punches are
+    solved without computing the critical sections again.
+    '''
+    def __init__(self, maxsize : int = 1024):
+        self.maxsize = maxsize
+        self.geometries = OrderedDict()
+
+    def get(self, key):
+        geometry = self.geometries.get(key)
+        if geometry is not None:
+            self.geometries.move_to_end(key)
+        return geometry
+
+    def put(self, key, geometry : dict) -> None:
+        self.geometries[key] = geometry
+        self.geometries.move_to_end(key)
+        while len(self.geometries) > self.maxsize:
+            self.geometries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.geometries.clear()
+
+    def __len__(self):
+        return len(self.geometries)
+
+    def __contains__(self, key):
+        return key in self.geometries
+
+
+SECTION_CACHE_MAXSIZE = 20000
+section_caches = {}
+section_caches_observer = None
+
+class SectionCachesObserver:
+    '''
+    remove the SectionCache of a document when it is closed
+    '''
+    def slotDeletedDocument(self, doc):
+        section_caches.pop(doc.Name, None)
+
+def get_section_cache(doc_name : str) -> SectionCache:
+    '''
+    return the SectionCache of document with doc_name, the caches of closed
+    documents are removed
+    '''
+    global section_caches_observer
+    if section_caches_observer is None:
+        section_caches_observer = SectionCachesObserver()
+        FreeCAD.addDocumentObserver(section_caches_observer)
+    open_docs = FreeCAD.listDocuments()
+    for name in list(section_caches):
+        if name not in open_docs:
+            del section_caches[name]
+    cache = section_caches.get(doc_name)
+    if cache is None:
+        cache = section_caches[doc_name] = SectionCache()
+    return cache
+
+def get_plan_key(foundation_plan : Part.Shape) -> str:
+    '''
+    return a fingerprint of foundation_plan from its vertexes, area and
+    length of edges
+    '''
+    coordinates = np.array(
+        [(v.X, v.Y, v.Z) for v in foundation_plan.Vertexes] +
+        [(foundation_plan.Area, foundation_plan.Length, len(foundation_plan.Edges))],
+        dtype=float,
+        )
+    return hashlib.blake2b(coordinates.tobytes(), digest_size=16).hexdigest()
+
+def get_geometry_key(
+    plan_key : str,
+    column_data : dict,
+    d : float,
+    location : Union[str, None] = None,
+    ) -> tuple:
+    return (
+        plan_key,
+        column_data['angle'],
+        column_data['bx'],
+        column_data['by'],
+        tuple(column_data['center_of_column']),
+        d,
+        location,
+        )
+
+def get_punch_geometry(
+    foundation_plan : Part.Shape,
+    angle : float,
+    bx : float,
+    by : float,
+    center_of_column : FreeCAD.Vector,
+    d : float,
+    location : Union[str, None] = None,
+    plan_polygons : Union[list, None] = None,
+    ) -> dict:
+    '''
+    compute the critical section of punch and its shapes, the results only
+    depend on geometry of foundation plan and column and not on loads
+    '''
+    x = bx + d
+    y = by + d
+    if plan_polygons is None:
+        plan_polygons = osafe_funcs.get_plan_polygons(foundation_plan)
+    section = None
+    if plan_polygons is not None:
+        section = get_critical_section_analytic(plan_polygons, center_of_column, x, y, d, angle, location)
+    if section is None:
+        section = get_critical_section_occ(foundation_plan, center_of_column, x, y, d, angle, location)
+    location, edges, faces, faces_centers, b0, b0d, center_of_punch, I22, I33, I23 = section
+    alpha_s = get_alpha_s(location)
+    if 'Corner' in location:
+        I23 = 0
+    gamma_vx, gamma_vy = osafe_funcs.gamma_v(bx, by)
+    # shapes
+    edges = Part.makeCompound(edges)
+    rect = osafe_funcs.rectangle_face(center_of_column, bx, by)
+    if angle != 0:
+        edges = edges.rotate(
+            center_of_column,
+            FreeCAD.Vector(0, 0, 1),
+            angle,
+            )
+        rect.rotate(
+            center_of_column,
+            FreeCAD.Vector(0, 0, 1),
+            angle,
+        )
+    faces_compound = Part.makeCompound(faces)
+    if angle != 0:
+        faces = [f.rotate(
+                center_of_column,
+                FreeCAD.Vector(0, 0, 1),
+                angle,
+            ) for f in faces]
+    shape = Part.makeCompound(faces + [rect])
+    section_moduli = get_section_moduli(faces_centers, center_of_punch, I22, I33, I23)
+    return {
+        'location': location,
+        'alpha_s': alpha_s,
+        'I22': I22,
+        'I33': I33,
+        'I23': I23,
+        'b0d': b0d,
+        'center_of_punch': center_of_punch,
+        'b0': b0,
+        'gamma_vx': gamma_vx,
+        'gamma_vy': gamma_vy,
+        'faces_centers': faces_centers,
+        'section_moduli': section_moduli,
+        'edges': edges,
+        'rect': rect,
+        'faces': faces_compound,
+        'Shape': shape,
+        }
+
+def solve_punch_data(
+    foundation_plan : Part.Shape,
+    column_data : dict,
+    d : float,
+    fc : float,
+    location : Union[str, None] = None,
+    plan_polygons : Union[list, None] = None,
+    cache : Union[SectionCache, None] = None,
+    plan_key : Union[str, None] = None,
+    screening : bool = False,
+    ) -> dict:
+    '''
+    the same as solve_punch with the column_data of get_column_data instead
+    of column object. if cache is not None, the critical section is read
+    from it when the geometry of punch is not changed, plan_key is the
+    get_plan_key of foundation_plan. if screening is True, only the
+    governing ratio is computed and combos_ratio only has "Max" key.
+    '''
+    angle = column_data['angle']
+    bx = column_data['bx']
+    by = column_data['by']
+    center_of_load = FreeCAD.Vector(*column_data['center_of_load'])
+    center_of_column = FreeCAD.Vector(*column_data['center_of_column'])
+    geometry = None
+    if cache is not None:
+        if plan_key is None:
+            plan_key = get_plan_key(foundation_plan)
+        key = get_geometry_key(plan_key, column_data, d, location)
+        geometry = cache.get(key)
+    if geometry is None:
+        geometry = get_punch_geometry(
+            foundation_plan,
+            angle,
+            bx,
+            by,
+            center_of_column,
+            d,
+            location,
+            plan_polygons,
+            )
+        if cache is not None:
+            cache.put(key, geometry)
+    location = geometry['location']
+    alpha_s = geometry['alpha_s']
+    I22 = geometry['I22']
+    I33 = geometry['I33']
+    I23 = geometry['I23']
+    b0d = geometry['b0d']
+    center_of_punch = FreeCAD.Vector(geometry['center_of_punch'])
+    b0 = geometry['b0']
+    gamma_vx = geometry['gamma_vx']
+    gamma_vy = geometry['gamma_vy']
+    faces_centers = geometry['faces_centers']
+    edges = geometry['edges']
+    rect = geometry['rect']
+    faces_compound = geometry['faces']
+    shape = geometry['Shape']
+    one_way_shear_capacity, Vc, vc = allowable_stress(bx, by, alpha_s, fc, b0, b0d, d)
+    # ratios
+    combos = column_data['combos']
+    forces = column_data['forces']
+    kwargs = dict(
+        forces=forces,
+        faces_centers=faces_centers,
+        center_of_load=center_of_load,
+        center_of_punch=center_of_punch,
+        b0d=b0d,
+        I22=I22,
+        I33=I33,
+        I23=I23,
+        gamma_vx=gamma_vx,
+        gamma_vy=gamma_vy,
+        angle=angle,
+        )
+    # the ratio of a combo with name "Max ..." merges with the maximum ratio
+    if screening and len(combos) and not any(combo.split()[0] == "Max" for combo in combos):
+        stress = governing_shear_stress(**kwargs, section_moduli=geometry['section_moduli'])
+        combos_Vu = {"Max": str(float(f"{stress:.2f}"))}
+    else:
+        stresses = ultimate_shear_stresses(**kwargs)
+        combos_Vu = get_combos_Vu(combos, stresses)
+    combos_ratio = get_combos_ratio(combos_Vu, vc)
+    max_Vu = float(combos_Vu["Max"])
+    return {
+        'angle': angle,
+        'bx': bx,
+        'by': by,
+        'center_of_load': center_of_load,
+        'center_of_column': center_of_column,
+        'Location': location,
+        'alpha_s': alpha_s,
+        'I22': I22,
+        'I33': I33,
+        'I23': I23,
+        'Area': f"{b0d} mm^2",
+        'center_of_punch': center_of_punch,
+        'b0': b0,
+        'gamma_vx': gamma_vx,
+        'gamma_vy': gamma_vy,
+        'd': d,
+        'one_way_shear_capacity': f"{one_way_shear_capacity} N",
+        'Vc': f"{Vc} N",
+        'vc': f"{vc} MPa",
+        'edges': edges,
+        'rect': rect,
+        'faces': faces_compound,
+        'Shape': shape,
+        'Vu': f"{max_Vu * b0d} N",
+        'combos_ratio': combos_ratio,
+        'Ratio': combos_ratio["Max"],
+        }
+
+def allowable_stress(
+    bx : float,
+    by : float,
+    alpha_s : int,
+    fc : float,
+    b0 : float,
+    b0d : float,
+    d : float,
+    phi_c : float = .75,
+    ) -> tuple:
+    '''
+    return one way shear capacity and Vc in N and vc in MPa, fc in MPa and
+    lengths in mm
+    '''
+    one_way_shear_capacity, Vc, vc = osafe_funcs.allowable_stresses(
+        bx, by, alpha_s, fc, b0, b0d, d, phi_c)
+    return float(one_way_shear_capacity), float(Vc), float(vc)
+
+def calculate_punches_stirrups(punches : list) -> None:
+    '''
+    design the stirrups of punches that their ratio is more than 1 with
+    osafe_funcs.stirrups_design in one pass and set the warnings
+    '''
+    if not punches:
+        return
+    required = [float(p.Ratio) > 1.0 for p in punches]
+    s, Vs, x = osafe_funcs.stirrups_design(
+        Vu=[p.Vu.getValueAs('N').Value for p in punches],
+        Vc=[p.Vc.getValueAs('N').Value for p in punches],
+        fc=[p.fc.getValueAs('MPa').Value for p in punches],
+        d=[p.d for p in punches],
+        n=osafe_funcs.get_stirrups_n([p.Location for p in punches]),
+        Av=[p.Av.getValueAs('mm^2').Value for p in punches],
+        Fys=[p.Fys.getValueAs('MPa').Value for p in punches],
+        )
+    for i, p in enumerate(punches):
+        if required[i]:
+            p.Use_Reinforcement = True
+            p.s = f"{s[i]} mm"
+            p.Vs = f"{Vs[i]} N"
+            p.x = f"{x[i]} mm"
+        if p.Vs > 2 * p.Vc:
+            # text = '<html> <span style=" font-size:9pt; font-weight:600; color:#FF0000;">Vs is greater than 2 * Vc</span>'
+            text = 'Vs > 2 * Vc'
+            p.Warnings = text
+        else:
+            p.Warnings = ""
+
+def set_punch_results(obj, results : dict) -> None:
+    for prop, value in results.items():
+        setattr(obj, prop, value)
+
+SHAPE_RESULTS = ('edges', 'rect', 'faces', 'Shape')
+
+def get_plain_geometry(geometry : dict) -> dict:
+    '''
+    convert shapes of get_punch_geometry to BREP strings and center of punch
+    to tuple, so they can be sent from worker processes
+    '''
+    plain = dict(geometry)
+    for prop in SHAPE_RESULTS:
+        plain[prop] = geometry[prop].exportBrepToString()
+    plain['center_of_punch'] = tuple(geometry['center_of_punch'])
+    return plain
+
+def get_geometry_from_plain(plain : dict) -> dict:
+    '''
+    the reverse of get_plain_geometry
+    '''
+    geometry = dict(plain)
+    for prop in SHAPE_RESULTS:
+        shape = Part.Shape()
+        shape.importBrepFromString(plain[prop])
+        geometry[prop] = shape
+    geometry['center_of_punch'] = FreeCAD.Vector(*plain['center_of_punch'])
+    return geometry
+
+def get_punch_geometries_brep(
+    plan_brep : str,
+    columns_data : list,
+    d : float,
+    locations : list,
+    ) -> list:
+    '''
+    process pool worker of solve_punches, it works on the foundation plan as
+    BREP string and the columns_data of get_column_data and returns the
+    get_punch_geometry of columns converted with get_plain_geometry
+    '''
+    foundation_plan = Part.Shape()
+    foundation_plan.importBrepFromString(plan_brep)
+    plan_polygons = osafe_funcs.get_plan_polygons(foundation_plan)
+    geometries = []
+    for column_data, location in zip(columns_data, locations):
+        geometry = get_punch_geometry(
+            foundation_plan,
+            column_data['angle'],
+            column_data['bx'],
+            column_data['by'],
+            FreeCAD.Vector(*column_data['center_of_column']),
+            d,
+            location,
+            plan_polygons,
+            )
+        geometries.append(get_plain_geometry(geometry))
+    return geometries
+
+def solve_punches(
+    foun_obj,
+    columns : list,
+    locations : Union[list, None] = None,
+    processes : int = 1,
+    screening : Union[bool, list] = False,
+    progress = None,
+    ) -> list:
+    '''
+    compute the punches of columns on foun_obj in one pass, the foundation
+    plan and properties are read once. locations are the user locations of
+    punches or None. screening is the screening of solve_punch_data for all
+    columns or a list of it for each column. the critical sections are read from the SectionCache of
+    document, if processes is more than 1, the critical sections that are
+    not in the cache are computed in a process pool and added to it.
+    progress is called once for each solved punch. return the results of
+    solve_punch for each column.
+    '''
+    foundation_plan = foun_obj.plan
+    d = foun_obj.d.Value
+    fc = foun_obj.fc.getValueAs('MPa').Value
+    if locations is None:
+        locations = [None] * len(columns)
+    columns_data = [get_column_data(column) for column in columns]
+    cache = get_section_cache(foun_obj.Document.Name)
+    cache.maxsize = min(max(cache.maxsize, len(columns)), SECTION_CACHE_MAXSIZE)
+    plan_key = get_plan_key(foundation_plan)
+    keys = [
+        get_geometry_key(plan_key, column_data, d, location)
+        for column_data, location in zip(columns_data, locations)
+        ]
+    misses = [i for i, key in enumerate(keys) if key not in cache]
+    pool = None
+    if processes > 1:
+        pool = osafe_funcs.get_process_pool(processes, len(misses))
+    reported = set()
+    if pool is not None:
+        plan_brep = foundation_plan.exportBrepToString()
+        chunksize = max(1, math.ceil(len(misses) / (4 * processes)))
+        chunks = [misses[i: i + chunksize] for i in range(0, len(misses), chunksize)]
+        try:
+            results = pool.map(
+                get_punch_geometries_brep,
+                itertools.repeat(plan_brep),
+                [[columns_data[i] for i in chunk] for chunk in chunks],
+                itertools.repeat(d),
+                [[locations[i] for i in chunk] for chunk in chunks],
+                )
+            for chunk, geometries in zip(chunks, results):
+                for i, plain in zip(chunk, geometries):
+                    cache.put(keys[i], get_geometry_from_plain(plain))
+                    if progress is not None:
+                        progress()
+                        reported.add(i)
+        except Exception as e:
+            # the workers may not import FreeCAD or fail on a column, the
+            # geometries that are not in cache are computed in process
+            FreeCAD.Console.PrintWarning(f"Process pool failed ({e!r}), punches are solved serially.\n")
+            osafe_funcs.shutdown_process_pool(processes)
+    plan_polygons = None
+    if any(key not in cache for key in keys):
+        plan_polygons = osafe_funcs.get_plan_polygons(foundation_plan)
+    if isinstance(screening, bool):
+        screening = [screening] * len(columns)
+    results = []
+    for i, (column_data, location, screen) in enumerate(zip(columns_data, locations, screening)):
+        results.append(solve_punch_data(foundation_plan, column_data, d, fc, location, plan_polygons, cache, plan_key, screen))
+        if progress is not None and i not in reported:
+            progress()
+    return results
+
+def get_foundation_punches(foun_obj) -> list:
+    '''
+    return the punches that are on foun_obj
+    '''
+    punches = []
+    for o in foun_obj.InList:
+        if hasattr(o, 'Proxy') and \
+            getattr(o.Proxy, 'Type', None) == 'Punch' and \
+                o.foundation == foun_obj:
+            punches.append(o)
+    return punches
+
+def recompute_punches(
+    punches : list,
+    processes : int = 1,
+    ) -> None:
+    '''
+    recompute punches with solve_punches, punches of each foundation are
+    solved together and the results are written to the objects in the main
+    thread. the punches are not touched after that.
+    '''
+    foundations = {}
+    for p in punches:
+        foundations.setdefault(p.foundation.Name, []).append(p)
+    for foun_punches in foundations.values():
+        foun_obj = foun_punches[0].foundation
+        results = solve_punches(
+            foun_obj,
+            [p.column for p in foun_punches],
+            [p.Location if p.user_location else None for p in foun_punches],
+            processes=processes,
+            screening=[p.screening for p in foun_punches],
+            )
+        for p, result in zip(foun_punches, results):
+            p.fc = foun_obj.fc
+            set_punch_results(p, result)
+    calculate_punches_stirrups(punches)
+    for p in punches:
+        p.purgeTouched()
+
+def get_punch_combos_ratio(punch) -> dict:
+    '''
+    return the combos_ratio of punch, if punch is solved with screening, the
+    ratios of all combos are computed and saved to the punch at first call
+    '''
+    if not punch.screening or len(punch.combos_ratio) > 1:
+        return punch.combos_ratio
+    results = solve_punch(
+        foundation_plan=punch.foundation.plan,
+        column=punch.column,
+        d=punch.foundation.d.Value,
+        fc=punch.fc.getValueAs('MPa').Value,
+        location=punch.Location if punch.user_location else None,
+        cache=get_section_cache(punch.Document.Name),
+        )
+    is_touched = punch.isTouched()
+    punch.combos_ratio = results['combos_ratio']
+    if not is_touched:
+        punch.purgeTouched()
+    return punch.combos_ratio
+
 def get_color(pref_intity, color=16711935):
     c = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/OSAFE").GetUnsigned(pref_intity, color)
     r = float((c >> 24) & 0xFF) / 255.0
@@ -767,6 +1559,40 @@ def make_punch(
     FreeCAD.ActiveDocument.recompute()
     return p
 
+def make_punches(
+    foun_obj,
+    columns : list,
+    location: str = 'Corner 1',
+    processes : int = 1,
+    screening : bool = False,
+    progress = None,
+    ) -> list:
+    '''
+    create punches of columns on foun_obj. all punches are solved in one pass
+    with solve_punches and the results are written to the objects at the end,
+    the objects are not touched so the next recompute of document does not
+    execute them again. progress is passed to solve_punches.
+    '''
+    doc = FreeCAD.ActiveDocument
+    results = solve_punches(foun_obj, columns, processes=processes, screening=screening, progress=progress)
+    punches = []
+    for column, result in zip(columns, results):
+        p = doc.addObject("Part::FeaturePython", "Punch")
+        Punch(p)
+        if FreeCAD.GuiUp:
+            ViewProviderPunch(p.ViewObject)
+        p.foundation = foun_obj
+        p.column = column
+        p.fc = foun_obj.fc
+        p.Location = location
+        p.screening = screening
+        set_punch_results(p, result)
+        punches.append(p)
+    calculate_punches_stirrups(punches)
+    for p in punches:
+        p.purgeTouched()
+    return punches
+
 if __name__ == '__main__':
     doc = FreeCAD.ActiveDocument
     foun = doc.Foundation
@@ -14,6 +14,10 @@ import math
 
 
 from osafe_funcs import osafe_funcs
+from osafe_objects.punch import (
+    get_combos_forces,
+    set_column_combos_forces,
+    )
 
 
 class EtabsPunch(object):
@@ -207,23 +211,18 @@ class EtabsPunch(object):
                 combos = FreeCAD.ActiveDocument.Meta[f'{type_}_load_combinations']
                 combos = combos.split(',')
                 filt = (joint_design_reactions['UniqueName'] == point_reaction) & (joint_design_reactions['OutputCase'].isin(combos))
-                d = {}
+                combos_names = []
+                forces = []
                 df = joint_design_reactions.loc[filt]
                 for _, row2 in df.iterrows():
                     combo = row2['OutputCase']
                     steptype = row2['StepType']
-                    combo_name = f'{combo} {steptype}'
-                    F = row2['FZ']
+                    combos_names.append(f'{combo} {steptype}')
+                    F = float(row2['FZ'])
                     mx = float(row2['MX']) * -1
                     my = float(row2['MY']) * -1
-                    d[combo_name] = f"{F}, {mx}, {my}"
-                if not hasattr(col, "combos_load"):
-                    col.addProperty(
-                        "App::PropertyMap",
-                        "combos_load",
-                        "Structure",
-                        ).combos_load = d
-                col.setEditorMode('combos_load', 2)
+                    forces.append((F, mx, my))
+                set_column_combos_forces(col, combos_names, forces)
                 col.recompute()
 
     def import_basepoints(self):
@@ -301,13 +300,7 @@ def make_column(
     col = Arch.makeStructure(length=bx,width=by,height=4000)
     col.Placement.Base = center
     col.Placement.Rotation.Angle = math.radians(angle)
-    if not hasattr(col, "combos_load"):
-        col.addProperty(
-            "App::PropertyMap",
-            "combos_load",
-            "Structure",
-            ).combos_load = combos_load
-    col.setEditorMode('combos_load', 2)
+    set_column_combos_forces(col, *get_combos_forces(combos_load))
     col.recompute()
     if FreeCAD.GuiUp:
         col.ViewObject.LineWidth = 1.00
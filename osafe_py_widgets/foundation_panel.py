@@ -1,5 +1,6 @@
 from pathlib import Path
 
+from PySide import QtCore
 from PySide.QtGui import QMessageBox
 
 import FreeCAD
@@ -10,14 +11,22 @@ from osafe_py_widgets import resource_rc
 
 punch_path = Path(__file__).parent.parent
 
+# delay of applying cover and fc to the foundation after the last change of
+# their spin boxes, in ms
+D_FC_DELAY = 300
 
 
 class Form:
 
     def __init__(self):
         self.form = Gui.PySideUic.loadUi(str(punch_path / 'osafe_widgets' / 'foundation_panel.ui'))
-        self.create_connections()
+        self.d_fc_changed = False
+        self.d_fc_timer = QtCore.QTimer()
+        self.d_fc_timer.setSingleShot(True)
+        self.d_fc_timer.timeout.connect(self.update_d_fc)
         self.fill_height()
+        self.fill_d_fc()
+        self.create_connections()
         self.update_gui()
 
     def getStandardButtons(self):
@@ -28,6 +37,8 @@ class Form:
         self.form.mat.clicked.connect(self.update_gui)
         self.form.create_pushbutton.clicked.connect(self.create)
         self.form.cancel_pushbutton.clicked.connect(self.accept)
+        self.form.cover.valueChanged.connect(self.schedule_update_d_fc)
+        self.form.fc.valueChanged.connect(self.schedule_update_d_fc)
 
     def update_gui(self):
         if self.form.strip.isChecked():
@@ -47,7 +58,65 @@ class Form:
         except:
             pass
 
+    def fill_d_fc(self):
+        doc = FreeCAD.ActiveDocument
+        if doc is None or not hasattr(doc, 'Foundation'):
+            return
+        foun = doc.Foundation
+        self.form.cover.setValue(foun.cover.Value / 10)
+        self.form.fc.setValue(int(foun.fc.getValueAs('MPa').Value))
+        self.form.height_spinbox.setValue(int(foun.height.Value / 10))
+
+    def schedule_update_d_fc(self):
+        '''
+        restart the timer of update_d_fc, so the punches are updated once
+        after the user stops changing cover or fc
+        '''
+        self.d_fc_timer.start(D_FC_DELAY)
+
+    def update_d_fc(self):
+        '''
+        apply cover and fc of form to the existing foundation in one
+        transaction, its punches are updated without rebuilding the
+        foundation shape
+        '''
+        doc = FreeCAD.ActiveDocument
+        if doc is None or not hasattr(doc, 'Foundation'):
+            return
+        foun = doc.Foundation
+        cover = self.form.cover.value() * 10
+        fc = self.form.fc.value()
+        if cover == foun.cover.Value and fc == foun.fc.getValueAs('MPa').Value:
+            return
+        from osafe_objects.etabs_foundation import update_foundation_d_fc
+        doc.openTransaction(translate("OSAFE", "Change Foundation cover and fc"))
+        update_foundation_d_fc(foun, cover=cover, fc=fc)
+        doc.commitTransaction()
+        self.d_fc_changed = True
+
+    def update_foundation(self, foun) -> bool:
+        '''
+        apply height, cover and fc of form to the existing foundation foun and
+        return True if any of them is changed. when only cover or fc is
+        changed, the punches are updated without rebuilding the foundation
+        shape.
+        '''
+        cover = self.form.cover.value() * 10
+        fc = self.form.fc.value()
+        height = self.form.height_spinbox.value() * 10
+        if height != foun.height.Value:
+            foun.cover = cover
+            foun.fc = f"{fc} MPa"
+            foun.height = height
+            return True
+        if cover != foun.cover.Value or fc != foun.fc.getValueAs('MPa').Value:
+            from osafe_objects.etabs_foundation import update_foundation_d_fc
+            update_foundation_d_fc(foun, cover=cover, fc=fc)
+            return True
+        return False
+
     def create(self):
+        self.d_fc_timer.stop()
         doc = FreeCAD.ActiveDocument
         cover = self.form.cover.value() * 10
         tolerance = self.form.tolerance.value()
@@ -87,13 +156,17 @@ class Form:
         # Check if exists a Foundation
         FreeCAD.ActiveDocument.openTransaction(translate("OSAFE","Create Foundations"))
         if hasattr(doc, "Foundation"):
+            changed = self.update_foundation(doc.Foundation) or self.d_fc_changed
             current_base_foundations = {o.Name for o in doc.Foundation.base_foundations}
             new_base_foundations = {o.Name for o in base_foundations}
             not_used_base_foundations = new_base_foundations.difference(current_base_foundations)
             if len(not_used_base_foundations) == 0:
-                QMessageBox.warning(None, "Existence of Foundation", "Foundation exists and there is no additional Base Foundation to add to foundation\nMaybe an error in model did not allowed to create Foundation.")
+                if not changed:
+                    QMessageBox.warning(None, "Existence of Foundation", "Foundation exists and there is no additional Base Foundation to add to foundation\nMaybe an error in model did not allowed to create Foundation.")
                 Gui.Control.closeDialog()
                 FreeCAD.ActiveDocument.commitTransaction()
+                if changed:
+                    doc.recompute()
                 return
             all_base_foundations = current_base_foundations.union(new_base_foundations)
             all_base_foundations = [doc.getObjectsByLabel(label)[0] for label in all_base_foundations]
@@ -120,4 +193,5 @@ class Form:
         Gui.Control.closeDialog()
 
     def accept(self):
+        self.d_fc_timer.stop()
         Gui.Control.closeDialog()
@@ -1,4 +1,5 @@
 
+from contextlib import contextmanager
 from pathlib import Path
 
 from PySide import QtCore
@@ -9,7 +10,73 @@ import FreeCADGui as Gui
 import Draft
 from draftutils.translate import translate
 
-from osafe_objects.punch import make_punch
+from osafe_objects.punch import make_punches, recompute_punches
+
+
+@contextmanager
+def suspend_updates(doc):
+    '''
+    freeze the recompute of doc and the updates of main window in the block
+    '''
+    frozen = doc.RecomputesFrozen
+    doc.RecomputesFrozen = True
+    mw = Gui.getMainWindow() if FreeCAD.GuiUp else None
+    if mw is not None:
+        mw.setUpdatesEnabled(False)
+    try:
+        yield
+    finally:
+        doc.RecomputesFrozen = frozen
+        if mw is not None:
+            mw.setUpdatesEnabled(True)
+
+def create_punches(
+    doc,
+    foun,
+    columns : list,
+    group = None,
+    processes : int = 1,
+    ) -> list:
+    '''
+    create punches of columns with their ratio texts in bulk. recompute of
+    doc and gui updates are suspended while solving and creating the objects
+    and only the new texts are recomputed at the end. the progress bar
+    covers solving the punches and creating the texts.
+    '''
+    if not columns:
+        return []
+    n = len(columns)
+    progressbar = FreeCAD.Base.ProgressIndicator()
+    progressbar.start("Creating " + str(n) + " Punches...", 2 * n)
+    try:
+        with suspend_updates(doc):
+            new_punches = make_punches(
+                foun,
+                columns,
+                processes=processes,
+                progress=lambda: progressbar.next(True),
+                )
+            texts = []
+            for punch in new_punches:
+                progressbar.next(True)
+                o = punch.column
+                pl = FreeCAD.Vector(0, 0, o.Shape.BoundBox.ZMax)
+                text = Draft.make_text([punch.Ratio, punch.Location], placement=pl)
+                if FreeCAD.GuiUp:
+                    text.ViewObject.FontSize = 200
+                punch.text = text
+                punch.id = o.Label
+                texts.append(text)
+            if group is not None:
+                group.addObjects(new_punches)
+        for punch in new_punches:
+            if FreeCAD.GuiUp:
+                punch.ViewObject.Proxy.updateData(punch, "Ratio")
+            punch.purgeTouched()
+        doc.recompute(texts)
+    finally:
+        progressbar.stop()
+    return new_punches
 
 
 class Punch:
@@ -54,29 +121,27 @@ class Punch:
         else:
             punches = FreeCAD.ActiveDocument.addObject("App::DocumentObjectGroup","Punches")
             columns = []
+        new_columns = []
         for o in doc.Objects:
             if hasattr(o, 'IfcType') and \
                 o.IfcType == 'Column' and \
-                    hasattr(o, 'combos_load') and \
+                    (hasattr(o, 'combos_load') or hasattr(o, 'combos_forces')) and \
                         hasattr(o, 'Base'):
                 if o.Name in columns:
                     continue
-                punch = make_punch(
-                    foun,
-                    o,
-                    )
-                l = punch.Location
-                pl = FreeCAD.Vector(0, 0, o.Shape.BoundBox.ZMax)
-                t = '0.0'
-                text = Draft.make_text([t, l], placement=pl)
-                punch.Ratio = t
-                if FreeCAD.GuiUp:
-                    text.ViewObject.FontSize = 200
-                punch.text = text
-                punch.id = o.Label
-                punches.addObject(punch)
-        FreeCAD.ActiveDocument.recompute()
-        FreeCAD.ActiveDocument.commitTransaction()
+                new_columns.append(o)
+        processes = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/OSAFE").GetInt("punch_processes", 1)
+        touched_punches = [p for p in punches.Group if p.isTouched() or p.column.isTouched()]
+        if touched_punches:
+            touched_columns = [p.column for p in touched_punches if p.column.isTouched()]
+            if touched_columns:
+                doc.recompute(touched_columns)
+            recompute_punches(touched_punches, processes=processes)
+        create_punches(doc, foun, new_columns, punches, processes=processes)
+        # only the changed texts and the group are recomputed, not the document
+        texts = [p.text for p in touched_punches if p.text and p.text.isTouched()]
+        doc.recompute(texts + [punches])
+        doc.commitTransaction()
 
     def IsActive(self):
         return not FreeCAD.ActiveDocument is None
\ No newline at end of file
@@ -168,7 +168,8 @@ class Safe12TaskPanel:
                     return
         
             from osafe_import_export.safe_read_write_f2k import FreecadReadwriteModel as FRW
-            rw = FRW(f2k_file.input, f2k_file.output, doc)
+            processes = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/OSAFE").GetInt("export_processes", 1)
+            rw = FRW(f2k_file.input, f2k_file.output, doc, incremental=True, use_mmap=True, processes=processes)
             if is_slabs:
                 slab_names = rw.export_freecad_slabs(
                     soil_name=soil_name,
@@ -214,6 +215,7 @@ class Safe12TaskPanel:
                 rw.export_punch_props()
             rw.add_preferences()
             rw.safe.write()
+            rw.save_export_cache()
             if Path(f2k_file.input).exists():
                 with open(f2k_file.input) as f:
                     f2k_file.input_str = f.read()
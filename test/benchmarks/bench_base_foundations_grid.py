@@ -0,0 +1,92 @@
+'''
+Benchmarks of finding the junctions of base foundations with and without
+osafe_funcs.BoundBoxGrid on a grid of strip base foundations. it needs
+FreeCAD, run it with:
+python test/benchmarks/bench_base_foundations_grid.py [number of strips in each direction]
+'''
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+FREECADPATH = 'G:\\program files\\FreeCAD 0.21\\bin'
+sys.path.append(FREECADPATH)
+
+import FreeCAD
+import Part
+
+punch_path = Path(__file__).absolute().parent.parent.parent
+sys.path.insert(0, str(punch_path))
+
+from osafe_funcs import osafe_funcs
+
+
+def create_base_foundations(n: int = 15, span: float = 6000, width: float = 1000) -> list:
+    '''
+    create n strips in x and n strips in y direction, each strip is divided to
+    n - 1 base foundations between its junctions
+    '''
+    bfs = []
+    for i in range(n):
+        for j in range(n - 1):
+            for k, (p1, p2) in enumerate((
+                (FreeCAD.Vector(j * span, i * span, 0), FreeCAD.Vector((j + 1) * span, i * span, 0)),
+                (FreeCAD.Vector(i * span, j * span, 0), FreeCAD.Vector(i * span, (j + 1) * span, 0)),
+                )):
+                direction = p2 - p1
+                normal = FreeCAD.Vector(-direction.y, direction.x, 0).normalize() * width / 2
+                points = [p1 + normal, p2 + normal, p2 - normal, p1 - normal]
+                plan = Part.Face(Part.makePolygon(points + [points[0]]))
+                bfs.append(SimpleNamespace(
+                    Name=f'BaseFoundation_{i}_{j}_{k}',
+                    plan=plan,
+                    Base=SimpleNamespace(Points=[p1, p2]),
+                    ))
+    return bfs
+
+
+def brute_force(base_foundations) -> dict:
+    points = osafe_funcs.get_bf_points(base_foundations)
+    d = {key: set() for key in points}
+    for p in points:
+        point = FreeCAD.Vector(p)
+        for base in base_foundations:
+            if base.plan.isInside(point, 1, True):
+                d[p].add(base.Name)
+    return d
+
+
+def bench(n: int = 15):
+    bfs = create_base_foundations(n)
+
+    start = time.perf_counter()
+    expected = brute_force(bfs)
+    brute = time.perf_counter() - start
+
+    start = time.perf_counter()
+    boxes = []
+    for base in bfs:
+        bb = base.plan.BoundBox
+        boxes.append((bb.XMin, bb.YMin, bb.XMax, bb.YMax))
+    grid = osafe_funcs.BoundBoxGrid(boxes, tol=1)
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    for p in osafe_funcs.get_bf_points(bfs):
+        grid.query(p[0], p[1])
+    query = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = osafe_funcs.get_points_inside_base_foundations(bfs)
+    total = time.perf_counter() - start
+    assert result == expected
+
+    print(f'{len(bfs)} base foundations, brute force: {brute:.2f} s, '
+          f'grid build: {build * 1000:.1f} ms, grid query: {query * 1000:.1f} ms, '
+          f'with grid: {total:.2f} s, speedup: {brute / total:.1f}x')
+
+
+if __name__ == '__main__':
+    n = 15
+    if len(sys.argv) > 1:
+        n = int(sys.argv[1])
+    bench(n)
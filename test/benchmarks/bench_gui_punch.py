@@ -0,0 +1,77 @@
+'''
+Benchmarks of creating punches and their texts one by one like the old
+civil_punch command and in bulk with gui_punch.create_punches. it needs
+FreeCAD, run it with:
+python test/benchmarks/bench_gui_punch.py [document] [number of punches]
+'''
+import sys
+import time
+from pathlib import Path
+
+FREECADPATH = 'G:\\program files\\FreeCAD 0.21\\bin'
+sys.path.append(FREECADPATH)
+
+import FreeCAD
+import Draft
+
+punch_path = Path(__file__).absolute().parent.parent.parent
+sys.path.insert(0, str(punch_path))
+
+from osafe_objects import punch
+from osafe_py_widgets import gui_punch
+
+
+def get_columns(doc) -> list:
+    return [o for o in doc.Objects if
+        hasattr(o, 'IfcType') and
+        o.IfcType == 'Column' and
+        (hasattr(o, 'combos_load') or hasattr(o, 'combos_forces')) and
+        hasattr(o, 'Base')
+        ]
+
+
+def remove_punches(doc, punches):
+    for p in punches:
+        text = p.text
+        doc.removeObject(p.Name)
+        if text:
+            doc.removeObject(text.Name)
+
+
+def bench(filename, n: int = 300):
+    doc = FreeCAD.openDocument(str(filename))
+    foun = doc.Foundation
+    columns = get_columns(doc)
+    # repeat columns of the model to get n punches
+    columns = (columns * (n // len(columns) + 1))[:n]
+
+    start = time.perf_counter()
+    punches = []
+    for col in columns:
+        p = punch.make_punch(foun, col)
+        pl = FreeCAD.Vector(0, 0, col.Shape.BoundBox.ZMax)
+        p.text = Draft.make_text([p.Ratio, p.Location], placement=pl)
+        punches.append(p)
+    doc.recompute()
+    one_by_one = time.perf_counter() - start
+    ratios = [p.Ratio for p in punches]
+    remove_punches(doc, punches)
+
+    start = time.perf_counter()
+    punches = gui_punch.create_punches(doc, foun, columns)
+    bulk = time.perf_counter() - start
+    assert ratios == [p.Ratio for p in punches]
+
+    print(f'{n} punches, one by one: {one_by_one:.2f} s, bulk: {bulk:.2f} s, '
+          f'saved: {one_by_one - bulk:.2f} s')
+    FreeCAD.closeDocument(doc.Name)
+
+
+if __name__ == '__main__':
+    filename = Path(__file__).absolute().parent.parent / 'test_files' / 'freecad' / 'mat.FCStd'
+    n = 300
+    if len(sys.argv) > 1:
+        filename = sys.argv[1]
+    if len(sys.argv) > 2:
+        n = int(sys.argv[2])
+    bench(filename, n)
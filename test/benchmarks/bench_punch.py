@@ -0,0 +1,62 @@
+'''
+Benchmarks of creating punches one by one with make_punch and in one pass
+with make_punches. it needs FreeCAD, run it with:
+python test/benchmarks/bench_punch.py [document] [number of punches]
+'''
+import sys
+import time
+from pathlib import Path
+
+FREECADPATH = 'G:\\program files\\FreeCAD 0.21\\bin'
+sys.path.append(FREECADPATH)
+
+import FreeCAD
+
+punch_path = Path(__file__).absolute().parent.parent.parent
+sys.path.insert(0, str(punch_path))
+
+from osafe_objects import punch
+
+
+def get_columns(doc) -> list:
+    return [o for o in doc.Objects if
+        hasattr(o, 'IfcType') and
+        o.IfcType == 'Column' and
+        hasattr(o, 'combos_load') and
+        hasattr(o, 'Base')
+        ]
+
+
+def bench(filename, n: int = 500):
+    doc = FreeCAD.openDocument(str(filename))
+    foun = doc.Foundation
+    columns = get_columns(doc)
+    # repeat columns of the model to get n punches
+    columns = (columns * (n // len(columns) + 1))[:n]
+
+    start = time.perf_counter()
+    punches = [punch.make_punch(foun, col) for col in columns]
+    doc.recompute()
+    one_by_one = time.perf_counter() - start
+    ratios = [p.Ratio for p in punches]
+    for p in punches:
+        doc.removeObject(p.Name)
+
+    start = time.perf_counter()
+    punches = punch.make_punches(foun, columns)
+    batch = time.perf_counter() - start
+    assert ratios == [p.Ratio for p in punches]
+
+    print(f'{n} punches, make_punch: {one_by_one:.2f} s, make_punches: {batch:.2f} s, '
+          f'speedup: {one_by_one / batch:.1f}x')
+    FreeCAD.closeDocument(doc.Name)
+
+
+if __name__ == '__main__':
+    filename = Path(__file__).absolute().parent.parent / 'test_files' / 'freecad' / 'mat.FCStd'
+    n = 500
+    if len(sys.argv) > 1:
+        filename = sys.argv[1]
+    if len(sys.argv) > 2:
+        n = int(sys.argv[2])
+    bench(filename, n)
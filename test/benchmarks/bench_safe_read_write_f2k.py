@@ -0,0 +1,195 @@
+'''
+Benchmarks of reading and writing big f2k files with Safe class.
+run it with: python test/benchmarks/bench_safe_read_write_f2k.py
+'''
+import multiprocessing
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from pathlib import Path
+from types import SimpleNamespace
+try:
+    import resource
+except ImportError:
+    resource = None
+
+punch_path = Path(__file__).absolute().parent.parent.parent
+sys.path.insert(0, str(punch_path))
+
+from osafe_import_export.safe_read_write_f2k import (
+    Safe,
+    FreecadReadwriteModel,
+    get_coordinates_and_offsets,
+    )
+
+Point = namedtuple('Point', 'x y z')
+
+
+def create_f2k(filename, n_lines: int = 500000):
+    '''
+    write a synthetic SAFE 16 f2k file with about n_lines lines, most of them
+    are points and areas like mat foundations
+    '''
+    n_points = n_lines // 2
+    n_areas = n_lines - n_points
+    with open(filename, 'w') as f:
+        f.write('File C:\\synthetic.F2K was saved on m/d/yy at h:mm:ss\n\n')
+        f.write('TABLE:  "PROGRAM CONTROL"\n')
+        f.write('   ProgramName="SAFE 2016"   Version=16.0.2   ProgLevel="Post Tensioning"   CurrUnits="Kgf, m, C"   MergeTol=0.0025   ModelDatum=0   StHtAbove=0   StHtBelow=3\n\n')
+        f.write('TABLE:  "OBJECT GEOMETRY - POINT COORDINATES"\n')
+        for i in range(1, n_points + 1):
+            f.write(f'   Point={i}   GlobalX={i * .5}   GlobalY={i % 100}   GlobalZ=0   SpecialPt=No\n')
+        f.write('\nTABLE:  "OBJECT GEOMETRY - AREAS 01 - GENERAL"\n')
+        for i in range(1, n_areas + 1):
+            f.write(f'   Area={i}   NumPoints=4   Point1={i}   Point2={i + 1}   Point3={i + 2}   Point4={i + 3}\n')
+        f.write('\nEND TABLE DATA\n')
+
+
+def legacy_get_tables_contents(input_f2k_path):
+    '''
+    the implementation of Safe.get_tables_contents before streaming parser
+    '''
+    with open(input_f2k_path, 'r') as reader:
+        lines = reader.readlines()
+        tables_contents = dict()
+        n = len("TABLE:  ")
+        context = ''
+        table_key = None
+        for line in lines:
+            if line.startswith("TABLE:") or "END TABLE DATA" in line:
+                if table_key and context:
+                    tables_contents[table_key] = context
+                context = ''
+                table_key = line[n+1:-2]
+            else:
+                context += line
+    return tables_contents
+
+
+def timeit(func, *args, repeat: int = 3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ret = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, ret
+
+
+def open_model(filename, use_mmap: bool = False):
+    '''
+    read the tables, units and set the StHtBelow of model like
+    FreecadReadwriteModel
+    '''
+    safe = Safe(filename, use_mmap=use_mmap)
+    safe.get_tables_contents()
+    safe.force_length_unit()
+    safe.set_sthtbelow()
+    return safe
+
+
+def bench_get_tables_contents(n_lines: int = 500000):
+    filename = Path(tempfile.gettempdir()) / 'bench_safe_read.f2k'
+    create_f2k(filename, n_lines)
+    legacy_time, legacy_tables = timeit(legacy_get_tables_contents, filename)
+    safe = Safe(filename)
+    stream_time, tables = timeit(safe.get_tables_contents)
+    program_control_time, _ = timeit(lambda: tables["PROGRAM CONTROL"])
+    join_start = time.perf_counter()
+    assert dict(tables) == legacy_tables
+    join_time = time.perf_counter() - join_start
+    mapped_safe = Safe(filename, use_mmap=True)
+    mmap_time, _ = timeit(mapped_safe.get_tables_contents)
+    units_time, _ = timeit(mapped_safe.force_length_unit)
+    mapped_safe.close_mmap()
+    open_stream_time, _ = timeit(open_model, filename)
+    open_mmap_time, mapped_safe = timeit(open_model, filename, True)
+    mapped_safe.close_mmap()
+    print(f'get_tables_contents on {n_lines} lines')
+    print(f'    legacy            : {legacy_time:.3f} s')
+    print(f'    streaming         : {stream_time:.3f} s')
+    print(f'    join all tables   : {join_time:.3f} s')
+    print(f'    "PROGRAM CONTROL" : {program_control_time * 1e6:.1f} us')
+    print(f'    mmap index        : {mmap_time:.3f} s')
+    print(f'    mmap units        : {units_time * 1e6:.1f} us')
+    print(f'    open streaming    : {open_stream_time:.3f} s')
+    print(f'    open mmap         : {open_mmap_time:.3f} s')
+    assert mmap_time < stream_time
+    assert open_mmap_time < open_stream_time
+    filename.unlink()
+
+
+def get_peak_rss():
+    '''
+    return the peak resident memory of this process in bytes, None if it is
+    not available on this platform
+    '''
+    try:
+        # VmHWM is reset by exec, ru_maxrss is inherited from the parent process
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is not None:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return None
+
+
+def run_in_new_process(func, *args):
+    '''
+    run func in a new process, so the peak memory of process belongs to func
+    '''
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        return pool.apply(func, args)
+
+
+def export_areas(n_areas: int = 20000, batch: bool = False):
+    tmp = Path(tempfile.gettempdir())
+    input_f2k_path = tmp / 'bench_safe_export_input.f2k'
+    output_f2k_path = tmp / 'bench_safe_export_output.f2k'
+    create_f2k(input_f2k_path, 1000)
+    start = time.perf_counter()
+    rw = FreecadReadwriteModel(input_f2k_path, output_f2k_path, doc=SimpleNamespace())
+    area_names = []
+    polygons = []
+    for i in range(n_areas):
+        x, y = i % 200 * 1000, i // 200 * 1000
+        points = [Point(x, y, 0), Point(x + 1000, y, 0), Point(x + 1000, y + 1000, 0), Point(x, y + 1000, 0)]
+        if batch:
+            polygons.append(points)
+        else:
+            area_names.append(rw.create_area_by_coord(points, 'SLAB100'))
+    if batch:
+        coordinates, offsets = get_coordinates_and_offsets(polygons)
+        area_names = rw.create_areas_by_coords(coordinates, offsets, 'SLAB100')
+    rw.safe.add_content_to_table("SOIL PROPERTIES", rw.create_soil_table([('SOIL', 2)]))
+    rw.safe.add_content_to_table("SOIL PROPERTY ASSIGNMENTS", rw.export_freecad_soil_support(area_names))
+    rw.add_uniform_gravity_load(area_names, 'DEAD', 200)
+    export_time = time.perf_counter() - start
+    start = time.perf_counter()
+    rw.safe.write()
+    write_time = time.perf_counter() - start
+    peak_rss = get_peak_rss()
+    size = output_f2k_path.stat().st_size
+    input_f2k_path.unlink()
+    output_f2k_path.unlink()
+    return export_time, write_time, peak_rss, size
+
+
+def bench_export(n_areas: int = 20000, batch: bool = False):
+    export_time, write_time, peak_rss, size = run_in_new_process(export_areas, n_areas, batch)
+    api = 'create_areas_by_coords' if batch else 'create_area_by_coord'
+    print(f'export {n_areas} areas with FreecadReadwriteModel.{api}')
+    print(f'    export            : {export_time:.3f} s')
+    print(f'    write             : {write_time:.3f} s')
+    print(f'    output size       : {size / 2 ** 20:.1f} MB')
+    if peak_rss is not None:
+        print(f'    peak RSS          : {peak_rss / 2 ** 20:.1f} MB')
+
+
+if __name__ == '__main__':
+    bench_get_tables_contents()
+    bench_export()
+    bench_export(batch=True)
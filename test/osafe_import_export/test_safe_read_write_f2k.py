@@ -2,6 +2,7 @@ import sys
 from pathlib import Path
 import tempfile
 import re
+import math
 
 # path to FreeCAD.so
 FREECADPATH = str(Path(sys.executable).parent)
@@ -20,7 +21,8 @@ punch_path = Path(__file__).absolute().parent.parent
 sys.path.insert(0, str(punch_path))
 
 from osafe_import_export.safe_read_write_f2k import FreecadReadwriteModel as FRW
-from osafe_import_export.safe_read_write_f2k import Safe, Safe12
+from osafe_import_export.safe_read_write_f2k import Safe, Safe12, F2kTable
+import osafe_import_export.safe_read_write_f2k as osf_srw
 import osafe_funcs.osafe_funcs as osf
 
 
@@ -77,6 +79,16 @@ def test_export_freecad_single_slabs():
                     continue
         assert found, f"Point {pt_num} with correct coordinates not found in output file"
 
+def test_export_freecad_single_slabs_processes(monkeypatch):
+    monkeypatch.setattr(osf, 'PROCESS_POOL_MIN_TASKS', 1)
+    doc_single_foundation = FreeCAD.openDocument(str(filename_single_foundation))
+    rw1 = FRW(output_f2k_path=output_f2k_path, doc=doc_single_foundation)
+    slabs1 = rw1.export_freecad_single_slabs()
+    rw2 = FRW(output_f2k_path=output_f2k_path, doc=doc_single_foundation, processes=2)
+    slabs2 = rw2.export_freecad_single_slabs()
+    assert slabs1 == slabs2
+    assert dict(rw1.safe.tables_contents) == dict(rw2.safe.tables_contents)
+
 def test_export_freecad_single_slabs_all():
     doc_single_foundation = FreeCAD.openDocument(str(filename_single_foundation))
     rw = FRW(output_f2k_path=output_f2k_path, doc=doc_single_foundation)
@@ -138,6 +150,28 @@ def test_export_freecad_single_slabs_all():
         assert found, f"Area with points {expected_pts} not found in file"
 
 
+def test_create_areas_by_coords():
+    polygons = [
+        [FreeCAD.Vector(0, 0, 0), FreeCAD.Vector(1000, 0, 0), FreeCAD.Vector(1000, 1000, 0)],
+        [FreeCAD.Vector(i * 1000, i * 500.5, 0) for i in range(9)],
+        [FreeCAD.Vector(0, 0, 0), FreeCAD.Vector(2000, 0, 0), FreeCAD.Vector(2000, 1000, 0), FreeCAD.Vector(0, 1000, 0)],
+    ]
+    rw1 = FRW(input_f2k_path=input_f2k, output_f2k_path=output_f2k_path)
+    names1 = [rw1.create_area_by_coord(points, 'SLAB50') for points in polygons]
+    rw2 = FRW(input_f2k_path=input_f2k, output_f2k_path=output_f2k_path)
+    coordinates, offsets = osf_srw.get_coordinates_and_offsets(polygons)
+    assert coordinates.shape == (16, 3)
+    assert list(offsets) == [0, 3, 12, 16]
+    names2 = rw2.create_areas_by_coords(coordinates, offsets, 'SLAB50')
+    assert names1 == names2
+    assert rw1.last_point_number == rw2.last_point_number
+    for table_key in (
+        "OBJECT GEOMETRY - POINT COORDINATES",
+        "OBJECT GEOMETRY - AREAS 01 - GENERAL",
+        "SLAB PROPERTY ASSIGNMENTS",
+        ):
+        assert rw1.safe.tables_contents[table_key] == rw2.safe.tables_contents[table_key]
+
 def test_export_freecad_wall_loads():
     input_f2k_path = Path(r'~\input.f2k').expanduser()
     input_f2k_path.touch()
@@ -193,6 +227,74 @@ def test_export_freecad_strips():
     rw.export_freecad_strips()
     rw.safe.write()
 
+def test_incremental_export_freecad_strips():
+    document = FreeCAD.openDocument(str(filename_rashidzadeh))
+    strips = osf.get_objects_of_type("Strip", document)
+    output_f2k_path = Path(temp_dir) / 'incremental.f2k'
+    contents = []
+    for i in range(2):
+        rw = FRW(output_f2k_path=output_f2k_path, doc=document, incremental=True)
+        rw.export_freecad_strips(strips)
+        rw.safe.write()
+        rw.save_export_cache()
+        contents.append(output_f2k_path.read_text())
+    assert rw.reused_steps == ['export_freecad_strips']
+    assert contents[0] == contents[1]
+    # move one strip
+    strips[0].Placement.Base.x += 1000
+    rw = FRW(output_f2k_path=output_f2k_path, doc=document, incremental=True)
+    rw.export_freecad_strips(strips)
+    assert rw.reused_steps == []
+    rw.get_export_cache_path().unlink()
+
+def test_get_export_cache_path(tmp_path):
+    from types import SimpleNamespace
+    paths = []
+    for folder in ('project1', 'project2', 'project1/sub/..'):
+        rw = SimpleNamespace(safe=SimpleNamespace(output_f2k_path=tmp_path / folder / 'model.f2k'))
+        paths.append(FRW.get_export_cache_path(rw))
+    assert paths[0] != paths[1]
+    assert paths[0] == paths[2]
+
+def test_incremental_export_reopened_document():
+    output_f2k_path = Path(temp_dir) / 'incremental_reopened.f2k'
+    for i in range(2):
+        document = FreeCAD.openDocument(str(filename_rashidzadeh))
+        strips = osf.get_objects_of_type("Strip", document)
+        rw = FRW(output_f2k_path=output_f2k_path, doc=document, incremental=True)
+        rw.export_freecad_strips(strips)
+        rw.safe.write()
+        rw.save_export_cache()
+        FreeCAD.closeDocument(document.Name)
+    assert rw.reused_steps == ['export_freecad_strips']
+    rw.get_export_cache_path().unlink()
+
+def test_get_value_signature():
+    class Proxy:
+        pass
+    assert osf_srw.get_value_signature(Proxy()) == osf_srw.get_value_signature(Proxy()) == 'Proxy'
+    assert osf_srw.get_value_signature([1.5, 'a']) == "[1.5,'a']"
+
+def test_incremental_export_freecad_slabs_base_foundation_ks():
+    document = FreeCAD.openDocument(str(filename_rashidzadeh))
+    output_f2k_path = Path(temp_dir) / 'incremental_slabs.f2k'
+    contents = []
+    for i in range(2):
+        rw = FRW(output_f2k_path=output_f2k_path, doc=document, incremental=True)
+        rw.export_freecad_slabs()
+        rw.safe.write()
+        rw.save_export_cache()
+        contents.append(output_f2k_path.read_text())
+    assert rw.reused_steps == ['export_freecad_slabs']
+    # change ks of one base foundation
+    document.Foundation.base_foundations[0].ks += 1
+    rw = FRW(output_f2k_path=output_f2k_path, doc=document, incremental=True)
+    rw.export_freecad_slabs()
+    rw.safe.write()
+    assert rw.reused_steps == []
+    assert output_f2k_path.read_text() != contents[1]
+    rw.get_export_cache_path().unlink()
+
 def test_export_freecad_mat_strips():
     rw = FRW(doc=document)
     rw.export_freecad_strips()
@@ -263,6 +365,95 @@ def test_export_freecad_columns():
     ):
         assert col_prop
             
+def test_get_tables_contents(tmp_path):
+    input_f2k_path = tmp_path / 'tables.f2k'
+    content = (
+        'File C:\\tables.F2K was saved on m/d/yy at h:mm:ss\n\n'
+        'TABLE:  "PROGRAM CONTROL"\n'
+        '   ProgramName="SAFE 2016"   Version=16.0.2   CurrUnits="Kgf, m, C"\n\n'
+        'TABLE:  "OBJECT GEOMETRY - POINT COORDINATES"\n'
+        '   Point=115   GlobalX=2820   GlobalY=0   GlobalZ=0   SpecialPt=Yes\n'
+        '   Point=117   GlobalX=7040   GlobalY=0   GlobalZ=0   SpecialPt=Yes\n\n'
+        'END TABLE DATA\n'
+    )
+    input_f2k_path.write_text(content)
+    safe = Safe(input_f2k_path)
+    tables_contents = safe.get_tables_contents()
+    assert list(tables_contents.keys()) == ["PROGRAM CONTROL", "OBJECT GEOMETRY - POINT COORDINATES"]
+    assert len(tables_contents.lines("OBJECT GEOMETRY - POINT COORDINATES")) == 3
+    assert tables_contents["OBJECT GEOMETRY - POINT COORDINATES"] == (
+        '   Point=115   GlobalX=2820   GlobalY=0   GlobalZ=0   SpecialPt=Yes\n'
+        '   Point=117   GlobalX=7040   GlobalY=0   GlobalZ=0   SpecialPt=Yes\n\n'
+    )
+    assert safe.force_length_unit() == ('Kgf', 'm')
+
+def test_get_tables_contents_mmap(tmp_path):
+    input_f2k_path = tmp_path / 'tables.f2k'
+    content = (
+        'File C:\\tables.F2K was saved on m/d/yy at h:mm:ss\r\n\r\n'
+        'TABLE:  "PROGRAM CONTROL"\r\n'
+        '   ProgramName="SAFE 2016"   Version=16.0.2   CurrUnits="Kgf, m, C"\r\n\r\n'
+        'TABLE:  "OBJECT GEOMETRY - POINT COORDINATES"\r\n'
+        '   Point=115   GlobalX=2820   GlobalY=0   GlobalZ=0   SpecialPt=Yes\r\n\r\n'
+        'END TABLE DATA\r\n'
+    )
+    input_f2k_path.write_bytes(content.encode())
+    safe = Safe(input_f2k_path)
+    mapped_safe = Safe(input_f2k_path, use_mmap=True)
+    assert dict(mapped_safe.get_tables_contents()) == dict(safe.get_tables_contents())
+    assert mapped_safe.force_length_unit() == ('Kgf', 'm')
+    mapped_safe.output_f2k_path = input_f2k_path
+    mapped_safe.write()
+    assert 'Point=115' in input_f2k_path.read_text()
+
+def test_find_table_headers():
+    dialect = osf_srw.SAFE16_DIALECT
+    buffer = b'TABLE:  "A"\n x=1\nTABLE:  "B"\r\n y=TABLE:\nTABLE:  "C"'
+    headers = dialect.find_table_headers(buffer)
+    assert [buffer[start:end] for start, end in headers] == [b'TABLE:  "A"', b'TABLE:  "B"\r', b'TABLE:  "C"']
+    assert dialect.find_table_headers(b'') == []
+    assert osf_srw.SAFE12_DIALECT.find_table_headers(b'File\n$ "POINT COORDINATES"\n') == [(5, 26)]
+
+def test_add_content_to_table_and_write(tmp_path):
+    output_f2k_path = tmp_path / 'write.f2k'
+    safe = Safe(output_f2k_path=output_f2k_path)
+    table_key = "LOAD ASSIGNMENTS - SURFACE LOADS"
+    safe.add_content_to_table(table_key, 'Area=1   LoadPat=DEAD\n')
+    safe.add_content_to_table(table_key, ['Area=2   LoadPat=DEAD\n', 'Area=3   LoadPat=DEAD\n'])
+    assert len(safe.tables_contents.chunks(table_key)) == 3
+    assert safe.tables_contents[table_key].count('Area=') == 3
+    safe.add_content_to_table(table_key, 'Area=4   LoadPat=LIVE\n')
+    safe.add_content_to_table("ADVANCED MODELING OPTIONS", '2DOnly=Yes', append=False)
+    safe.write()
+    assert output_f2k_path.read_text() == (
+        '\n\nTABLE:  "LOAD ASSIGNMENTS - SURFACE LOADS"\n'
+        'Area=1   LoadPat=DEAD\nArea=2   LoadPat=DEAD\nArea=3   LoadPat=DEAD\nArea=4   LoadPat=LIVE\n'
+        '\n\nTABLE:  "ADVANCED MODELING OPTIONS"\n'
+        '2DOnly=Yes'
+        '\nEND TABLE DATA'
+    )
+
+def test_f2k_table():
+    content = '''   Point=115   GlobalX=2820   GlobalY=0   GlobalZ=0   SpecialPt=Yes
+   Point=117   GlobalX=7040.5   GlobalY=-10   GlobalZ=0   SpecialPt=No
+
+   Column=COL1007   MatProp=CONCRETE_ZERO   CardinalPt="10 (centroid)"
+'''
+    table = F2kTable(content)
+    assert len(table) == 3
+    assert table.to_string() == content
+    assert table.fields == ['Point', 'GlobalX', 'GlobalY', 'GlobalZ', 'SpecialPt', 'Column', 'MatProp', 'CardinalPt']
+    assert list(table['Point']) == ['115', '117', None]
+    assert table.get_floats('GlobalX')[1] == 7040.5
+    assert math.isnan(table.get_floats('GlobalX')[2])
+    assert table.get_texts('CardinalPt')[2] == '10 (centroid)'
+    records = table.to_records(['Point', 'GlobalY', 'SpecialPt'])
+    assert records.GlobalY[1] == -10
+    assert records.SpecialPt[0] == 'Yes'
+    table.set_value(1, 'GlobalY', 25.0)
+    assert table.get_floats('GlobalY')[1] == 25
+    assert table.to_string() == content.replace('GlobalY=-10', 'GlobalY=25.0')
+
 def test_get_points_coordinates():
     safe = Safe()
     content = '''Point=115   GlobalX=2820   GlobalY=0   GlobalZ=0   SpecialPt=Yes\n
@@ -294,6 +485,47 @@ def test_is_point_exist():
     id = safe.is_point_exist([1, 8900, 0], content)
     assert not id
 
+def test_is_point_exist_with_points_index():
+    safe = Safe()
+    content = '''Point=115   GlobalX=2820   GlobalY=0   GlobalZ=0   SpecialPt=Yes\n
+                Point=117   GlobalX=7040   GlobalY=0   GlobalZ=0   SpecialPt=Yes\n
+                Point=122   GlobalX=1   GlobalY=8969.629120788806   GlobalZ=0   SpecialPt=Yes\n
+                '''
+    safe.add_content_to_table("OBJECT GEOMETRY - POINT COORDINATES", content)
+    assert safe.is_point_exist([2820, 0, 0]) == '115'
+    assert safe.is_point_exist([2820.0009, -.0009, 0]) == '115'
+    assert safe.is_point_exist([2820.002, 0, 0]) is None
+    assert safe.is_point_exist([1, 8969.6291, 0]) == '122'
+    safe.get_points_index().add(1000, [2820.0015, 0, 0])
+    assert safe.is_point_exist([2820.0015, 0, 0]) == '1000'
+    # first point is returned when two points are close to coordinate
+    assert safe.is_point_exist([2820.0008, 0, 0]) == '115'
+    safe.get_points_index().extend(['1001', '1002'], [[0, 0, 0], [2820, 0, 0]])
+    assert safe.is_point_exist([0, 0, 0.0005]) == '1001'
+    assert safe.is_point_exist([2820, 0, 0]) == '115'
+    # points index must be created again when table is replaced
+    safe.add_content_to_table("OBJECT GEOMETRY - POINT COORDINATES", content, append=False)
+    assert safe.is_point_exist([2820.0015, 0, 0]) is None
+
+def test_points_index_appended_points():
+    safe = Safe()
+    table_key = "OBJECT GEOMETRY - POINT COORDINATES"
+    safe.add_content_to_table(table_key, 'Point=1   GlobalX=0   GlobalY=0   GlobalZ=0   SpecialPt=No\n')
+    assert safe.is_point_exist([0, 0, 0]) == '1'
+    # points appended after the index is created are added to it
+    safe.add_content_to_table(table_key, ['Point=2   GlobalX=2820   GlobalY=0   GlobalZ=0   SpecialPt=No\n'])
+    assert safe.is_point_exist([2820, 0, 0]) == '2'
+
+def test_points_index_big_coordinates():
+    safe = Safe()
+    content = 'Point=2   GlobalX=20000000   GlobalY=5000000   GlobalZ=0   SpecialPt=No\n'
+    safe.add_content_to_table("OBJECT GEOMETRY - POINT COORDINATES", content)
+    assert safe.is_point_exist([2e7 + .0009, 5e6, 0]) == '2'
+    # the relative tolerance of math.isclose is not used for big coordinates
+    assert safe.is_point_exist([2e7 + .0015, 5e6, 0]) is None
+    assert safe.is_point_exist([2e7 + .0015, 5e6, 0], content=content) is None
+    assert safe.is_point_exist([2e7 + .0009, 5e6, 0], content=content) == '2'
+
 def test_get_last_point_number():
     safe = Safe()
     content = '''Point=115   GlobalX=2820   GlobalY=0   GlobalZ=0   SpecialPt=Yes\n
@@ -323,6 +555,12 @@ def test_set_sthtbelow():
     safe.force_length_unit(content14)
     content = safe.set_sthtbelow(content=content14)
     assert content == content14[:-2]
+    # blank lines after the last value are not kept, as before
+    content = safe.set_sthtbelow(content=content14 + '\n\n\n')
+    assert content == content14[:-2]
+    # no StHtBelow and ModelDatum
+    content = 'ProgramName="SAFE 2014"   Version=14.0.0   CurrUnits="N, mm, C"\n'
+    assert safe.set_sthtbelow(content=content) == content
 
 def test_force_length_unit():
     safe = Safe()
@@ -351,6 +589,45 @@ def test_force_length_unit():
     assert pytest.approx(ks, 1.9613e-05, .01)
 
 
+def test_get_tables_contents12(tmp_path):
+    input_f2k_path = tmp_path / 'tables12.f2k'
+    content = (
+        '$ File C:\\tables12.F2K saved 5/26/2016\n'
+        '  SAFE 12.2.0\n\n'
+        '$ CONTROLS\n'
+        '  UNITS  Kgf  m\n\n'
+        '$ POINT COORDINATES\n'
+        '  POINT "1"  0  0\n'
+        '  POINT "2"  2.82  1.5\n\n'
+        '$ END OF MODEL FILE\n'
+    )
+    input_f2k_path.write_text(content)
+    for use_mmap in (False, True):
+        safe = Safe12(input_f2k_path, use_mmap=use_mmap)
+        tables_contents = safe.get_tables_contents()
+        assert list(tables_contents.keys())[1:] == ["CONTROLS", "POINT COORDINATES"]
+        assert safe.force_length_unit() == ('Kgf', 'm')
+        assert safe.get_points_coordinates() == {'1': [0, 0], '2': [2.82, 1.5]}
+        assert safe.is_point_exist([2.82, 1.5]) == '2'
+
+def test_unit_system():
+    units = osf_srw.UnitSystem('Kgf', 'cm')
+    assert units.mm == .1
+    assert units.pressure == pytest.approx(1e-4)
+    assert units.subgrade_modulus == 1
+    assert units.convert(1, units.line_load) == pytest.approx(.01)
+    assert units.stress == pytest.approx((1 / 9.81, .01))
+    assert units.convert(1, units.stress) == pytest.approx(100 / 9.81)
+    # the force factor is applied before the length factor like older exports
+    units = osf_srw.UnitSystem('Kgf', 'm')
+    Ec_mpa = .043 * 2400 ** 1.5 * 5
+    assert units.convert(Ec_mpa, units.stress) == Ec_mpa * (1 / 9.81) / .001 ** 2
+    assert units.convert(2e5, units.stress) == 2e5 * (1 / 9.81) / .001 ** 2
+    assert units.convert_point(FreeCAD.Vector(10, 20, 30)) == pytest.approx([1, 2, 3])
+    assert units.convert_coordinates([[10, 20, 30]])[0].tolist() == pytest.approx([1, 2, 3])
+    with pytest.raises(KeyError):
+        osf_srw.UnitSystem('kip', 'cm')
+
 def test_get_points_coordinates12():
     safe = Safe12()
     content = '''  POINT  "115"  2.82  0\n
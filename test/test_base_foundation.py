@@ -0,0 +1,41 @@
+import sys
+from pathlib import Path
+
+# path to FreeCAD.so
+FREECADPATH = str(Path(sys.executable).parent)
+sys.path.append(FREECADPATH)
+import FreeCAD
+import Draft
+import pytest
+
+punch_path = Path(__file__).absolute().parent.parent
+sys.path.insert(0, str(punch_path))
+from osafe_objects.base_foundation import make_base_foundation
+document = FreeCAD.newDocument()
+
+def test_base_foundation_shapes_reused():
+    points = [FreeCAD.Vector(0, 0, 0), FreeCAD.Vector(6000, 0, 0)]
+    base = Draft.make_wire(points)
+    document.recompute()
+    obj = make_base_foundation(base, width=1000, height=800)
+    assert obj.plan.Area == pytest.approx(6000 * 1000)
+    shape = obj.Shape
+    obj.touch()
+    document.recompute()
+    assert obj.Shape.isSame(shape)
+    obj.width = 1200
+    document.recompute()
+    assert not obj.Shape.isSame(shape)
+    assert obj.plan.Area == pytest.approx(6000 * 1200)
+
+def test_get_edge_key():
+    import Part
+    from osafe_objects.base_foundation import get_edge_key
+    p1 = FreeCAD.Vector(0, 0, 0)
+    p2 = FreeCAD.Vector(6000, 0, 0)
+    arc1 = Part.Arc(p1, FreeCAD.Vector(3000, 500, 0), p2).toShape()
+    arc2 = Part.Arc(p1, FreeCAD.Vector(3000, 1000, 0), p2).toShape()
+    # same vertexes and number of edges
+    assert [tuple(v.Point) for v in arc1.Vertexes] == [tuple(v.Point) for v in arc2.Vertexes]
+    assert get_edge_key(arc1) != get_edge_key(arc2)
+    assert get_edge_key(arc1) == get_edge_key(arc1.copy())
@@ -8,6 +8,7 @@ sys.path.append(FREECADPATH)
 import FreeCAD
 
 filename_base_foundation = Path(__file__).parent / 'test_files' / 'freecad' / 'base_foundation.FCStd'
+filename_base_plate = Path(__file__).parent / 'test_files' / 'freecad' / 'base_plate.FCStd'
 document_base_foundation = FreeCAD.openDocument(str(filename_base_foundation))
 
 
@@ -34,8 +35,61 @@ def test_change_foundation_height():
     document_base_foundation.recompute([ret])
     assert ret.height_punch.Value == 810
 
+def test_update_foundation_d_fc():
+    bfs = []
+    for o in document_base_foundation.Objects:
+        if hasattr(o, 'Proxy') and o.Proxy and o.Proxy.Type == 'BaseFoundation':
+            bfs.append(o)
+    ret = etabs_foundation.make_foundation(base_foundations=bfs, height=800, cover=75)
+    etabs_foundation.update_foundation_d_fc(ret, cover=60, fc=30)
+    assert ret.d.Value == 740
+    assert ret.fc.getValueAs('MPa').Value == 30
+    assert not ret.isTouched()
+
+def test_update_foundation_d_fc_punches():
+    from osafe_objects import punch
+    doc = FreeCAD.openDocument(str(filename_base_plate))
+    foun = doc.Foundation
+    col = doc.getObjectsByLabel('C1_Story1')[0]
+    p = punch.make_punches(foun, [col])[0]
+    ratio = p.Ratio
+    vc = p.vc.getValueAs('MPa').Value
+    fc = foun.fc.getValueAs('MPa').Value
+    etabs_foundation.update_foundation_d_fc(foun, cover=foun.cover.Value + 25, fc=fc + 5)
+    assert p.vc.getValueAs('MPa').Value != vc
+    assert p.Ratio != ratio
+    FreeCAD.closeDocument(doc.Name)
+
+def test_get_geometry_signature():
+    bfs = []
+    for o in document_base_foundation.Objects:
+        if hasattr(o, 'Proxy') and o.Proxy and o.Proxy.Type == 'BaseFoundation':
+            bfs.append(o)
+    ret = etabs_foundation.make_foundation(base_foundations=bfs)
+    signature = etabs_foundation.get_geometry_signature(ret)
+    # recompute without changing geometry
+    bfs[0].Proxy.geometry_key = None
+    bfs[0].touch()
+    document_base_foundation.recompute([bfs[0]])
+    assert etabs_foundation.get_geometry_signature(ret) == signature
+    bfs[0].height = bfs[0].height.Value + 100
+    document_base_foundation.recompute([bfs[0]])
+    assert etabs_foundation.get_geometry_signature(ret) != signature
+
+def test_schedule_rebuild():
+    bfs = []
+    for o in document_base_foundation.Objects:
+        if hasattr(o, 'Proxy') and o.Proxy and o.Proxy.Type == 'BaseFoundation':
+            bfs.append(o)
+    ret = etabs_foundation.make_foundation(base_foundations=bfs)
+    etabs_foundation.schedule_rebuild(ret)
+    etabs_foundation.schedule_rebuild(ret)
+    assert (ret.Document.Name, ret.Name) in etabs_foundation.rebuild_timers
+    assert etabs_foundation.is_rebuild_pending(ret)
+    etabs_foundation.cancel_rebuild(ret)
+    assert not etabs_foundation.is_rebuild_pending(ret)
 
 
 
 if __name__ == '__main__':
-    test_make_foundation()
\ No newline at end of file
+    test_make_foundation()
@@ -561,6 +561,48 @@ def test_punch_null_points2():
         assert math.isclose(p.x, desired_x[i], abs_tol=1)
         assert math.isclose(p.y, desired_y[i], abs_tol=1)
 
+def test_allowable_stresses():
+    bx = np.array([500, 400, 300])
+    by = np.array([500, 800, 1200])
+    alpha_s = osafe_funcs.get_alphas_s(['Interior', 'Edge 1', 'Corner 3'])
+    np.testing.assert_array_equal(alpha_s, [40, 30, 20])
+    fc = 25
+    d = np.array([400, 600, 900])
+    b0 = 2 * (bx + d) + 2 * (by + d)
+    b0d = b0 * d
+    one_way, Vc, vc = osafe_funcs.allowable_stresses(bx, by, alpha_s, fc, b0, b0d, d)
+    for i in range(3):
+        beta = max(bx[i] / by[i], by[i] / bx[i])
+        one = math.sqrt(fc) * b0d[i] / 6 * .75
+        vc_i = min(2 * one, one * (1 + 2 / beta), one * (2 + alpha_s[i] * d[i] / b0[i]) / 2)
+        assert one_way[i] == pytest.approx(one)
+        assert Vc[i] == pytest.approx(vc_i)
+        assert vc[i] == pytest.approx(vc_i / b0d[i])
+    _, Vc_19, _ = osafe_funcs.allowable_stresses(bx, by, alpha_s, fc, b0, b0d, d, ACI2019=True)
+    lambda_s = np.minimum(np.sqrt(2 / (1 + .004 * d)), 1)
+    np.testing.assert_allclose(Vc_19, Vc * lambda_s)
+    gamma_vx, gamma_vy = osafe_funcs.gammas_v(bx, by)
+    for i in range(3):
+        assert (gamma_vx[i], gamma_vy[i]) == pytest.approx(osafe_funcs.gamma_v(bx[i], by[i]))
+
+def test_stirrups_design():
+    n = osafe_funcs.get_stirrups_n(['Interior', 'Edge 2', 'Corner 4'])
+    np.testing.assert_array_equal(n, [1, 2, 4])
+    Vu = np.array([1.5e6, 2e6, 1e5])
+    Vc = np.array([1e6, 1e6, 1e6])
+    s, Vs, x = osafe_funcs.stirrups_design(Vu, Vc, fc=25, d=500, n=n, Av=157, Fys=400)
+    Av_over_s = (Vu[0] / .75 - Vc[0]) / (400 * 500)
+    assert s[0] == pytest.approx(157 / Av_over_s)
+    assert Vs[0] == pytest.approx(Vu[0] / .75 - Vc[0])
+    assert x[0] == pytest.approx(max(Vu[0] * 6 / (5 * 500) / (2 * math.pi) - 250, 0))
+    # Vc is enough for the last punch
+    assert s[2] == 0
+    assert Vs[2] == 0
+
+def test_get_critical_section_properties_no_sides():
+    with pytest.raises(ValueError):
+        osafe_funcs.get_critical_section_properties([], 500)
+
 def test_get_number_of_edges_connect_to_point():
     point = FreeCAD.Vector(1.0, 2.0, 3.0)
     # Define edges (as tuples of FreeCAD.Vector points)
@@ -714,6 +756,20 @@ def test_get_common_part_of_base_foundation():
     assert len(base_name_common_shape) == len(bfs)
     assert len(points_common_shape) == 17
 
+def test_bound_box_grid():
+    boxes = [
+        (0, 0, 10000, 1000),
+        (9000, 0, 10000, 8000),
+        (20000, 20000, 21000, 21000),
+        ]
+    grid = osafe_funcs.BoundBoxGrid(boxes, tol=1)
+    assert sorted(grid.query(9500, 500)) == [0, 1]
+    assert grid.query(5000, 500) == [0]
+    assert grid.query(10001, 8001) == [1]
+    assert grid.query(10002, 8001) == []
+    assert grid.query(20500, 20500) == [2]
+    assert grid.query(15000, 15000) == []
+
 def test_get_foundation_shape_from_base_foundations():
     doc = document_rashidzadeh
     bfs  = osafe_funcs.get_objects_of_type('BaseFoundation', doc)
@@ -730,6 +786,59 @@ def test_get_foundation_shape_from_base_foundations_with_slabs():
     slabs  = osafe_funcs.get_objects_of_type('RectangularSlab', doc)
     shape = osafe_funcs.get_foundation_shape_from_base_foundations(bfs, slabs=slabs)
 
+def test_fuse_shapes():
+    # 10 x 10 grid of 1200 x 1200 faces with 1000 spacing
+    faces = []
+    for i in range(10):
+        for j in range(10):
+            faces.append(osafe_funcs.rectangle_face(FreeCAD.Vector(i * 1000, j * 1000, 0), 1200, 1200))
+    face = osafe_funcs.fuse_shapes(faces, group_size=4)
+    assert face.Area == pytest.approx(10200 ** 2)
+    assert len(face.Faces) == 1
+    opening = osafe_funcs.rectangle_face(FreeCAD.Vector(0, 0, 0), 200, 200)
+    far_opening = osafe_funcs.rectangle_face(FreeCAD.Vector(50000, 0, 0), 200, 200)
+    shape = osafe_funcs.cut_shapes_near(faces[0], [opening, far_opening])
+    assert shape.Area == pytest.approx(1200 ** 2 - 200 ** 2)
+
+def test_get_foundation_shape_from_base_foundations_cache():
+    doc = document_rashidzadeh
+    bfs  = osafe_funcs.get_objects_of_type('BaseFoundation', doc)
+    shape, *_ = osafe_funcs.get_foundation_shape_from_base_foundations(bfs, continuous_layer='B')
+    cache = osafe_funcs.ShapeCache()
+    shape1, _, plan1, _ = osafe_funcs.get_foundation_shape_from_base_foundations(bfs, continuous_layer='B', cache=cache)
+    n = len(cache)
+    assert n > len(bfs)
+    shape2, _, plan2, _ = osafe_funcs.get_foundation_shape_from_base_foundations(bfs, continuous_layer='B', cache=cache)
+    assert len(cache) == n
+    assert shape1.Volume == pytest.approx(shape.Volume)
+    assert shape2.Volume == pytest.approx(shape1.Volume)
+    assert plan2.Area == pytest.approx(plan1.Area)
+    # all base foundations reused from cache
+    assert all(s1.isSame(s2) for s1, s2 in zip(shape1.Solids, shape2.Solids))
+    # first_edge and last_edge are restored when the shapes are reused
+    edges = [(bf.first_edge, bf.last_edge) for bf in bfs]
+    for bf in bfs:
+        bf.first_edge = Part.Shape()
+        bf.last_edge = Part.Shape()
+    osafe_funcs.get_foundation_shape_from_base_foundations(bfs, continuous_layer='B', cache=cache)
+    assert len(cache) == n
+    for bf, bf_edges in zip(bfs, edges):
+        for edge, cached_edge in zip((bf.first_edge, bf.last_edge), bf_edges):
+            assert edge.isNull() == cached_edge.isNull()
+            if not edge.isNull():
+                assert edge.Length == pytest.approx(cached_edge.Length)
+
+def test_shape_cache():
+    cache = osafe_funcs.ShapeCache()
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.prune()
+    assert len(cache) == 2
+    assert cache.get('a') == 1
+    cache.prune()
+    assert 'a' in cache
+    assert 'b' not in cache
+
 def test_get_coordinate_and_width_between():
     coords_width = osafe_funcs.get_coordinate_and_width_between(1, 10, .7, False)
     assert len(coords_width) == 12
@@ -794,6 +903,16 @@ def test_get_total_length_of_shapes():
     length = osafe_funcs.get_total_length_of_shapes([face])
     assert length == (x2 + y2) * 2
 
+def test_get_process_pool():
+    pool = osafe_funcs.get_process_pool(2)
+    if pool is None:
+        pytest.skip('there is no python interpreter for workers')
+    assert osafe_funcs.get_process_pool(2, osafe_funcs.PROCESS_POOL_MIN_TASKS) is pool
+    assert osafe_funcs.get_process_pool(2, osafe_funcs.PROCESS_POOL_MIN_TASKS - 1) is None
+    assert list(pool.map(math.sqrt, [4, 9])) == [2, 3]
+    osafe_funcs.shutdown_process_pool(2)
+    assert 2 not in osafe_funcs.process_pools
+
 if __name__ == '__main__':
     # test_get_similar_edge_direction_in_common_points_from_edges()
-    test_punch_null_points2()
\ No newline at end of file
+    test_punch_null_points2()
@@ -32,6 +32,128 @@ def test_punch_reinforcement():
     p.Proxy.execute(p)
     assert True
 
+def test_make_punches():
+    foun = document_base_plate.Foundation
+    col = document_base_plate.getObjectsByLabel('C1_Story1')[0]
+    p1 = punch.make_punch(foun, col)
+    p2 = punch.make_punches(foun, [col])[0]
+    assert not p2.isTouched()
+    for prop in ('Location', 'Area', 'b0', 'I22', 'I33', 'I23', 'Vc', 'vc', 'Vu', 'Ratio'):
+        assert getattr(p1, prop) == getattr(p2, prop)
+    assert p1.combos_ratio == p2.combos_ratio
+
+def test_solve_punches_processes(monkeypatch):
+    monkeypatch.setattr(punch.osafe_funcs, 'PROCESS_POOL_MIN_TASKS', 1)
+    foun = document_base_plate.Foundation
+    col = document_base_plate.getObjectsByLabel('C1_Story1')[0]
+    serial = punch.solve_punches(foun, [col, col])
+    parallel = punch.solve_punches(foun, [col, col], processes=2)
+    assert len(parallel) == 2
+    for r1, r2 in zip(serial, parallel):
+        for prop in ('Location', 'Area', 'b0', 'I22', 'I33', 'I23', 'Vc', 'vc', 'Vu', 'Ratio', 'combos_ratio'):
+            assert r1[prop] == r2[prop]
+        assert r1['center_of_punch'] == r2['center_of_punch']
+
+def test_solve_punches_progress(monkeypatch):
+    monkeypatch.setattr(punch.osafe_funcs, 'PROCESS_POOL_MIN_TASKS', 1)
+    foun = document_base_plate.Foundation
+    col = document_base_plate.getObjectsByLabel('C1_Story1')[0]
+    for processes in (1, 2):
+        punch.get_section_cache(document_base_plate.Name).clear()
+        calls = []
+        punch.solve_punches(foun, [col, col, col], processes=processes, progress=lambda: calls.append(1))
+        assert len(calls) == 3
+
+def test_governing_shear_stress():
+    rng = punch.np.random.default_rng(0)
+    for angle in (0, 30):
+        forces = rng.normal(0, 1, (200, 3)) * [1e5, 1e8, 1e8]
+        kwargs = dict(
+            forces=forces,
+            faces_centers=punch.np.array([[0, 600], [600, 0], [0, -600]]),
+            center_of_load=(0, 0),
+            center_of_punch=(100, 0),
+            b0d=1e6,
+            I22=4e10,
+            I33=3e10,
+            I23=1e8,
+            gamma_vx=.4,
+            gamma_vy=.4,
+            angle=angle,
+            )
+        full = punch.ultimate_shear_stresses(**kwargs).max()
+        assert punch.governing_shear_stress(**kwargs) == full
+        upper = punch.ultimate_shear_stresses_upper_bound(
+            forces,
+            (0, 0),
+            (100, 0),
+            1e6,
+            punch.get_section_moduli(kwargs['faces_centers'], (100, 0), 4e10, 3e10, 1e8),
+            .4,
+            .4,
+            angle,
+            )
+        assert punch.np.all(upper >= punch.ultimate_shear_stresses(**kwargs) - 1e-6)
+
+def test_migrate_column_combos_load():
+    doc = FreeCAD.newDocument()
+    col = doc.addObject("App::FeaturePython", "Column")
+    col.addProperty("App::PropertyMap", "combos_load", "Structure")
+    col.combos_load = {'COMB1 Max': '100, 2000, -3000', 'COMB2 Min': '-50,0,1000'}
+    assert punch.migrate_column_combos_load(col)
+    assert col.combos_load == {}
+    combos, forces = punch.get_column_combos_forces(col)
+    assert combos == ['COMB1 Max', 'COMB2 Min']
+    assert forces.tolist() == [[100, 2000, -3000], [-50, 0, 1000]]
+    assert not punch.migrate_column_combos_load(col)
+    FreeCAD.closeDocument(doc.Name)
+
+def test_section_cache_closed_document():
+    doc = FreeCAD.newDocument()
+    name = doc.Name
+    punch.get_section_cache(name).put('a', {})
+    assert name in punch.section_caches
+    FreeCAD.closeDocument(name)
+    punch.get_section_cache(document_base_plate.Name)
+    assert name not in punch.section_caches
+
+def test_section_cache():
+    cache = punch.SectionCache(maxsize=2)
+    cache.put('a', {})
+    cache.put('b', {})
+    cache.get('a')
+    cache.put('c', {})
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert len(cache) == 2
+    foun = document_base_plate.Foundation
+    col = document_base_plate.getObjectsByLabel('C1_Story1')[0]
+    cache.clear()
+    fc = foun.fc.getValueAs('MPa').Value
+    r1 = punch.solve_punch(foun.plan, col, foun.d.Value, fc, cache=cache)
+    assert len(cache) == 1
+    r2 = punch.solve_punch(foun.plan, col, foun.d.Value, fc, cache=cache)
+    assert len(cache) == 1
+    assert r1['Ratio'] == r2['Ratio']
+    assert r1['combos_ratio'] == r2['combos_ratio']
+
+def test_critical_section_analytic():
+    foun = document_base_plate.Foundation
+    col = document_base_plate.getObjectsByLabel('C1_Story1')[0]
+    plan_polygons = punch.osafe_funcs.get_plan_polygons(foun.plan)
+    assert plan_polygons is not None
+    angle, bx, by, _, center = punch.get_column_dimensions(col)
+    d = foun.d.Value
+    for angle in (0, angle, 30):
+        args = (center, bx + d, by + d, d, angle)
+        analytic = punch.get_critical_section_analytic(plan_polygons, *args)
+        occ = punch.get_critical_section_occ(foun.plan, *args)
+        assert analytic[0] == occ[0]
+        assert len(analytic[1]) == len(occ[1])
+        for i in (4, 5, 7, 8, 9):
+            assert pytest.approx(analytic[i], rel=1e-6, abs=1e-3) == occ[i]
+        assert analytic[6].isEqual(occ[6], 1e-6)
+
 def test_rotated_punch():
     foun = document_base_plate.Foundation
     col = document_base_plate.getObjectsByLabel('C1_Story1')[0]
@@ -67,5 +189,29 @@ def test_rotated_punch():
             assert pytest.approx(float(r1), abs=.01) == pytest.approx(float(p.Ratio), abs=.01)
     
 
+def test_ultimate_shear_stresses():
+    combos, forces = punch.get_combos_forces({'COMB1 Max': '100,2000,-3000', 'COMB2 Min': '-50,0,1000'})
+    assert combos == ['COMB1 Max', 'COMB2 Min']
+    assert forces.shape == (2, 3)
+    assert punch.get_faces_centers([]).shape == (0, 2)
+    faces_centers = [[0, 500], [500, 0]]
+    stresses = punch.ultimate_shear_stresses(
+        forces=forces,
+        faces_centers=punch.np.array(faces_centers),
+        center_of_load=(0, 0),
+        center_of_punch=(0, 0),
+        b0d=1e6,
+        I22=1e10,
+        I33=1e10,
+        I23=0,
+        gamma_vx=.4,
+        gamma_vy=.4,
+        )
+    # vu / b0d + gamma_vx * mx * y / I33 - gamma_vy * my * x / I22
+    expected_1 = max(100 / 1e6 + .4 * 2000 * 500 / 1e10, 100 / 1e6 + .4 * 3000 * 500 / 1e10) * 1000
+    expected_2 = max(-50 / 1e6, -50 / 1e6 - .4 * 1000 * 500 / 1e10) * 1000
+    assert stresses.tolist() == pytest.approx([expected_1, expected_2])
+
+
 if __name__ == '__main__':
     test_make_punch()
\ No newline at end of file